@@ -0,0 +1,419 @@
+"""
+AI chat intent router
+
+Xabar bir marta, oldindan kompilyatsiya qilingan Aho-Corasick avtomati bilan
+o'qiladi va barcha intent kalit so'zlari (o'zbek lotin/kirill, rus, ingliz)
+bir o'tishda topiladi. Har bir intent mos kelgan so'zlari og'irligi bo'yicha
+ball oladi; eng yuqori ball yutadi, teng bo'lsa - `INTENTS` dagi tartib.
+
+Kalit so'z so'z boshida bo'lishi kerak ("balansim" -> "balans", lekin
+"chiqim" ichidagi "hi" emas); `=` bilan boshlangan so'z faqat to'liq so'z
+sifatida. Bir joydan boshlangan bir nechta so'zdan eng uzuni olinadi:
+"hisobot" - hisobot, "hisob" emas.
+
+Har bir intent `needs_db` ni e'lon qiladi: salomlashish, yordam kabi
+javoblar uchun database connection umuman olinmaydi. DB javoblari
+(user_id, intent, kun, `scopes` versiyalari) kaliti bilan keshlanadi:
+"ombor" javobini faqat ombor yozuvlari, "balans"nikini faqat tranzaksiyalar
+eskirtiradi (data_version.py).
+"""
+import os
+import threading
+from collections import deque
+from datetime import date
+
+from cache_store import CacheStore
+from data_version import data_versions
+from database import get_db_connection
+from forecasting import forecast_for_user
+from periods import last_days, period_range
+import queries
+
+AI_ANSWER_CACHE_MAX_SIZE = int(os.getenv('AI_ANSWER_CACHE_MAX_SIZE', '20000'))
+# Bot tranzaksiyani to'g'ridan-to'g'ri yozadi va versiyani oshirmasligi mumkin -
+# javob shu muddatdan uzoq eskirmaydi (RESPONSE_CACHE_MAX_AGE bilan bir xil ma'noda)
+AI_ANSWER_CACHE_MAX_AGE = int(os.getenv('AI_ANSWER_CACHE_MAX_AGE', '300'))
+
+answer_cache = CacheStore('ai_answers', max_size=AI_ANSWER_CACHE_MAX_SIZE, default_ttl=AI_ANSWER_CACHE_MAX_AGE)
+
+# Apostrof variantlari bitta ko'rinishda (o‘ -> o'); o'zbek kirill harflari
+# ko'pincha rus klaviaturasida yoziladi (ҳ -> х, қ -> к, ...)
+_NORMALIZE = str.maketrans({'ʻ': "'", 'ʼ': "'", '‘': "'", '’': "'", '`': "'", '´': "'",
+                            'ҳ': 'х', 'қ': 'к', 'ғ': 'г', 'ў': 'у', 'ё': 'е'})
+
+
+def normalize(message):
+    """Kichik harf va yagona yozuv ko'rinishi (kalit so'zlar ham shu orqali o'tadi)"""
+    return (message or '').casefold().translate(_NORMALIZE)
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == "'"
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick: barcha kalit so'zlar uchun bitta avtomat
+
+    `match(text)` - {payload: [kalit so'zlar]}; matn uzunligiga chiziqli,
+    kalit so'zlar soniga bog'liq emas.
+    """
+
+    def __init__(self, keywords):
+        """keywords: (so'z, payload, whole_word) ro'yxati"""
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._keywords = []
+        for text, payload, whole in keywords:
+            text = normalize(text)
+            node = 0
+            for char in text:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = next_node
+            self._out[node].append(len(self._keywords))
+            self._keywords.append((text, payload, whole))
+        self._build_links()
+
+    def _build_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text):
+        """So'z chegarasiga mos (start, kalit so'z indeksi) juftlari"""
+        goto, fail, out, keywords = self._goto, self._fail, self._out, self._keywords
+        length = len(text)
+        node = 0
+        found = []
+        for end, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in out[node]:
+                keyword, _, whole = keywords[index]
+                start = end - len(keyword) + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if whole and end + 1 < length and _is_word_char(text[end + 1]):
+                    continue
+                found.append((start, index))
+        return found
+
+    def match(self, text):
+        # Bir joydan boshlangan so'zlardan eng uzuni ("hisobot" ichidagi "hisob" hisoblanmaydi)
+        longest = {}
+        for start, index in self.find(text):
+            current = longest.get(start)
+            if current is None or len(self._keywords[index][0]) > len(self._keywords[current][0]):
+                longest[start] = index
+        matches = {}
+        for index in longest.values():
+            keyword, payload, _ = self._keywords[index]
+            matches.setdefault(payload, []).append(keyword)
+        return matches
+
+
+# ===== INTENT'LAR =====
+
+class Intent:
+    """
+    Bitta intent: kalit so'zlar va javob
+
+    keywords: {so'z: og'irlik}; '=' bilan boshlangan so'z - faqat to'liq so'z
+    needs_db: True bo'lsa `respond` ga ochiq connection beriladi, aks holda None
+    scopes: javob bog'liq ma'lumotlar (data_version.SCOPES) - kesh kaliti uchun
+    """
+    name = None
+    keywords = {}
+    needs_db = False
+    scopes = ()
+
+    def respond(self, user_id, connection):
+        raise NotImplementedError
+
+
+class Greeting(Intent):
+    name = 'greeting'
+    # Boshqa intent bilan birga kelsa ("salom, balansim qancha?") o'sha yutadi
+    keywords = {'salom': 0.5, 'assalom': 0.5, 'hello': 0.5, '=hi': 0.5, '=hey': 0.5,
+                'салом': 0.5, 'ассалом': 0.5, 'привет': 0.5, 'здравствуй': 0.5}
+
+    def respond(self, user_id, connection):
+        return "Assalomu alaykum! Men sizning biznes yordamchingizman. Qanday yordam bera olaman?"
+
+
+class Balance(Intent):
+    name = 'balance'
+    keywords = {'balans': 1, 'hisob': 1, 'pul': 1, 'daromad': 1, 'foyda': 1, 'kirim': 1, 'chiqim': 1,
+                'balance': 1, 'profit': 1, 'income': 1, 'revenue': 1, 'money': 1,
+                'баланс': 1, 'ҳисоб': 1, 'пул': 1, 'даромад': 1, 'фойда': 1,
+                'прибыл': 1, 'доход': 1, 'деньг': 1, 'расход': 1}
+    needs_db = True
+    scopes = ('transactions',)
+
+    def respond(self, user_id, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(queries.PERIOD_SUMMARY, (user_id, *period_range('month').params))
+            result = cursor.fetchone()
+        if not result:
+            return None
+        income = result.get('total_income', 0) or 0
+        expense = result.get('total_expense', 0) or 0
+        balance = income - expense
+        profit_margin = (balance / income * 100) if income > 0 else 0
+
+        return f"Joriy oy uchun:\n💰 Kirim: {income:,.0f} UZS\n💸 Chiqim: {expense:,.0f} UZS\n📊 Sof foyda: {balance:,.0f} UZS\n📈 Foyda darajasi: {profit_margin:.1f}%\n\n{'✅ Ajoyib natija!' if profit_margin > 30 else '✅ Yaxshi natija!' if profit_margin > 15 else '⚠️ Chiqimlarni optimallashtiring.' if profit_margin > 0 else '🚨 Zararda ishlayapsiz!'}"
+
+
+class Forecast(Intent):
+    name = 'forecast'
+    keywords = {'prognoz': 1.5, 'bashorat': 1.5, 'forecast': 1.5, 'kelajak': 1.5, 'predict': 1.5,
+                'прогноз': 1.5, 'башорат': 1.5, 'келажак': 1.5}
+    needs_db = True
+    scopes = ('transactions',)
+
+    def respond(self, user_id, connection):
+        forecast = forecast_for_user(connection, user_id)['forecast']
+        if 'income' not in forecast:
+            return f"📊 {forecast['message']}"
+        income = forecast['income']
+        expense = forecast['expense']
+        growth = forecast['income_growth_rate']
+
+        if growth > 5:
+            advice = "🚀 Biznesingiz rivojlanmoqda!"
+        elif growth > 0:
+            advice = "⚠️ O'sish sur'atini oshirish tavsiya etiladi."
+        else:
+            advice = "🚨 Kirimlar kamaymoqda, strategiyani ko'rib chiqing!"
+
+        return f"📊 Keyingi {forecast['horizon_days']} kun prognozi:\n💰 Kirim: {income['value']:,.0f} UZS ({income['lower']:,.0f} – {income['upper']:,.0f})\n💸 Chiqim: {expense['value']:,.0f} UZS ({expense['lower']:,.0f} – {expense['upper']:,.0f})\n📈 O'sish sur'ati: {growth:+.1f}%\n\n{advice}"
+
+
+class TopProducts(Intent):
+    name = 'top_products'
+    keywords = {'=eng': 1, '=top': 1, 'yaxshi': 0.5, "ko'p sotilgan": 2, 'sotilgan': 1, 'best': 1,
+                'bestseller': 2, 'best selling': 2, 'top selling': 2, '=топ': 1, 'лучш': 1,
+                'продаваем': 2, 'энг': 1, 'сотилган': 1}
+    needs_db = True
+    scopes = ('warehouse',)
+
+    def respond(self, user_id, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(queries.TOP_PRODUCTS, (user_id, *last_days(30).params))
+            products = cursor.fetchall()[:5]
+        if not products:
+            return "📦 Hali sotuvlar ro'yxati mavjud emas."
+        response = "🏆 Eng ko'p sotilgan mahsulotlar (30 kun):\n\n"
+        for i, p in enumerate(products, 1):
+            response += f"{i}. {p['name']}: {p['total_sold']} ta, {p['total_revenue']:,.0f} UZS\n"
+        return response
+
+
+class Warehouse(Intent):
+    name = 'warehouse'
+    keywords = {'ombor': 1, 'mahsulot': 1, 'qoldiq': 1, 'product': 1, 'stock': 1, 'inventory': 1,
+                'омбор': 1, 'маҳсулот': 1, 'склад': 1, 'товар': 1, 'остат': 1}
+    needs_db = True
+    scopes = ('warehouse',)
+
+    def respond(self, user_id, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(queries.WAREHOUSE_STATS, (user_id,))
+            result = cursor.fetchone()
+        if not result:
+            return None
+        total = result.get('total_products', 0)
+        low_stock = result.get('low_stock_count', 0) or 0
+        total_value = result.get('total_value', 0) or 0
+        return f"📦 Ombor holati:\n• Jami mahsulotlar: {total} ta\n• Umumiy qiymati: {total_value:,.0f} UZS\n• {'⚠️ Kam qolganlar: ' + str(low_stock) + ' ta' if low_stock > 0 else '✅ Barcha mahsulotlar yetarli'}"
+
+
+class Employees(Intent):
+    name = 'employees'
+    keywords = {'xodim': 1, 'jamoa': 1, 'ishchi': 1, 'employee': 1, 'team': 1, 'staff': 1,
+                'ходим': 1, 'жамоа': 1, 'сотрудник': 1, 'персонал': 1, 'команд': 1}
+    needs_db = True
+    scopes = ('employees',)
+
+    def respond(self, user_id, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(queries.EMPLOYEE_COUNTS, (user_id,))
+            emp_result = cursor.fetchone() or {}
+            cursor.execute(queries.EMPLOYEE_PERFORMANCE, (user_id,))
+            top_employee = cursor.fetchone()
+
+        total = emp_result.get('total', 0)
+        active = emp_result.get('active', 0)
+        response = f"👥 Jamoa:\n• Jami xodimlar: {total} ta\n• Faollar: {active} ta\n"
+
+        if top_employee and (top_employee.get('completed_tasks') or 0) > 0:
+            response += f"\n⭐ Eng samarali: {top_employee['employee_name']} ({top_employee['completed_tasks']} ta vazifa)"
+
+        return response
+
+
+class Tasks(Intent):
+    name = 'tasks'
+    keywords = {'vazifa': 1, '=ish': 1, '=ishlar': 1, 'topshiriq': 1, 'task': 1, 'todo': 1,
+                'вазифа': 1, 'задач': 1, 'задани': 1}
+    needs_db = True
+    scopes = ('employees',)
+
+    def respond(self, user_id, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(queries.TASK_STATUS_COUNTS, (user_id,))
+            result = cursor.fetchone()
+        if not result:
+            return None
+        total = result.get('total', 0)
+        pending = result.get('pending', 0) or 0
+        in_progress = result.get('in_progress', 0) or 0
+        completed = result.get('completed', 0) or 0
+        completion_rate = (completed / total * 100) if total > 0 else 0
+
+        return f"📋 Vazifalar:\n• Jami: {total} ta\n• ⏳ Kutilmoqda: {pending}\n• 🔄 Jarayonda: {in_progress}\n• ✅ Bajarilgan: {completed}\n\n📊 Bajarilish foizi: {completion_rate:.0f}%"
+
+
+class Analytics(Intent):
+    name = 'analytics'
+    keywords = {'tahlil': 1, 'analiz': 1, 'statistika': 1, 'analytics': 1, 'statistics': 1,
+                'таҳлил': 1, 'анализ': 1, 'аналитик': 1, 'статистик': 1}
+
+    def respond(self, user_id, connection):
+        return "📊 Kengaytirilgan analitika:\n\n• 💰 Moliyaviy ko'rsatkichlar\n• 📈 Daromad prognozi\n• 🏆 Eng yaxshi mahsulotlar\n• 📉 Trend tahlili\n• 👥 Xodimlar samaradorligi\n\n'Hisobotlar' bo'limida batafsil ma'lumot!"
+
+
+class Reports(Intent):
+    name = 'reports'
+    keywords = {'hisobot': 1, 'report': 1, 'ҳисобот': 1, 'отчет': 1}
+
+    def respond(self, user_id, connection):
+        return "📊 Hisobotlar bo'limida:\n• Moliyaviy hisobotlar\n• Ombor statistikasi\n• Foyda tahlili\n• Trend grafiklar\n• Xodimlar faoliyati\n\nHisobotlar sahifasiga o'ting!"
+
+
+class Help(Intent):
+    name = 'help'
+    # "qanday" ko'p savollarda uchraydi ("balans qanday?") - asosiy intent yutsin
+    keywords = {'yordam': 1, 'help': 1, 'qanday': 0.5, 'ёрдам': 1, 'қандай': 0.5,
+                'помо': 1, 'что умеешь': 1}
+
+    def respond(self, user_id, connection):
+        return "🤖 Men sizga yordam bera olaman:\n\n💰 Moliyaviy tahlil va prognoz\n📦 Ombor boshqaruvi\n👥 Xodimlar samaradorligi\n📊 Biznes statistikasi\n🎯 Eng yaxshi mahsulotlar\n\nSavolingizni yozing!"
+
+
+class Thanks(Intent):
+    name = 'thanks'
+    keywords = {'rahmat': 0.5, 'thank': 0.5, 'minnatdor': 0.5, 'раҳмат': 0.5, 'спасибо': 0.5,
+                'благодар': 0.5}
+
+    def respond(self, user_id, connection):
+        return "Marhamat! Biznesingiz rivojlansin! 🚀"
+
+
+class Fallback(Intent):
+    name = 'fallback'
+
+    def respond(self, user_id, connection):
+        return ("🤖 Men sizning AI biznes yordamchingizman. So'rashingiz mumkin:\n\n"
+                "💰 'Balansim qancha?'\n📈 'Prognoz ko'rsat'\n🏆 'Eng ko\'p sotilgan mahsulotlar'\n"
+                "📦 'Ombor holati'\n👥 'Xodimlar haqida'\n📊 'Tahlil'\n\nYoki o'z savolingizni yozing!")
+
+
+# Tartib - teng ball bo'lganda ustuvorlik
+INTENTS = (Greeting(), Balance(), Forecast(), TopProducts(), Warehouse(), Employees(), Tasks(),
+           Analytics(), Reports(), Help(), Thanks())
+
+NO_DATA_RESPONSE = "📭 Bu bo'yicha hali ma'lumot yo'q."
+
+
+class IntentRouter:
+    """
+    Xabarni intent'ga yo'naltirish
+
+    Connection faqat `needs_db` intent uchun va faqat keshda javob bo'lmasa olinadi.
+    """
+
+    def __init__(self, intents=INTENTS, fallback=Fallback(), cache=answer_cache):
+        self.intents = intents
+        self.fallback = fallback
+        self.cache = cache
+        self._counts = {intent.name: {'hits': 0, 'misses': 0} for intent in intents if intent.needs_db}
+        self._counts_lock = threading.Lock()
+        self._rank = {intent.name: position for position, intent in enumerate(intents)}
+        self._by_name = {intent.name: intent for intent in intents}
+        self._weights = {}
+        keywords = []
+        for intent in intents:
+            for keyword, weight in intent.keywords.items():
+                whole = keyword.startswith('=')
+                text = normalize(keyword.lstrip('='))
+                self._weights[(intent.name, text)] = weight
+                keywords.append((text, intent.name, whole))
+        self.matcher = KeywordMatcher(keywords)
+
+    def scores(self, message):
+        """{intent nomi: ball} - har bir kalit so'z bir marta hisoblanadi"""
+        return {
+            name: sum(self._weights[(name, keyword)] for keyword in set(found))
+            for name, found in self.matcher.match(normalize(message)).items()
+        }
+
+    def classify(self, message):
+        scores = self.scores(message)
+        if not scores:
+            return self.fallback
+        best = max(scores, key=lambda name: (scores[name], -self._rank[name]))
+        return self._by_name[best]
+
+    def _count(self, intent, outcome):
+        with self._counts_lock:
+            self._counts[intent.name][outcome] += 1
+
+    def respond(self, user_id, message, connect=get_db_connection):
+        intent = self.classify(message)
+        if not intent.needs_db:
+            return intent.respond(user_id, None)
+
+        # Kun: "joriy oy", "30 kun" javoblari kun almashganda boshqacha
+        key = (user_id, intent.name, date.today().toordinal(), data_versions.get(user_id, intent.scopes))
+        answer = self.cache.get(key)
+        if answer is not None:
+            self._count(intent, 'hits')
+            return answer
+
+        self._count(intent, 'misses')
+        connection = connect()
+        try:
+            answer = intent.respond(user_id, connection) or NO_DATA_RESPONSE
+        finally:
+            connection.close()
+        self.cache.set(key, answer)
+        return answer
+
+    def stats(self):
+        """Kesh statistikasi va intent bo'yicha hit/miss"""
+        with self._counts_lock:
+            intents = {
+                name: {**counts, 'hit_ratio': round(counts['hits'] / (counts['hits'] + counts['misses']), 4)
+                       if counts['hits'] + counts['misses'] else 0.0}
+                for name, counts in self._counts.items()
+            }
+        return {**self.cache.stats(), 'intents': intents}
+
+
+router = IntentRouter()
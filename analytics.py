@@ -0,0 +1,107 @@
+"""
+Hisobot va analitika bo'limlari
+
+Har bir endpoint o'z bo'limlarini fanout.QuerySpec ro'yxati sifatida e'lon qiladi,
+so'rovlar parallel bajariladi va natija shu yerda javob shakliga keltiriladi.
+"""
+from fanout import QuerySpec, run_queries
+from periods import last_days, trailing_months
+import queries
+
+
+def dashboard_specs(user_id, date_range):
+    """`/api/analytics/dashboard` bo'limlari"""
+    trend_range = last_days(30)
+    return [
+        QuerySpec('financial_metrics', queries.FINANCIAL_METRICS, (user_id, *date_range.params),
+                  fetch='one', default={}),
+        QuerySpec('daily_trends', queries.DAILY_TRENDS, (user_id, *trend_range.params), default=[]),
+        QuerySpec('top_products', queries.TOP_PRODUCTS, (user_id, *trend_range.params), default=[]),
+        QuerySpec('low_stock_alerts', queries.LOW_STOCK_ALERTS, (user_id,), default=[]),
+        QuerySpec('employee_performance', queries.EMPLOYEE_PERFORMANCE, (user_id,), default=[]),
+    ]
+
+
+def build_dashboard(data):
+    """Dashboard javobi: financial_metrics'ga profit_margin qo'shiladi"""
+    financial_metrics = data['financial_metrics'] or {}
+    revenue = financial_metrics.get('revenue') or 0
+    profit = financial_metrics.get('profit') or 0
+    profit_margin = (profit / revenue * 100) if revenue > 0 else 0
+
+    return {
+        'financial_metrics': {
+            **financial_metrics,
+            'profit_margin': round(profit_margin, 2)
+        },
+        'daily_trends': data['daily_trends'],
+        'top_products': data['top_products'],
+        'low_stock_alerts': data['low_stock_alerts'],
+        'employee_performance': data['employee_performance']
+    }
+
+
+def summary_specs(user_id, date_range):
+    """`/api/reports/summary` bo'limlari"""
+    return [
+        QuerySpec('summary', queries.PERIOD_SUMMARY, (user_id, *date_range.params),
+                  fetch='one', default={}),
+        QuerySpec('top_categories', queries.TOP_EXPENSE_CATEGORIES, (user_id, *date_range.params),
+                  default=[]),
+        QuerySpec('warehouse_stats', queries.WAREHOUSE_STATS, (user_id,), fetch='one', default={}),
+    ]
+
+
+def build_summary(data):
+    """Summary javobining 'data' qismi"""
+    return {
+        'summary': data['summary'],
+        'top_categories': data['top_categories'],
+        'warehouse_stats': data['warehouse_stats']
+    }
+
+
+def category_specs(user_id):
+    """`/api/analytics/category-analysis` bo'limlari (oxirgi 3 oy)"""
+    category_range = trailing_months(3)
+    return [
+        QuerySpec('expense_categories', queries.EXPENSE_CATEGORY_STATS,
+                  (user_id, *category_range.params), default=[]),
+        QuerySpec('income_categories', queries.INCOME_CATEGORY_STATS,
+                  (user_id, *category_range.params), default=[]),
+    ]
+
+
+def build_category_analysis(data):
+    """Kategoriya tahlili javobining 'data' qismi"""
+    return {
+        'expense_categories': data['expense_categories'],
+        'income_categories': data['income_categories']
+    }
+
+
+class SectionsFailed(Exception):
+    """Birorta ham bo'lim bajarilmadi"""
+
+
+def require_sections(result, specs):
+    """
+    Raises:
+        SectionsFailed: hamma bo'limlar xato bergan bo'lsa (qisman natija emas, xatolik)
+    """
+    if len(result.failed) == len(specs):
+        raise SectionsFailed('; '.join(f"{name}: {error}" for name, error in result.errors.items()))
+    return result
+
+
+def run_sections(specs):
+    """Bo'limlarni parallel bajarish (thread pool; async versiyasi - asgi_app.run_sections)"""
+    return require_sections(run_queries(specs), specs)
+
+
+def with_partial(payload, result):
+    """Javob konvertiga qisman natija belgilarini qo'shish"""
+    if result.partial:
+        payload['partial'] = True
+        payload['failed_sections'] = result.failed
+    return payload
@@ -1,27 +1,96 @@
 """
 Flask server - Biznes tarifi Mini App backend
 """
-from flask import Flask, render_template, request, jsonify, session, make_response
+from flask import (Blueprint, Flask, Response, current_app, render_template, request, jsonify, session,
+                   make_response, stream_with_context)
 from flask_cors import CORS
+import hmac
+import logging
+import pymysql
+from pymysql.constants import ER
 import os
+from datetime import datetime, timezone
 from dotenv import load_dotenv
-from database import get_db_connection, execute_query
+from cache_store import CacheStore
+from data_version import SCOPES, data_versions, plan_versions
+from database import get_db_connection, execute_query, release_thread_connections
+from export import EXPORTS, FORMATS, export_filename, stream_export
+from periods import range_from_args
+import queries
+from forecasting import forecast_for_user
+from json_provider import FastJSONProvider
+from ai_intents import router as ai_router
+from analytics import (build_category_analysis, build_dashboard, build_summary, category_specs,
+                       dashboard_specs, run_sections, summary_specs, with_partial)
+import assets
+import compression
+import endpoints
+import log_setup
+import metrics
+import query_profiler
+from precompute import serves_snapshot, start_in_process, stats as precompute_stats
+from product_import import READERS, ImportFormatError, ImportSchemaError, detect_format, import_products
+from response_cache import cached_response, invalidates, response_cache
 from telegram_auth import validate_telegram_init_data
+from session_token import SessionTokenSigner
+from stocktake import parse_items, reconcile
 
 load_dotenv()
 
-app = Flask(__name__)
-app.secret_key = os.getenv('SECRET_KEY', 'your-secret-key-change-this')
-CORS(app)
+logger = logging.getLogger(__name__)
 
+# Barcha route'lar shu blueprint'da; Flask ilovasini create_app() yaratadi
+bp = Blueprint('main', __name__)
+
+SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-change-this')
+# Import fayllari uchun chegara; 500KB'dan kattasi werkzeug tomonidan diskka yoziladi
+MAX_CONTENT_LENGTH = int(os.getenv('MAX_UPLOAD_MB', '50')) * 1024 * 1024
 BOT_TOKEN = os.getenv('BOT_TOKEN', '')
 BUSINESS_PLAN_REDIRECT_URL = os.getenv('BUSINESS_PLAN_REDIRECT_URL', 'https://balansai-app.onrender.com')
 DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'  # Development uchun default True
 
+# initData bir marta tekshirilgandan keyin beriladigan qisqa muddatli token
+session_signer = SessionTokenSigner(SECRET_KEY, ttl=int(os.getenv('SESSION_TOKEN_TTL', '900')))
+
+
+def create_app(background=True):
+    """
+    Flask ilovasini yaratish
+
+    Args:
+        background: fon thread'larini (precompute scheduler) shu process'da ishga tushirish.
+            gunicorn preload'da False - master'dagi thread fork'dan keyin worker'ga o'tmaydi,
+            ular gunicorn.conf.py post_fork'da har bir worker'da ishga tushiriladi
+    """
+    log_setup.configure()
+    app = Flask(__name__)
+    app.secret_key = SECRET_KEY
+    app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+    CORS(app)
+    # orjson (bo'lsa): Decimal/datetime jsonify ko'rinishida; metrics.init_app vaqt o'lchaydigan subclass qo'yadi
+    app.json = FastJSONProvider(app)
+    # Blueprint'dan oldin: request vaqti check_telegram_auth'ni ham o'z ichiga oladi
+    metrics.init_app(app)
+    query_profiler.init_app(app)
+    assets.init_app(app)
+    compression.init_app(app)
+    app.register_blueprint(bp)
+
+    if background:
+        # PRECOMPUTE_IN_PROCESS=true bo'lsa, analitika snapshot'lari shu process'da yangilanadi
+        start_in_process()
+    return app
+
+
+@bp.teardown_app_request
+def release_db_connections(exc=None):
+    """Xatolik sabab close() qilinmay qolgan connection'larni pool'ga qaytarish"""
+    release_thread_connections()
+
 # Test user yaratish funksiyasi (development uchun)
 def ensure_test_user_exists(user_id):
     """Test user_id'ni users jadvaliga qo'shadi (agar mavjud bo'lmasa)"""
-    is_development = DEBUG or app.debug or os.getenv('FLASK_ENV') == 'development' or not os.getenv('BOT_TOKEN')
+    is_development = DEBUG or current_app.debug or os.getenv('FLASK_ENV') == 'development' or not os.getenv('BOT_TOKEN')
     if not is_development:
         return
     
@@ -37,121 +106,206 @@ def ensure_test_user_exists(user_id):
                     (user_id, 'test_user', 'Test User', 'business')
                 )
                 connection.commit()
-                print(f"Test user yaratildi/yangilandi: user_id={user_id}, subscription_type=business")
+                logger.info("Test user yaratildi/yangilandi: user_id=%s, subscription_type=business", user_id)
             except Exception as e:
                 # Agar users jadvali mavjud bo'lmasa yoki boshqa xatolik bo'lsa, ignore qilish
-                print(f"Test user yaratishda xatolik (ehtimol users jadvali mavjud emas): {e}")
+                logger.warning("Test user yaratishda xatolik (ehtimol users jadvali mavjud emas): %s", e)
                 connection.rollback()
         connection.close()
     except Exception as e:
         # Database xatoliklarini ignore qilish (development uchun)
-        print(f"Test user tekshirishda xatolik: {e}")
+        logger.warning("Test user tekshirishda xatolik: %s", e)
 
 # User business plan tekshirish
-def check_business_plan(user_id):
-    """User'ning business plan'i borligini tekshirish
-    Business tarifi yoki sinov muddatli business tarifi (business_trial) qabul qilinadi
-    """
+PLAN_CACHE_TTL = int(os.getenv('PLAN_CACHE_TTL', '300'))
+PLAN_CACHE_NEGATIVE_TTL = int(os.getenv('PLAN_CACHE_NEGATIVE_TTL', '30'))
+INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN', '')
+
+# user_id -> (plan versiyasi, {'is_business': bool, 'expires_at': datetime | None})
+# Kesh har bir worker'da alohida; versiya umumiy mmap'da (data_version.plan_versions)
+plan_cache = CacheStore('plan', max_size=int(os.getenv('PLAN_CACHE_SIZE', '50000')))
+_PLAN_MISSING = object()
+
+def _parse_subscription_expires_at(subscription_expires_at):
+    """subscription_expires_at datetime yoki string bo'lishi mumkin"""
+    if not isinstance(subscription_expires_at, str):
+        return subscription_expires_at
+    # Turli formatlarni qo'llab-quvvatlash
+    try:
+        return datetime.strptime(subscription_expires_at, '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        try:
+            return datetime.strptime(subscription_expires_at, '%Y-%m-%d')
+        except ValueError:
+            return datetime.fromisoformat(subscription_expires_at.replace('Z', '+00:00'))
+
+def _now_for(expires_at):
+    """expires_at bilan solishtirish mumkin bo'lgan hozirgi vaqt"""
+    if expires_at.tzinfo:
+        # Timezone bo'lsa, UTC bilan solishtirish
+        return datetime.now(timezone.utc)
+    return datetime.now()
+
+def _load_subscription(user_id):
+    """users jadvalidan obunani o'qib, kesh uchun tayyor yozuv qaytaradi (None - user yo'q)"""
+    connection = get_db_connection()
     try:
-        connection = get_db_connection()
         with connection.cursor() as cursor:
             # subscription_type va subscription_expires_at ni olish
             cursor.execute(
-                """SELECT subscription_type, subscription_expires_at 
-                   FROM users WHERE user_id = %s""",
+                queries.USER_SUBSCRIPTION,
                 (user_id,)
             )
             result = cursor.fetchone()
+    finally:
         connection.close()
 
-        if not result:
+    if not result:
+        return None
+
+    subscription_type = result.get('subscription_type')
+    subscription_expires_at = result.get('subscription_expires_at')
+
+    logger.debug("Obuna: user_id=%s, subscription_type=%s, subscription_expires_at=%s",
+                 user_id, subscription_type, subscription_expires_at)
+
+    # Business tarifi yoki sinov muddatli business tarifi
+    # subscription_type 'business', 'business_trial' yoki boshqa formatda bo'lishi mumkin
+    is_business_type = bool(subscription_type) and (
+        subscription_type.lower() in ['business', 'business_trial', 'trial'] or
+        'business' in subscription_type.lower()
+    )
+
+    expires_at = None
+    if is_business_type and subscription_expires_at:
+        try:
+            expires_at = _parse_subscription_expires_at(subscription_expires_at)
+        except Exception as e:
+            # Xatolik bo'lsa, ruxsat berish (muddat tekshirilmaydi)
+            logger.warning("Muddat tekshirishda xatolik: %s, subscription_expires_at: %s", e, subscription_expires_at)
+
+    return {'is_business': is_business_type, 'expires_at': expires_at}
+
+def _plan_cache_ttl(plan):
+    """Kesh yozuvi muddati: obuna tugaydigan paytdan oshmaydi"""
+    if not plan or not plan['is_business']:
+        return PLAN_CACHE_NEGATIVE_TTL
+    expires_at = plan['expires_at']
+    if expires_at is None:
+        return PLAN_CACHE_TTL
+    remaining = (expires_at - _now_for(expires_at)).total_seconds()
+    return max(0, min(PLAN_CACHE_TTL, remaining))
+
+def _cached_plan(user_id, load=True):
+    """
+    Keshdagi obuna yozuvi; versiya o'zgargan bo'lsa (boshqa worker invalidate qilgan) - qayta o'qiladi
+
+    load=False - database'ga murojaat qilinmaydi, kesh bo'lmasa _PLAN_MISSING
+    """
+    version = plan_versions.get(user_id, ('plan',))
+    entry = plan_cache.get(user_id, _PLAN_MISSING)
+    if entry is not _PLAN_MISSING and entry[0] == version:
+        return entry[1]
+    if not load:
+        return _PLAN_MISSING
+    # Versiya o'qishdan oldin olinadi: o'qish paytidagi invalidate keyingi so'rovda ko'rinadi
+    plan = _load_subscription(user_id)
+    plan_cache.set(user_id, (version, plan), ttl=_plan_cache_ttl(plan))
+    return plan
+
+@metrics.timed('plan')
+def check_business_plan(user_id):
+    """User'ning business plan'i borligini tekshirish
+    Business tarifi yoki sinov muddatli business tarifi (business_trial) qabul qilinadi
+    Natija `plan_cache` da saqlanadi, obuna o'zgarganda `invalidate_plan_cache` chaqiriladi
+    """
+    try:
+        plan = _cached_plan(user_id)
+
+        if not plan or not plan['is_business']:
             return False
-        
-        subscription_type = result.get('subscription_type')
-        subscription_expires_at = result.get('subscription_expires_at')
-        
-        # Debug: subscription_type va muddatni ko'rsatish
-        print(f"DEBUG: user_id={user_id}, subscription_type={subscription_type}, subscription_expires_at={subscription_expires_at}")
-        
-        # Business tarifi yoki sinov muddatli business tarifi
-        # subscription_type 'business', 'business_trial' yoki boshqa formatda bo'lishi mumkin
-        is_business_type = subscription_type and (
-            subscription_type.lower() in ['business', 'business_trial', 'trial'] or
-            'business' in subscription_type.lower()
-        )
-        
-        if is_business_type:
-            # Agar muddat belgilangan bo'lsa, tekshirish
-            if subscription_expires_at:
-                from datetime import datetime
-                try:
-                    # subscription_expires_at datetime yoki string bo'lishi mumkin
-                    if isinstance(subscription_expires_at, str):
-                        # Turli formatlarni qo'llab-quvvatlash
-                        try:
-                            expires_at = datetime.strptime(subscription_expires_at, '%Y-%m-%d %H:%M:%S')
-                        except:
-                            try:
-                                expires_at = datetime.strptime(subscription_expires_at, '%Y-%m-%d')
-                            except:
-                                expires_at = datetime.fromisoformat(subscription_expires_at.replace('Z', '+00:00'))
-                    else:
-                        expires_at = subscription_expires_at
-                    
-                    # Hozirgi vaqt bilan solishtirish
-                    now = datetime.now()
-                    if expires_at.tzinfo:
-                        # Timezone bo'lsa, local time'ga o'tkazish
-                        from datetime import timezone
-                        now = datetime.now(timezone.utc)
-                    
-                    if expires_at >= now:
-                        return True  # Muddat hali tugamagan
-                    else:
-                        print(f"Business plan muddati tugagan: {expires_at} < {now}")
-                        return False  # Muddat tugagan
-                except Exception as e:
-                    print(f"Muddat tekshirishda xatolik: {e}, subscription_expires_at: {subscription_expires_at}")
-                    # Xatolik bo'lsa, subscription_type'ga qarab qaytarish (xavfsizlik uchun)
-                    return True  # Xatolik bo'lsa, ruxsat berish
-            else:
-                # Muddat belgilanmagan, subscription_type'ga qarab qaytarish
-                return True
-        
-        return False
+
+        expires_at = plan['expires_at']
+        if expires_at is None:
+            # Muddat belgilanmagan, subscription_type'ga qarab qaytarish
+            return True
+
+        now = _now_for(expires_at)
+        if expires_at >= now:
+            return True  # Muddat hali tugamagan
+        logger.debug("Business plan muddati tugagan: %s < %s", expires_at, now)
+        return False  # Muddat tugagan
     except Exception as e:
-        print(f"Business plan tekshirishda xatolik: {e}")
+        logger.error("Business plan tekshirishda xatolik: %s", e)
         # Development mode'da hamma user'ga ruxsat berish
         return DEBUG
 
+def get_plan_expires_at(user_id):
+    """Obuna tugash vaqti (unix timestamp) yoki None; keshda bo'lmasa database'dan o'qiladi"""
+    try:
+        plan = _cached_plan(user_id)
+    except Exception as e:
+        logger.error("Obuna muddatini o'qishda xatolik: %s", e)
+        return None
+    if not plan or not plan['expires_at']:
+        return None
+    return plan['expires_at'].timestamp()
+
+def invalidate_plan_cache(user_id=None):
+    """
+    Bot tarifni o'zgartirganda chaqiriladi (user_id=None - hammasi)
+
+    Versiya oshiriladi - boshqa worker'lar keyingi so'rovda obunani qayta o'qiydi.
+    Qaytariladi: joriy worker keshidan o'chirilgan yozuvlar soni
+    """
+    if user_id is None:
+        plan_versions.bump_all()
+        return plan_cache.clear()
+    plan_versions.bump(user_id, ('plan',))
+    return int(plan_cache.delete(user_id))
+
 # Xatolarni boshqarish funksiyasi
 def handle_api_error(error, default_message="Xatolik yuz berdi"):
     """API xatolarini boshqarish"""
-    error_message = str(error) if error else default_message
-    print(f"API xatolik: {error_message}")
-    
-    # Database xatoliklari
-    if "connection" in error_message.lower() or "database" in error_message.lower():
-        return jsonify({
-            'success': False, 
-            'error': 'Ma\'lumotlar bazasi bilan bog\'lanishda xatolik'
-        }), 500
-    
-    # Validation xatoliklari
-    if "required" in error_message.lower() or "invalid" in error_message.lower():
-        return jsonify({
-            'success': False, 
-            'error': error_message
-        }), 400
-    
-    # Umumiy xatolik
-    return jsonify({
-        'success': False, 
-        'error': default_message if DEBUG else 'Xatolik yuz berdi'
-    }), 500
+    payload, status = endpoints.error_payload(error, default_message, DEBUG)
+    return jsonify(payload), status
+
+def no_business_plan_response():
+    """Business plan bo'lmagan user uchun 403 javob"""
+    return jsonify(endpoints.no_business_plan_payload(BUSINESS_PLAN_REDIRECT_URL)), 403
+
+def fetch_list(query, columnar=False):
+    """
+    Ro'yxat so'rovini bajarib javob payload'ini qaytarish
+
+    columnar: tuple cursor - qatorlar dict'ga aylantirilmaydi (endpoints.columnar_payload)
+    """
+    connection = get_db_connection()
+    with connection.cursor(pymysql.cursors.Cursor if columnar else None) as cursor:
+        cursor.execute(query.sql, query.params)
+        rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description] if columnar else None
+    connection.close()
+    if columnar:
+        return endpoints.columnar_payload(query, columns, rows)
+    return endpoints.list_payload(query, rows)
+
+def duplicate_barcode_response():
+    """(user_id, barcode) UNIQUE kaliti buzilganda"""
+    return jsonify({'success': False, 'error': 'Bu shtrix-kod bilan mahsulot allaqachon mavjud'}), 409
+
+def set_session_user(user_id, username, has_business_plan):
+    """Session'ni faqat qiymat o'zgarganda yangilash (cookie har safar qayta imzolanmaydi)"""
+    if session.get('user_id') != user_id:
+        session['user_id'] = user_id
+    if session.get('username') != username:
+        session['username'] = username
+    if session.get('has_business_plan') != has_business_plan:
+        session['has_business_plan'] = has_business_plan
 
 # Middleware: Telegram auth tekshirish
-@app.before_request
+@bp.before_app_request
+@metrics.timed('auth')
 def check_telegram_auth():
     """Har bir request'da Telegram auth'ni tekshirish"""
     # Static fayllar uchun auth talab qilinmaydi
@@ -163,7 +317,7 @@ def check_telegram_auth():
         init_data = request.headers.get('X-Telegram-Init-Data') or request.args.get('initData')
 
         # Development mode: Agar initData bo'lmasa
-        is_development = DEBUG or app.debug or os.getenv('FLASK_ENV') == 'development' or not os.getenv('BOT_TOKEN')
+        is_development = DEBUG or current_app.debug or os.getenv('FLASK_ENV') == 'development' or not os.getenv('BOT_TOKEN')
 
         if init_data:
             try:
@@ -259,7 +413,7 @@ def check_telegram_auth():
                     return make_response(redirect_html), 403
 
             except (ValueError, Exception) as e:
-                print(f"Telegram auth xatoligi: {{e}}")
+                logger.warning("Telegram auth xatoligi: %s", e)
                 # Development mode
                 if is_development:
                     test_user_id = 123456789
@@ -377,22 +531,37 @@ def check_telegram_auth():
     if not request.path.startswith('/api/'):
         return None
 
+    # Sessiya tokeni: initData HMAC va plan tekshiruvi qayta bajarilmaydi.
+    # Yangi token faqat initData bilan beriladi - token o'zini o'zi uzaytira olmaydi
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer ') and request.path != '/api/auth/session':
+        try:
+            claims = session_signer.verify(auth_header[7:])
+        except ValueError as e:
+            # Token yaroqsiz bo'lsa, initData orqali tekshirishga o'tiladi
+            logger.info("Sessiya tokeni xatoligi: %s", e)
+        else:
+            set_session_user(claims['user_id'], claims['username'], claims['has_business_plan'])
+            if not claims['has_business_plan'] and request.path != '/api/check-plan':
+                return no_business_plan_response()
+            return None
+
     init_data = request.headers.get('X-Telegram-Init-Data') or request.args.get('initData')
 
     # Development mode: Agar initData bo'lmasa, test user_id bilan ishlash
     if not init_data:
         # Development uchun test user_id (production'da o'chirilishi kerak)
         # Local development uchun har doim ruxsat berish
-        is_development = DEBUG or app.debug or os.getenv('FLASK_ENV') == 'development' or not os.getenv('BOT_TOKEN')
+        is_development = DEBUG or current_app.debug or os.getenv('FLASK_ENV') == 'development' or not os.getenv('BOT_TOKEN')
         if is_development:
             test_user_id = 123456789
             ensure_test_user_exists(test_user_id)
             session['user_id'] = test_user_id
             session['username'] = 'test_user'
             session['has_business_plan'] = True  # Development'da hamma ruxsat
-            print("Development mode: test user yaratildi")
+            logger.debug("Development mode: test user yaratildi")
             return None
-        print("Production mode: initData yo'q, 401 qaytarilmoqda")
+        logger.warning("Production mode: initData yo'q, 401 qaytarilmoqda")
         return jsonify({'error': 'Telegram auth talab qilinadi', 'redirect': BUSINESS_PLAN_REDIRECT_URL}), 401
 
     try:
@@ -405,43 +574,37 @@ def check_telegram_auth():
         has_business_plan = check_business_plan(user_id)
         session['has_business_plan'] = has_business_plan
 
-        print(f"API request: user_id={user_id}, has_business_plan={has_business_plan}, path={request.path}")
+        logger.debug("API request: user_id=%s, has_business_plan=%s, path=%s", user_id, has_business_plan, request.path)
 
         # Agar business plan bo'lmasa, faqat check-plan endpoint'ga ruxsat
         if not has_business_plan and request.path != '/api/check-plan':
-            print(f"Business plan yo'q: user_id={user_id}, redirect={BUSINESS_PLAN_REDIRECT_URL}")
-            return jsonify({
-                'success': False,
-                'error': 'Bu ilova faqat Biznes tarifi uchun. Iltimos, Biznes tarifiga o\'ting.',
-                'redirect': BUSINESS_PLAN_REDIRECT_URL,
-                'has_business_plan': False
-            }), 403
+            logger.info("Business plan yo'q: user_id=%s", user_id)
+            return no_business_plan_response()
 
     except ValueError as e:
-        print(f"Telegram validatsiya xatoligi: {e}")
+        logger.warning("Telegram validatsiya xatoligi: %s", e)
         # Development mode: Agar validatsiya muvaffaqiyatsiz bo'lsa, test user_id bilan ishlash
-        is_development = DEBUG or app.debug or os.getenv('FLASK_ENV') == 'development' or not os.getenv('BOT_TOKEN')
+        is_development = DEBUG or current_app.debug or os.getenv('FLASK_ENV') == 'development' or not os.getenv('BOT_TOKEN')
         if is_development:
             test_user_id = 123456789
             ensure_test_user_exists(test_user_id)
             session['user_id'] = test_user_id
             session['username'] = 'test_user'
             session['has_business_plan'] = True
-            print("Development mode: validatsiya xatoligi, test user yaratildi")
+            logger.debug("Development mode: validatsiya xatoligi, test user yaratildi")
             return None
         return jsonify({'error': 'Telegram autentifikatsiya xatoligi', 'redirect': BUSINESS_PLAN_REDIRECT_URL}), 401
 
 # ==================== ROUTES ====================
 
-@app.route('/api/check-plan', methods=['GET'])
+@bp.route('/api/check-plan', methods=['GET'])
 def check_plan():
     """User'ning business plan'ini tekshirish"""
     try:
         user_id = session.get('user_id')
-        print(f"DEBUG /api/check-plan: user_id={user_id}")
 
         if not user_id:
-            print("DEBUG /api/check-plan: user_id yo'q, has_business_plan=False qaytarilmoqda")
+            logger.debug("/api/check-plan: user_id yo'q, has_business_plan=False qaytarilmoqda")
             return jsonify({
                 'success': True,
                 'has_business_plan': False,
@@ -449,7 +612,7 @@ def check_plan():
             }), 200
 
         has_plan = check_business_plan(user_id)
-        print(f"DEBUG /api/check-plan: user_id={user_id}, has_business_plan={has_plan}")
+        logger.debug("/api/check-plan: user_id=%s, has_business_plan=%s", user_id, has_plan)
 
         return jsonify({
             'success': True,
@@ -457,14 +620,140 @@ def check_plan():
             'redirect': BUSINESS_PLAN_REDIRECT_URL if not has_plan else None
         })
     except Exception as e:
-        print(f"ERROR /api/check-plan: {e}")
         return handle_api_error(e, 'Business plan tekshirishda xatolik')
 
-@app.route('/')
-@app.route('/warehouse')
-@app.route('/reports')
-@app.route('/employees')
-@app.route('/ai-chat')
+@bp.route('/api/auth/session', methods=['POST'])
+def create_session_token():
+    """
+    initData'ni sessiya tokeniga almashtirish (keyingi so'rovlar Bearer token bilan)
+
+    check_telegram_auth bu yo'lda Bearer token'ni qabul qilmaydi: user initData'dan,
+    obuna database'dan (plan keshi) olinadi
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'error': 'Foydalanuvchi topilmadi'}), 401
+
+    has_business_plan = check_business_plan(user_id)
+    plan_expires_at = get_plan_expires_at(user_id)
+    # Eski token ham yuborilgan bo'lsa - yangisi undagi obuna muddatidan uzoq yashamaydi
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        try:
+            presented = session_signer.verify(auth_header[7:])
+        except ValueError:
+            presented = None
+        if presented and presented['plan_expires_at'] is not None:
+            plan_expires_at = min(plan_expires_at if plan_expires_at is not None else float('inf'),
+                                  presented['plan_expires_at'])
+
+    token = session_signer.issue(
+        user_id,
+        username=session.get('username'),
+        has_business_plan=has_business_plan,
+        plan_expires_at=plan_expires_at
+    )
+    return jsonify({'success': True, 'data': token})
+
+# ===== INTERNAL API (bot va monitoring uchun) =====
+
+def check_internal_token():
+    """X-Internal-Token header'ini INTERNAL_API_TOKEN bilan solishtirish"""
+    token = request.headers.get('X-Internal-Token', '')
+    return bool(INTERNAL_API_TOKEN) and hmac.compare_digest(token, INTERNAL_API_TOKEN)
+
+@bp.route('/internal/plan-cache/invalidate', methods=['POST'])
+def internal_invalidate_plan_cache():
+    """Bot tarifni o'zgartirganda plan keshini tozalash"""
+    if not check_internal_token():
+        return jsonify({'success': False, 'error': 'Ruxsat yo\'q'}), 403
+
+    data = request.get_json(silent=True) or {}
+    if data.get('all'):
+        removed = invalidate_plan_cache()
+    elif data.get('user_id'):
+        try:
+            user_id = int(data.get('user_id'))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'user_id invalid'}), 400
+        removed = invalidate_plan_cache(user_id)
+    else:
+        return jsonify({'success': False, 'error': 'user_id yoki all talab qilinadi'}), 400
+
+    return jsonify({'success': True, 'removed': removed})
+
+@bp.route('/internal/plan-cache/stats', methods=['GET'])
+def internal_plan_cache_stats():
+    """Plan keshi hit/miss statistikasi"""
+    if not check_internal_token():
+        return jsonify({'success': False, 'error': 'Ruxsat yo\'q'}), 403
+    return jsonify({'success': True, 'data': plan_cache.stats()})
+
+@bp.route('/internal/data-version/bump', methods=['POST'])
+def internal_bump_data_version():
+    """Bot user ma'lumotlarini yozganda (masalan, tranzaksiya) javob keshini eskirtirish"""
+    if not check_internal_token():
+        return jsonify({'success': False, 'error': 'Ruxsat yo\'q'}), 403
+
+    data = request.get_json(silent=True) or {}
+    scopes = data.get('scopes') or ['transactions']
+    if not isinstance(scopes, list) or any(scope not in SCOPES for scope in scopes):
+        return jsonify({'success': False, 'error': f"scopes invalid, mumkin: {', '.join(SCOPES)}"}), 400
+
+    if data.get('all'):
+        data_versions.bump_all()
+    elif data.get('user_id'):
+        try:
+            user_id = int(data.get('user_id'))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'user_id invalid'}), 400
+        data_versions.bump(user_id, scopes)
+    else:
+        return jsonify({'success': False, 'error': 'user_id yoki all talab qilinadi'}), 400
+
+    return jsonify({'success': True})
+
+@bp.route('/internal/response-cache/stats', methods=['GET'])
+def internal_response_cache_stats():
+    """Javob keshi hit/miss statistikasi"""
+    if not check_internal_token():
+        return jsonify({'success': False, 'error': 'Ruxsat yo\'q'}), 403
+    return jsonify({'success': True, 'data': response_cache.stats()})
+
+@bp.route('/internal/ai-cache/stats', methods=['GET'])
+def internal_ai_cache_stats():
+    """AI chat javob keshi: umumiy va intent bo'yicha hit rate"""
+    if not check_internal_token():
+        return jsonify({'success': False, 'error': 'Ruxsat yo\'q'}), 403
+    return jsonify({'success': True, 'data': ai_router.stats()})
+
+@bp.route('/internal/query-stats', methods=['GET'])
+def internal_query_stats():
+    """SQL fingerprint statistikasi, sekin so'rovlar va N+1 (barcha worker'lar)"""
+    if not check_internal_token():
+        return jsonify({'success': False, 'error': 'Ruxsat yo\'q'}), 403
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit invalid'}), 400
+    try:
+        data = query_profiler.stats(sort=request.args.get('sort', 'total'), limit=limit)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'data': data})
+
+@bp.route('/internal/precompute/stats', methods=['GET'])
+def internal_precompute_stats():
+    """Snapshot hit/miss va (worker ichida bo'lsa) scheduler holati"""
+    if not check_internal_token():
+        return jsonify({'success': False, 'error': 'Ruxsat yo\'q'}), 403
+    return jsonify({'success': True, 'data': precompute_stats()})
+
+@bp.route('/')
+@bp.route('/warehouse')
+@bp.route('/reports')
+@bp.route('/employees')
+@bp.route('/ai-chat')
 def index():
     """SPA - Barcha sahifalar bitta HTML faylda"""
     response = make_response(render_template('index.html'))
@@ -476,27 +765,26 @@ def index():
 
 # ===== WAREHOUSE API =====
 
-@app.route('/api/warehouse/products', methods=['GET'])
+@bp.route('/api/warehouse/products', methods=['GET'])
 def get_products():
     """Barcha mahsulotlarni olish"""
     user_id = session.get('user_id')
     if not user_id:
         return jsonify({'success': False, 'error': 'Foydalanuvchi topilmadi'}), 401
-    
+
     try:
-        connection = get_db_connection()
-        with connection.cursor() as cursor:
-            cursor.execute(
-                "SELECT * FROM warehouse_products WHERE user_id = %s ORDER BY created_at DESC",
-                (user_id,)
-            )
-            products = cursor.fetchall()
-        connection.close()
-        return jsonify({'success': True, 'data': products or []})
+        query = endpoints.products_query(user_id, request.args)
+        columnar = endpoints.wants_columnar(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    try:
+        return jsonify(fetch_list(query, columnar))
     except Exception as e:
         return handle_api_error(e, 'Mahsulotlarni yuklashda xatolik')
 
-@app.route('/api/warehouse/products', methods=['POST'])
+@bp.route('/api/warehouse/products', methods=['POST'])
+@invalidates('warehouse')
 def create_product():
     """Yangi mahsulot yaratish"""
     user_id = session.get('user_id')
@@ -515,15 +803,20 @@ def create_product():
             """INSERT INTO warehouse_products 
                (user_id, name, category, barcode, price, quantity, min_quantity, unit, image_url)
                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-            (user_id, data.get('name'), data.get('category'), data.get('barcode'),
+            (user_id, data.get('name'), data.get('category'), data.get('barcode') or None,
              data.get('price', 0), data.get('quantity', 0), data.get('min_quantity', 0),
              data.get('unit', 'dona'), data.get('image_url'))
         )
         return jsonify({'success': True, 'data': {'id': product_id}})
+    except pymysql.err.IntegrityError as e:
+        if e.args and e.args[0] == ER.DUP_ENTRY:
+            return duplicate_barcode_response()
+        return handle_api_error(e, 'Mahsulot yaratishda xatolik')
     except Exception as e:
         return handle_api_error(e, 'Mahsulot yaratishda xatolik')
 
-@app.route('/api/warehouse/products/<int:product_id>', methods=['PUT'])
+@bp.route('/api/warehouse/products/<int:product_id>', methods=['PUT'])
+@invalidates('warehouse')
 def update_product(product_id):
     """Mahsulotni yangilash"""
     user_id = session.get('user_id')
@@ -541,15 +834,20 @@ def update_product(product_id):
                    quantity = %s, min_quantity = %s, unit = %s, image_url = %s,
                    updated_at = NOW()
                WHERE id = %s AND user_id = %s""",
-            (data.get('name'), data.get('category'), data.get('barcode'),
+            (data.get('name'), data.get('category'), data.get('barcode') or None,
              data.get('price'), data.get('quantity'), data.get('min_quantity'),
              data.get('unit'), data.get('image_url'), product_id, user_id)
         )
         return jsonify({'success': True})
+    except pymysql.err.IntegrityError as e:
+        if e.args and e.args[0] == ER.DUP_ENTRY:
+            return duplicate_barcode_response()
+        return handle_api_error(e, 'Mahsulotni yangilashda xatolik')
     except Exception as e:
         return handle_api_error(e, 'Mahsulotni yangilashda xatolik')
 
-@app.route('/api/warehouse/products/<int:product_id>', methods=['DELETE'])
+@bp.route('/api/warehouse/products/<int:product_id>', methods=['DELETE'])
+@invalidates('warehouse')
 def delete_product(product_id):
     """Mahsulotni o'chirish"""
     user_id = session.get('user_id')
@@ -565,44 +863,26 @@ def delete_product(product_id):
     except Exception as e:
         return handle_api_error(e, 'Mahsulotni o\'chirishda xatolik')
 
-@app.route('/api/warehouse/movements', methods=['GET'])
+@bp.route('/api/warehouse/movements', methods=['GET'])
 def get_movements():
     """Ombor harakatlarini olish"""
     user_id = session.get('user_id')
     if not user_id:
         return jsonify({'success': False, 'error': 'Foydalanuvchi topilmadi'}), 401
-    
-    product_id = request.args.get('product_id')
-    
+
     try:
-        connection = get_db_connection()
-        with connection.cursor() as cursor:
-            if product_id:
-                cursor.execute(
-                    """SELECT wm.*, wp.name as product_name 
-                       FROM warehouse_movements wm
-                       JOIN warehouse_products wp ON wm.product_id = wp.id
-                       WHERE wm.user_id = %s AND wm.product_id = %s
-                       ORDER BY wm.created_at DESC""",
-                    (user_id, product_id)
-                )
-            else:
-                cursor.execute(
-                    """SELECT wm.*, wp.name as product_name 
-                       FROM warehouse_movements wm
-                       JOIN warehouse_products wp ON wm.product_id = wp.id
-                       WHERE wm.user_id = %s
-                       ORDER BY wm.created_at DESC
-                       LIMIT 100""",
-                    (user_id,)
-                )
-            movements = cursor.fetchall()
-        connection.close()
-        return jsonify({'success': True, 'data': movements or []})
+        query = endpoints.movements_query(user_id, request.args)
+        columnar = endpoints.wants_columnar(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    try:
+        return jsonify(fetch_list(query, columnar))
     except Exception as e:
         return handle_api_error(e, 'Ombor harakatlarini yuklashda xatolik')
 
-@app.route('/api/warehouse/movements', methods=['POST'])
+@bp.route('/api/warehouse/movements', methods=['POST'])
+@invalidates('warehouse')
 def create_movement():
     """Yangi ombor harakati yaratish"""
     user_id = session.get('user_id')
@@ -646,132 +926,172 @@ def create_movement():
     except Exception as e:
         return handle_api_error(e, 'Ombor harakati yaratishda xatolik')
 
-# ===== TRANSACTIONS API =====
+@bp.route('/api/warehouse/stocktake', methods=['POST'])
+@invalidates('warehouse')
+def stocktake():
+    """Inventarizatsiya: sanalgan qoldiqlarni bitta tranzaksiyada ombor bilan tenglashtirish"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'error': 'Foydalanuvchi topilmadi'}), 401
+    
+    data = request.json
+    if not data:
+        return jsonify({'success': False, 'error': 'Ma\'lumotlar topilmadi'}), 400
+    
+    try:
+        rows = parse_items(data.get('items'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    try:
+        connection = get_db_connection()
+        try:
+            report = reconcile(connection, user_id, rows, dry_run=bool(data.get('dry_run')))
+        finally:
+            connection.close()
+        return jsonify({'success': True, 'data': report})
+    except Exception as e:
+        return handle_api_error(e, 'Inventarizatsiyada xatolik')
 
-@app.route('/api/transactions', methods=['GET'])
-def get_transactions():
-    """Tranzaksiyalarni olish"""
+@bp.route('/api/warehouse/products/import', methods=['POST'])
+@invalidates('warehouse')
+def import_products_api():
+    """Mahsulotlarni CSV/XLSX fayldan import qilish (barcode bo'yicha upsert)"""
     user_id = session.get('user_id')
     if not user_id:
         return jsonify({'success': False, 'error': 'Foydalanuvchi topilmadi'}), 401
     
-    limit = request.args.get('limit', 50, type=int)
-    if limit > 1000:
-        limit = 1000  # Maximum limit
+    upload = request.files.get('file')
+    if not upload:
+        return jsonify({'success': False, 'error': 'file required (multipart/form-data)'}), 400
+    
+    try:
+        fmt = detect_format(upload.filename, request.form.get('format'))
+    except ImportFormatError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    dry_run = request.form.get('dry_run', '').lower() in ('1', 'true', 'yes')
     
     try:
         connection = get_db_connection()
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """SELECT * FROM transactions 
-                   WHERE user_id = %s 
-                   ORDER BY created_at DESC 
-                   LIMIT %s""",
-                (user_id, limit)
-            )
-            transactions = cursor.fetchall()
-        connection.close()
-        return jsonify({'success': True, 'data': transactions or []})
+        try:
+            # Katta fayllar werkzeug tomonidan diskka yoziladi; bu yerda qatorma-qator o'qiladi
+            report = import_products(connection, user_id, READERS[fmt](upload.stream), dry_run=dry_run)
+        finally:
+            connection.close()
+        return jsonify({'success': True, 'data': report})
+    except ImportFormatError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except ImportSchemaError as e:
+        logger.error("Import: %s", e)
+        return jsonify({'success': False, 'error': 'Import vaqtincha ishlamayapti (database migratsiyasi kerak)'}), 503
+    except Exception as e:
+        return handle_api_error(e, 'Import qilishda xatolik')
+
+# ===== TRANSACTIONS API =====
+
+@bp.route('/api/transactions', methods=['GET'])
+def get_transactions():
+    """Tranzaksiyalarni olish"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'error': 'Foydalanuvchi topilmadi'}), 401
+
+    try:
+        query = endpoints.transactions_query(user_id, request.args)
+        columnar = endpoints.wants_columnar(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    try:
+        return jsonify(fetch_list(query, columnar))
     except Exception as e:
         return handle_api_error(e, 'Tranzaksiyalarni yuklashda xatolik')
 
+@bp.route('/api/export/<table>', methods=['GET'])
+def export_table(table):
+    """Jadvalni CSV yoki NDJSON sifatida stream qilish"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'error': 'Foydalanuvchi topilmadi'}), 401
+    
+    if table not in EXPORTS:
+        return jsonify({'success': False, 'error': 'Bu jadvalni eksport qilib bo\'lmaydi'}), 404
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        return jsonify({'success': False, 'error': 'format: csv yoki ndjson'}), 400
+    
+    # Filtr berilmasa - barcha qatorlar
+    date_range = None
+    if any(request.args.get(name) for name in ('from', 'to', 'period')):
+        try:
+            date_range = range_from_args(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+    
+    response = Response(
+        stream_with_context(stream_export(table, user_id, fmt, date_range)),
+        mimetype=FORMATS[fmt]
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{export_filename(table, fmt, date_range)}"'
+    response.headers['Cache-Control'] = 'no-store'
+    # nginx/Render proxy javobni to'plab turmasin
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 # ===== REPORTS API =====
 
-@app.route('/api/reports/summary', methods=['GET'])
+# Hisobot/analitika xom transactions o'rniga transactions_daily rollup'ini o'qiydi
+# (migrations/001_transactions_daily.sql, to'ldirish: python rollup.py rebuild)
+
+@bp.route('/api/reports/summary', methods=['GET'])
+@cached_response(scopes=('transactions', 'warehouse'))
+@serves_snapshot('summary')
 def get_reports_summary():
     """Hisobotlar summary"""
     user_id = session.get('user_id')
     if not user_id:
         return jsonify({'success': False, 'error': 'Foydalanuvchi topilmadi'}), 401
     
-    period = request.args.get('period', 'month')  # day, week, month, year
-    if period not in ['day', 'week', 'month', 'year']:
-        period = 'month'
-    
+    # Period: day, week, month, year yoki from/to oralig'i
     try:
-        connection = get_db_connection()
-        with connection.cursor() as cursor:
-            # Period uchun date filter
-            date_filters = {
-                'day': "DATE(created_at) = CURDATE()",
-                'week': "YEARWEEK(created_at) = YEARWEEK(NOW())",
-                'month': "YEAR(created_at) = YEAR(NOW()) AND MONTH(created_at) = MONTH(NOW())",
-                'year': "YEAR(created_at) = YEAR(NOW())"
-            }
-            date_filter = date_filters.get(period, date_filters['month'])
-            
-            # Income va Expense
-            cursor.execute(
-                f"""SELECT 
-                    SUM(CASE WHEN transaction_type = 'income' THEN amount ELSE 0 END) as total_income,
-                    SUM(CASE WHEN transaction_type = 'expense' THEN amount ELSE 0 END) as total_expense,
-                    COUNT(*) as transaction_count
-                   FROM transactions
-                   WHERE user_id = %s AND {date_filter}""",
-                (user_id,)
-            )
-            summary = cursor.fetchone()
-            
-            # Top categories
-            cursor.execute(
-                f"""SELECT category, SUM(amount) as total
-                   FROM transactions
-                   WHERE user_id = %s AND transaction_type = 'expense' AND {date_filter}
-                   GROUP BY category
-                   ORDER BY total DESC
-                   LIMIT 5""",
-                (user_id,)
-            )
-            top_categories = cursor.fetchall()
-            
-            # Warehouse stats
-            cursor.execute(
-                """SELECT 
-                    COUNT(*) as total_products,
-                    SUM(quantity * price) as total_value,
-                    SUM(CASE WHEN quantity <= min_quantity THEN 1 ELSE 0 END) as low_stock_count
-                   FROM warehouse_products
-                   WHERE user_id = %s""",
-                (user_id,)
-            )
-            warehouse_stats = cursor.fetchone()
-            
-        connection.close()
-        
-        return jsonify({
+        date_range = range_from_args(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    try:
+        # Summary, top kategoriyalar va ombor statistikasi parallel
+        result = run_sections(summary_specs(user_id, date_range))
+        return jsonify(with_partial({
             'success': True,
-            'data': {
-                'summary': summary or {},
-                'top_categories': top_categories or [],
-                'warehouse_stats': warehouse_stats or {}
-            }
-        })
+            'data': build_summary(result.data)
+        }, result))
     except Exception as e:
         return handle_api_error(e, 'Hisobotlarni yuklashda xatolik')
 
 # ===== EMPLOYEES API =====
 
-@app.route('/api/employees', methods=['GET'])
+@bp.route('/api/employees', methods=['GET'])
 def get_employees():
     """Barcha xodimlarni olish"""
     user_id = session.get('user_id')
     if not user_id:
         return jsonify({'success': False, 'error': 'Foydalanuvchi topilmadi'}), 401
-    
+
     try:
-        connection = get_db_connection()
-        with connection.cursor() as cursor:
-            cursor.execute(
-                "SELECT * FROM business_employees WHERE owner_id = %s ORDER BY created_at DESC",
-                (user_id,)
-            )
-            employees = cursor.fetchall()
-        connection.close()
-        return jsonify({'success': True, 'data': employees or []})
+        query = endpoints.employees_query(user_id, request.args)
+        columnar = endpoints.wants_columnar(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    try:
+        return jsonify(fetch_list(query, columnar))
     except Exception as e:
         return handle_api_error(e, 'Xodimlarni yuklashda xatolik')
 
-@app.route('/api/employees', methods=['POST'])
+@bp.route('/api/employees', methods=['POST'])
+@invalidates('employees')
 def create_employee():
     """Yangi xodim qo'shish"""
     user_id = session.get('user_id')
@@ -795,7 +1115,8 @@ def create_employee():
     except Exception as e:
         return handle_api_error(e, 'Xodim yaratishda xatolik')
 
-@app.route('/api/employees/<int:employee_id>', methods=['PUT'])
+@bp.route('/api/employees/<int:employee_id>', methods=['PUT'])
+@invalidates('employees')
 def update_employee(employee_id):
     """Xodimni yangilash"""
     user_id = session.get('user_id')
@@ -817,7 +1138,8 @@ def update_employee(employee_id):
     except Exception as e:
         return handle_api_error(e, 'Xodimni yangilashda xatolik')
 
-@app.route('/api/employees/<int:employee_id>', methods=['DELETE'])
+@bp.route('/api/employees/<int:employee_id>', methods=['DELETE'])
+@invalidates('employees')
 def delete_employee(employee_id):
     """Xodimni o'chirish"""
     user_id = session.get('user_id')
@@ -833,45 +1155,26 @@ def delete_employee(employee_id):
     except Exception as e:
         return handle_api_error(e, 'Xodimni o\'chirishda xatolik')
 
-@app.route('/api/tasks', methods=['GET'])
+@bp.route('/api/tasks', methods=['GET'])
 def get_tasks():
     """Vazifalarni olish"""
     user_id = session.get('user_id')
     if not user_id:
         return jsonify({'success': False, 'error': 'Foydalanuvchi topilmadi'}), 401
-    
-    status = request.args.get('status')
-    if status and status not in ['pending', 'in_progress', 'completed', 'cancelled']:
-        status = None
-    
+
     try:
-        connection = get_db_connection()
-        with connection.cursor() as cursor:
-            if status:
-                cursor.execute(
-                    """SELECT t.*, e.name as employee_name
-                       FROM business_tasks t
-                       LEFT JOIN business_employees e ON t.employee_id = e.id
-                       WHERE t.owner_id = %s AND t.status = %s
-                       ORDER BY t.created_at DESC""",
-                    (user_id, status)
-                )
-            else:
-                cursor.execute(
-                    """SELECT t.*, e.name as employee_name
-                       FROM business_tasks t
-                       LEFT JOIN business_employees e ON t.employee_id = e.id
-                       WHERE t.owner_id = %s
-                       ORDER BY t.created_at DESC""",
-                    (user_id,)
-                )
-            tasks = cursor.fetchall()
-        connection.close()
-        return jsonify({'success': True, 'data': tasks or []})
+        query = endpoints.tasks_query(user_id, request.args)
+        columnar = endpoints.wants_columnar(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    try:
+        return jsonify(fetch_list(query, columnar))
     except Exception as e:
         return handle_api_error(e, 'Vazifalarni yuklashda xatolik')
 
-@app.route('/api/tasks', methods=['POST'])
+@bp.route('/api/tasks', methods=['POST'])
+@invalidates('employees')
 def create_task():
     """Yangi vazifa yaratish"""
     user_id = session.get('user_id')
@@ -896,7 +1199,8 @@ def create_task():
     except Exception as e:
         return handle_api_error(e, 'Vazifa yaratishda xatolik')
 
-@app.route('/api/tasks/<int:task_id>', methods=['PUT'])
+@bp.route('/api/tasks/<int:task_id>', methods=['PUT'])
+@invalidates('employees')
 def update_task(task_id):
     """Vazifani yangilash"""
     user_id = session.get('user_id')
@@ -916,7 +1220,8 @@ def update_task(task_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/tasks/<int:task_id>', methods=['DELETE'])
+@bp.route('/api/tasks/<int:task_id>', methods=['DELETE'])
+@invalidates('employees')
 def delete_task(task_id):
     """Vazifani o'chirish"""
     user_id = session.get('user_id')
@@ -932,258 +1237,66 @@ def delete_task(task_id):
 
 # ===== ADVANCED ANALYTICS API =====
 
-@app.route('/api/analytics/dashboard', methods=['GET'])
+@bp.route('/api/analytics/dashboard', methods=['GET'])
+@cached_response(scopes=('transactions', 'warehouse', 'employees'))
+@serves_snapshot('dashboard')
 def get_analytics_dashboard():
     """Kengaytirilgan analitika dashboard"""
     user_id = session.get('user_id')
-    period = request.args.get('period', 'month')
 
+    # Period: day, week, month, year yoki from/to oralig'i
     try:
-        connection = get_db_connection()
-        with connection.cursor() as cursor:
-            # Period filter
-            date_filters = {
-                'day': "DATE(created_at) = CURDATE()",
-                'week': "YEARWEEK(created_at) = YEARWEEK(NOW())",
-                'month': "YEAR(created_at) = YEAR(NOW()) AND MONTH(created_at) = MONTH(NOW())",
-                'year': "YEAR(created_at) = YEAR(NOW())"
-            }
-            date_filter = date_filters.get(period, date_filters['month'])
-
-            # Profit margins
-            cursor.execute(
-                f"""SELECT
-                    SUM(CASE WHEN transaction_type = 'income' THEN amount ELSE 0 END) as revenue,
-                    SUM(CASE WHEN transaction_type = 'expense' THEN amount ELSE 0 END) as costs,
-                    SUM(CASE WHEN transaction_type = 'income' THEN amount ELSE 0 END) -
-                    SUM(CASE WHEN transaction_type = 'expense' THEN amount ELSE 0 END) as profit,
-                    COUNT(CASE WHEN transaction_type = 'income' THEN 1 END) as sales_count,
-                    AVG(CASE WHEN transaction_type = 'income' THEN amount END) as avg_sale
-                FROM transactions
-                WHERE user_id = %s AND {date_filter}""",
-                (user_id,)
-            )
-            financial_metrics = cursor.fetchone()
-
-            # Daily trends (last 30 days)
-            cursor.execute(
-                """SELECT
-                    DATE(created_at) as date,
-                    SUM(CASE WHEN transaction_type = 'income' THEN amount ELSE 0 END) as daily_income,
-                    SUM(CASE WHEN transaction_type = 'expense' THEN amount ELSE 0 END) as daily_expense
-                FROM transactions
-                WHERE user_id = %s AND created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-                GROUP BY DATE(created_at)
-                ORDER BY date DESC
-                LIMIT 30""",
-                (user_id,)
-            )
-            daily_trends = cursor.fetchall()
-
-            # Top selling products
-            cursor.execute(
-                """SELECT
-                    wp.name,
-                    wp.category,
-                    SUM(wm.quantity) as total_sold,
-                    SUM(wm.quantity * wm.price) as total_revenue
-                FROM warehouse_movements wm
-                JOIN warehouse_products wp ON wm.product_id = wp.id
-                WHERE wm.user_id = %s AND wm.movement_type = 'out'
-                    AND wm.reason = 'sale'
-                    AND wm.created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-                GROUP BY wm.product_id, wp.name, wp.category
-                ORDER BY total_revenue DESC
-                LIMIT 10""",
-                (user_id,)
-            )
-            top_products = cursor.fetchall()
-
-            # Low stock alerts
-            cursor.execute(
-                """SELECT name, category, quantity, min_quantity, price
-                FROM warehouse_products
-                WHERE user_id = %s AND quantity <= min_quantity
-                ORDER BY (quantity - min_quantity)
-                LIMIT 10""",
-                (user_id,)
-            )
-            low_stock_alerts = cursor.fetchall()
-
-            # Employee performance
-            cursor.execute(
-                """SELECT
-                    e.name as employee_name,
-                    COUNT(t.id) as total_tasks,
-                    SUM(CASE WHEN t.status = 'completed' THEN 1 ELSE 0 END) as completed_tasks,
-                    SUM(CASE WHEN t.status = 'pending' THEN 1 ELSE 0 END) as pending_tasks
-                FROM business_employees e
-                LEFT JOIN business_tasks t ON e.id = t.employee_id
-                WHERE e.owner_id = %s AND e.is_active = TRUE
-                GROUP BY e.id, e.name
-                ORDER BY completed_tasks DESC
-                LIMIT 10""",
-                (user_id,)
-            )
-            employee_performance = cursor.fetchall()
-
-        connection.close()
-
-        # Calculate profit margin
-        revenue = financial_metrics.get('revenue') or 0
-        costs = financial_metrics.get('costs') or 0
-        profit = financial_metrics.get('profit') or 0
-        profit_margin = (profit / revenue * 100) if revenue > 0 else 0
+        date_range = range_from_args(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
 
-        return jsonify({
+    try:
+        # Besh bo'lim alohida connection'larda parallel; sekin bo'lim butun javobni to'xtatmaydi
+        result = run_sections(dashboard_specs(user_id, date_range))
+        return jsonify(with_partial({
             'success': True,
-            'data': {
-                'financial_metrics': {
-                    **financial_metrics,
-                    'profit_margin': round(profit_margin, 2)
-                },
-                'daily_trends': daily_trends,
-                'top_products': top_products,
-                'low_stock_alerts': low_stock_alerts,
-                'employee_performance': employee_performance
-            }
-        })
+            'data': build_dashboard(result.data)
+        }, result))
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/analytics/forecast', methods=['GET'])
+@bp.route('/api/analytics/forecast', methods=['GET'])
+@cached_response(scopes=('transactions',))
+@serves_snapshot('forecast')
 def get_forecast():
     """Bashorat - daromad va chiqim prognozi"""
     user_id = session.get('user_id')
 
     try:
+        # Kunlik qatorlar bo'yicha Holt-Winters / chiziqli trend (forecasting.py)
         connection = get_db_connection()
-        with connection.cursor() as cursor:
-            # Last 6 months data
-            cursor.execute(
-                """SELECT
-                    DATE_FORMAT(created_at, '%Y-%m') as month,
-                    SUM(CASE WHEN transaction_type = 'income' THEN amount ELSE 0 END) as income,
-                    SUM(CASE WHEN transaction_type = 'expense' THEN amount ELSE 0 END) as expense
-                FROM transactions
-                WHERE user_id = %s AND created_at >= DATE_SUB(NOW(), INTERVAL 6 MONTH)
-                GROUP BY DATE_FORMAT(created_at, '%Y-%m')
-                ORDER BY month DESC
-                LIMIT 6""",
-                (user_id,)
-            )
-            historical_data = cursor.fetchall()
-
-        connection.close()
-
-        # Simple forecast (average growth)
-        if historical_data and len(historical_data) >= 3:
-            incomes = [row.get('income', 0) or 0 for row in historical_data]
-            expenses = [row.get('expense', 0) or 0 for row in historical_data]
-
-            avg_income = sum(incomes) / len(incomes)
-            avg_expense = sum(expenses) / len(expenses)
-
-            # Growth rate calculation
-            if len(incomes) >= 2 and incomes[-1] > 0:
-                income_growth = ((incomes[0] - incomes[-1]) / incomes[-1]) / len(incomes)
-            else:
-                income_growth = 0
-
-            if len(expenses) >= 2 and expenses[-1] > 0:
-                expense_growth = ((expenses[0] - expenses[-1]) / expenses[-1]) / len(expenses)
-            else:
-                expense_growth = 0
-
-            # Next month forecast
-            forecast_income = avg_income * (1 + income_growth)
-            forecast_expense = avg_expense * (1 + expense_growth)
-            forecast_profit = forecast_income - forecast_expense
-
-            return jsonify({
-                'success': True,
-                'data': {
-                    'historical': historical_data,
-                    'forecast': {
-                        'next_month_income': round(forecast_income, 2),
-                        'next_month_expense': round(forecast_expense, 2),
-                        'next_month_profit': round(forecast_profit, 2),
-                        'income_growth_rate': round(income_growth * 100, 2),
-                        'expense_growth_rate': round(expense_growth * 100, 2)
-                    }
-                }
-            })
-        else:
-            return jsonify({
-                'success': True,
-                'data': {
-                    'historical': historical_data,
-                    'forecast': {
-                        'message': 'Prognoz uchun yetarli ma\'lumot yo\'q. Kamida 3 oylik ma\'lumot kerak.'
-                    }
-                }
-            })
-
+        try:
+            result = forecast_for_user(connection, user_id)
+        finally:
+            connection.close()
+        return jsonify({'success': True, 'data': result})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/analytics/category-analysis', methods=['GET'])
+@bp.route('/api/analytics/category-analysis', methods=['GET'])
+@cached_response(scopes=('transactions',))
+@serves_snapshot('category_analysis')
 def get_category_analysis():
     """Kategoriyalar bo'yicha batafsil tahlil"""
     user_id = session.get('user_id')
 
     try:
-        connection = get_db_connection()
-        with connection.cursor() as cursor:
-            # Expense by category
-            cursor.execute(
-                """SELECT
-                    category,
-                    COUNT(*) as transaction_count,
-                    SUM(amount) as total_amount,
-                    AVG(amount) as avg_amount,
-                    MIN(amount) as min_amount,
-                    MAX(amount) as max_amount
-                FROM transactions
-                WHERE user_id = %s AND transaction_type = 'expense'
-                    AND created_at >= DATE_SUB(NOW(), INTERVAL 3 MONTH)
-                GROUP BY category
-                ORDER BY total_amount DESC""",
-                (user_id,)
-            )
-            expense_categories = cursor.fetchall()
-
-            # Income by category
-            cursor.execute(
-                """SELECT
-                    category,
-                    COUNT(*) as transaction_count,
-                    SUM(amount) as total_amount,
-                    AVG(amount) as avg_amount
-                FROM transactions
-                WHERE user_id = %s AND transaction_type = 'income'
-                    AND created_at >= DATE_SUB(NOW(), INTERVAL 3 MONTH)
-                GROUP BY category
-                ORDER BY total_amount DESC""",
-                (user_id,)
-            )
-            income_categories = cursor.fetchall()
-
-        connection.close()
-
-        return jsonify({
+        result = run_sections(category_specs(user_id))
+        return jsonify(with_partial({
             'success': True,
-            'data': {
-                'expense_categories': expense_categories,
-                'income_categories': income_categories
-            }
-        })
+            'data': build_category_analysis(result.data)
+        }, result))
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # ===== AI CHAT API =====
 
-@app.route('/api/ai/chat', methods=['POST'])
+@bp.route('/api/ai/chat', methods=['POST'])
 def ai_chat_api():
     """AI chat endpoint - Biznes ma'lumotlarini tahlil qiladi"""
     user_id = session.get('user_id')
@@ -1209,183 +1322,12 @@ def ai_chat_api():
         })
 
 def generate_ai_response(user_id, message):
-    """Generate intelligent responses based on business data"""
-    connection = get_db_connection()
-
-    try:
-        # Keyword-based responses
-        if any(word in message for word in ['salom', 'assalom', 'hello', 'hi']):
-            return "Assalomu alaykum! Men sizning biznes yordamchingizman. Qanday yordam bera olaman?"
-
-        elif any(word in message for word in ['balans', 'hisob', 'pul', 'daromad', 'foyda']):
-            with connection.cursor() as cursor:
-                # Get financial summary with profit margin
-                cursor.execute(
-                    """SELECT
-                        SUM(CASE WHEN transaction_type = 'income' THEN amount ELSE 0 END) as income,
-                        SUM(CASE WHEN transaction_type = 'expense' THEN amount ELSE 0 END) as expense
-                       FROM transactions
-                       WHERE user_id = %s AND YEAR(created_at) = YEAR(NOW()) AND MONTH(created_at) = MONTH(NOW())""",
-                    (user_id,)
-                )
-                result = cursor.fetchone()
-                if result:
-                    income = result.get('income', 0) or 0
-                    expense = result.get('expense', 0) or 0
-                    balance = income - expense
-                    profit_margin = (balance / income * 100) if income > 0 else 0
-
-                    return f"Joriy oy uchun:\n💰 Kirim: {income:,.0f} UZS\n💸 Chiqim: {expense:,.0f} UZS\n📊 Sof foyda: {balance:,.0f} UZS\n📈 Foyda darajasi: {profit_margin:.1f}%\n\n{'✅ Ajoyib natija!' if profit_margin > 30 else '✅ Yaxshi natija!' if profit_margin > 15 else '⚠️ Chiqimlarni optimallashtiring.' if profit_margin > 0 else '🚨 Zararda ishlayapsiz!'}"
-
-        elif any(word in message for word in ['prognoz', 'bashorat', 'forecast', 'kelajak']):
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    """SELECT
-                        DATE_FORMAT(created_at, '%Y-%m') as month,
-                        SUM(CASE WHEN transaction_type = 'income' THEN amount ELSE 0 END) as income,
-                        SUM(CASE WHEN transaction_type = 'expense' THEN amount ELSE 0 END) as expense
-                    FROM transactions
-                    WHERE user_id = %s AND created_at >= DATE_SUB(NOW(), INTERVAL 3 MONTH)
-                    GROUP BY DATE_FORMAT(created_at, '%Y-%m')
-                    ORDER BY month DESC
-                    LIMIT 3""",
-                    (user_id,)
-                )
-                data = cursor.fetchall()
-                if data and len(data) >= 2:
-                    incomes = [row.get('income', 0) or 0 for row in data]
-                    avg_income = sum(incomes) / len(incomes)
-                    growth = ((incomes[0] - incomes[-1]) / incomes[-1] * 100) if incomes[-1] > 0 else 0
-
-                    if growth > 5:
-                        message = "🚀 Biznesingiz rivojlanmoqda!"
-                    elif growth > 0:
-                        message = "⚠️ O'sish sur'atini oshirish tavsiya etiladi."
-                    else:
-                        message = "🚨 Kirimlar kamaymoqda, strategiyani ko'rib chiqing!"
-
-                    return f"📊 So'nggi 3 oy tahlili:\n💰 O'rtacha kirim: {avg_income:,.0f} UZS\n📈 O'sish sur'ati: {growth:+.1f}%\n\n{message}"
-
-        elif any(word in message for word in ['eng', 'top', 'yaxshi', 'ko\'p sotilgan']):
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    """SELECT
-                        wp.name,
-                        SUM(wm.quantity) as total_sold,
-                        SUM(wm.quantity * wm.price) as revenue
-                    FROM warehouse_movements wm
-                    JOIN warehouse_products wp ON wm.product_id = wp.id
-                    WHERE wm.user_id = %s AND wm.movement_type = 'out'
-                        AND wm.reason = 'sale'
-                        AND wm.created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-                    GROUP BY wm.product_id, wp.name
-                    ORDER BY revenue DESC
-                    LIMIT 5""",
-                    (user_id,)
-                )
-                products = cursor.fetchall()
-                if products:
-                    response = "🏆 Eng ko'p sotilgan mahsulotlar (30 kun):\n\n"
-                    for i, p in enumerate(products, 1):
-                        response += f"{i}. {p['name']}: {p['total_sold']} ta, {p['revenue']:,.0f} UZS\n"
-                    return response
-                else:
-                    return "📦 Hali sotuvlar ro'yxati mavjud emas."
-
-        elif any(word in message for word in ['ombor', 'mahsulot', 'product', 'stock']):
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    """SELECT COUNT(*) as total,
-                       SUM(CASE WHEN quantity <= min_quantity THEN 1 ELSE 0 END) as low_stock,
-                       SUM(quantity * price) as total_value
-                       FROM warehouse_products WHERE user_id = %s""",
-                    (user_id,)
-                )
-                result = cursor.fetchone()
-                if result:
-                    total = result.get('total', 0)
-                    low_stock = result.get('low_stock', 0)
-                    total_value = result.get('total_value', 0) or 0
-                    return f"📦 Ombor holati:\n• Jami mahsulotlar: {total} ta\n• Umumiy qiymati: {total_value:,.0f} UZS\n• {'⚠️ Kam qolganlar: ' + str(low_stock) + ' ta' if low_stock > 0 else '✅ Barcha mahsulotlar yetarli'}"
-
-        elif any(word in message for word in ['xodim', 'employee', 'jamoa', 'team']):
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    """SELECT
-                        COUNT(*) as total,
-                        SUM(CASE WHEN is_active = TRUE THEN 1 ELSE 0 END) as active
-                    FROM business_employees WHERE owner_id = %s""",
-                    (user_id,)
-                )
-                emp_result = cursor.fetchone()
-
-                cursor.execute(
-                    """SELECT
-                        e.name,
-                        COUNT(t.id) as total_tasks,
-                        SUM(CASE WHEN t.status = 'completed' THEN 1 ELSE 0 END) as completed
-                    FROM business_employees e
-                    LEFT JOIN business_tasks t ON e.id = t.employee_id
-                    WHERE e.owner_id = %s AND e.is_active = TRUE
-                    GROUP BY e.id, e.name
-                    ORDER BY completed DESC
-                    LIMIT 1""",
-                    (user_id,)
-                )
-                top_employee = cursor.fetchone()
-
-                total = emp_result.get('total', 0)
-                active = emp_result.get('active', 0)
-                response = f"👥 Jamoa:\n• Jami xodimlar: {total} ta\n• Faollar: {active} ta\n"
-
-                if top_employee and top_employee.get('completed', 0) > 0:
-                    response += f"\n⭐ Eng samarali: {top_employee['name']} ({top_employee['completed']} ta vazifa)"
-
-                return response
-
-        elif any(word in message for word in ['vazifa', 'task', 'ish']):
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    """SELECT COUNT(*) as total,
-                       SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
-                       SUM(CASE WHEN status = 'in_progress' THEN 1 ELSE 0 END) as in_progress,
-                       SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed
-                       FROM business_tasks WHERE owner_id = %s""",
-                    (user_id,)
-                )
-                result = cursor.fetchone()
-                if result:
-                    total = result.get('total', 0)
-                    pending = result.get('pending', 0) or 0
-                    in_progress = result.get('in_progress', 0) or 0
-                    completed = result.get('completed', 0) or 0
-                    completion_rate = (completed / total * 100) if total > 0 else 0
-
-                    return f"📋 Vazifalar:\n• Jami: {total} ta\n• ⏳ Kutilmoqda: {pending}\n• 🔄 Jarayonda: {in_progress}\n• ✅ Bajarilgan: {completed}\n\n📊 Bajarilish foizi: {completion_rate:.0f}%"
-
-        elif any(word in message for word in ['tahlil', 'analiz', 'analytics', 'statistics']):
-            return "📊 Kengaytirilgan analitika:\n\n• 💰 Moliyaviy ko'rsatkichlar\n• 📈 Daromad prognozi\n• 🏆 Eng yaxshi mahsulotlar\n• 📉 Trend tahlili\n• 👥 Xodimlar samaradorligi\n\n'Hisobotlar' bo'limida batafsil ma'lumot!"
-
-        elif any(word in message for word in ['hisobot', 'report']):
-            return "📊 Hisobotlar bo'limida:\n• Moliyaviy hisobotlar\n• Ombor statistikasi\n• Foyda tahlili\n• Trend grafiklar\n• Xodimlar faoliyati\n\nHisobotlar sahifasiga o'ting!"
-
-        elif any(word in message for word in ['yordam', 'help', 'qanday']):
-            return "🤖 Men sizga yordam bera olaman:\n\n💰 Moliyaviy tahlil va prognoz\n📦 Ombor boshqaruvi\n👥 Xodimlar samaradorligi\n📊 Biznes statistikasi\n🎯 Eng yaxshi mahsulotlar\n\nSavolingizni yozing!"
-
-        elif any(word in message for word in ['rahmat', 'thank', 'minnatdor']):
-            return "Marhamat! Biznesingiz rivojlansin! 🚀"
-
-        else:
-            return ("🤖 Men sizning AI biznes yordamchingizman. So'rashingiz mumkin:\n\n"
-                   "💰 'Balansim qancha?'\n📈 'Prognoz ko'rsat'\n🏆 'Eng ko\'p sotilgan mahsulotlar'\n"
-                   "📦 'Ombor holati'\n👥 'Xodimlar haqida'\n📊 'Tahlil'\n\nYoki o'z savolingizni yozing!")
-
-    finally:
-        connection.close()
+    """Xabarga javob: intent router (ai_intents.py), connection faqat kerak bo'lsa olinadi"""
+    return ai_router.respond(user_id, message)
 
 if __name__ == '__main__':
     # Production'da gunicorn ishlatiladi, bu faqat development uchun
     port = int(os.environ.get('PORT', 5000))
     debug = DEBUG or os.environ.get('FLASK_ENV') == 'development'
-    app.run(debug=debug, host='0.0.0.0', port=port)
+    create_app().run(debug=debug, host='0.0.0.0', port=port)
 
@@ -0,0 +1,244 @@
+"""
+ASGI (asyncio) server: o'qish endpoint'lari aiomysql bilan
+
+MySQL javobini kutayotgan so'rov event loop'ni bloklamaydi: bitta process
+minglab ochiq Mini App sessiyasiga xizmat qiladi, sync gunicorn'dagidek har
+bir parallel so'rov uchun alohida worker process kerak emas.
+
+SQL va javob shakllari Flask versiyasi bilan umumiy: ro'yxatlar - endpoints.py,
+hisobot/analitika bo'limlari - analytics.py spec'lari va builder'lari. Bu yerda
+faqat ularni async driver bilan bajarish.
+
+Ishga tushirish (Flask yonida; reverse proxy shu yo'llarni bu yerga yo'naltiradi):
+    pip install -r requirements-async.txt
+    uvicorn asgi_app:app --host 0.0.0.0 --port 8001 --workers 2
+
+Auth faqat sessiya tokeni bilan (`Authorization: Bearer ...`, token'ni Flask'dagi
+POST /api/auth/session beradi). initData tekshiruvi, yozish endpoint'lari,
+export/import va AI chat Flask'da qoladi.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import aiomysql  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.middleware.gzip import GZipMiddleware  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from analytics import (build_category_analysis, build_dashboard, build_summary, category_specs,  # noqa: E402
+                       dashboard_specs, require_sections, summary_specs, with_partial)
+from database import DB_POOL_MAX_LIFETIME  # noqa: E402
+import compression  # noqa: E402
+import endpoints  # noqa: E402
+import json_provider  # noqa: E402
+import log_setup  # noqa: E402
+from fanout import FANOUT_QUERY_TIMEOUT, FanoutResult, with_time_limit  # noqa: E402
+from periods import range_from_args  # noqa: E402
+from session_token import SessionTokenSigner  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Bitta event loop uchun; so'rovlar navbatda kutadi, process bloklanmaydi
+ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', '20'))
+ASYNC_DB_POOL_MIN = int(os.getenv('ASYNC_DB_POOL_MIN', '0'))
+
+DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
+IS_DEVELOPMENT = DEBUG or os.getenv('FLASK_ENV') == 'development' or not os.getenv('BOT_TOKEN')
+BUSINESS_PLAN_REDIRECT_URL = os.getenv('BUSINESS_PLAN_REDIRECT_URL', 'https://balansai-app.onrender.com')
+DEV_USER_ID = 123456789
+
+# app.py dagi bilan bir xil kalit: Flask bergan token shu yerda ham o'tadi
+session_signer = SessionTokenSigner(os.getenv('SECRET_KEY', 'your-secret-key-change-this'),
+                                    ttl=int(os.getenv('SESSION_TOKEN_TTL', '900')))
+
+
+class FlaskJSONResponse(JSONResponse):
+    """jsonify bilan bir xil JSON (json_provider: kalitlar tartibi, Decimal va sana ko'rinishi)"""
+
+    def render(self, content):
+        return json_provider.dumps(content) + b'\n'
+
+
+def error_response(error, default_message):
+    payload, status = endpoints.error_payload(error, default_message, DEBUG)
+    return FlaskJSONResponse(payload, status)
+
+
+def authenticate(request):
+    """
+    Returns:
+        (user_id, None) yoki (None, xatolik javobi)
+    """
+    auth_header = request.headers.get('authorization', '')
+    if auth_header.startswith('Bearer '):
+        try:
+            claims = session_signer.verify(auth_header[7:])
+        except ValueError as e:
+            logger.info("Sessiya tokeni xatoligi: %s", e)
+        else:
+            if not claims['has_business_plan']:
+                return None, FlaskJSONResponse(endpoints.no_business_plan_payload(BUSINESS_PLAN_REDIRECT_URL), 403)
+            return claims['user_id'], None
+
+    if IS_DEVELOPMENT:
+        return DEV_USER_ID, None
+    return None, FlaskJSONResponse({'error': 'Sessiya tokeni talab qilinadi (POST /api/auth/session)',
+                                    'redirect': BUSINESS_PLAN_REDIRECT_URL}, 401)
+
+
+# ===== DATABASE =====
+
+async def fetch(pool, sql, params, fetch='all'):
+    """fetch: 'one', 'all' yoki 'columnar' - (ustunlar, tuple qatorlar)"""
+    async with pool.acquire() as connection:
+        try:
+            async with connection.cursor(aiomysql.Cursor if fetch == 'columnar' else aiomysql.DictCursor) as cursor:
+                await cursor.execute(sql, params)
+                if fetch == 'one':
+                    return await cursor.fetchone()
+                if fetch == 'columnar':
+                    return [column[0] for column in cursor.description], list(await cursor.fetchall())
+                return list(await cursor.fetchall())
+        except BaseException:
+            # Bekor qilingan (timeout) so'rov o'rtasida qolgan connection pool'ga qaytmaydi
+            connection.close()
+            raise
+
+
+async def run_queries(pool, specs):
+    """
+    fanout.run_queries ning async versiyasi: bir xil QuerySpec, timeout va FanoutResult
+
+    Har bir bo'lim alohida connection'da, barchasi bitta event loop'da parallel.
+    """
+    async def run(spec, timeout):
+        started = time.perf_counter()
+        result = await asyncio.wait_for(
+            fetch(pool, with_time_limit(spec.sql, timeout), spec.params, spec.fetch), timeout
+        )
+        return result, (time.perf_counter() - started) * 1000
+
+    timeouts = [spec.timeout if spec.timeout is not None else FANOUT_QUERY_TIMEOUT for spec in specs]
+    outcomes = await asyncio.gather(*(run(spec, timeout) for spec, timeout in zip(specs, timeouts)),
+                                    return_exceptions=True)
+
+    data = {}
+    failed = []
+    errors = {}
+    timings_ms = {}
+    for spec, timeout, outcome in zip(specs, timeouts, outcomes):
+        if isinstance(outcome, BaseException):
+            failed.append(spec.name)
+            if isinstance(outcome, asyncio.TimeoutError):
+                errors[spec.name] = f"timeout ({timeout}s)"
+                logger.warning("Fan-out so'rov timeout: %s (%ss)", spec.name, timeout)
+            else:
+                errors[spec.name] = str(outcome)
+                logger.error("Fan-out so'rov xatolik: %s: %s", spec.name, outcome)
+            data[spec.name] = spec.default
+            continue
+        result, elapsed_ms = outcome
+        data[spec.name] = result if result is not None else spec.default
+        timings_ms[spec.name] = round(elapsed_ms, 2)
+
+    return FanoutResult(data, failed, errors, timings_ms)
+
+
+# ===== ENDPOINT'LAR =====
+
+def sections_endpoint(specs_for, build, error_message):
+    """Hisobot/analitika: bo'limlar parallel, qisman natija `partial` bilan (Flask bilan bir xil)"""
+    async def endpoint(request):
+        user_id, denied = authenticate(request)
+        if denied is not None:
+            return denied
+        try:
+            specs = specs_for(user_id, request.query_params)
+        except ValueError as e:
+            return FlaskJSONResponse({'success': False, 'error': str(e)}, 400)
+        try:
+            result = require_sections(await run_queries(request.app.state.pool, specs), specs)
+        except Exception as e:
+            return error_response(e, error_message)
+        return FlaskJSONResponse(with_partial({'success': True, 'data': build(result.data)}, result))
+    return endpoint
+
+
+def list_endpoint(build_query, error_message):
+    """Ro'yxat: so'rov tanlash va javob shakli - endpoints.py"""
+    async def endpoint(request):
+        user_id, denied = authenticate(request)
+        if denied is not None:
+            return denied
+        try:
+            query = build_query(user_id, request.query_params)
+            columnar = endpoints.wants_columnar(request.query_params)
+        except ValueError as e:
+            return FlaskJSONResponse({'success': False, 'error': str(e)}, 400)
+        try:
+            if columnar:
+                columns, rows = await fetch(request.app.state.pool, query.sql, query.params, 'columnar')
+                return FlaskJSONResponse(endpoints.columnar_payload(query, columns, rows))
+            rows = await fetch(request.app.state.pool, query.sql, query.params)
+        except Exception as e:
+            return error_response(e, error_message)
+        return FlaskJSONResponse(endpoints.list_payload(query, rows))
+    return endpoint
+
+
+routes = [
+    Route('/api/reports/summary', sections_endpoint(
+        lambda user_id, args: summary_specs(user_id, range_from_args(args)),
+        build_summary, 'Hisobotlarni yuklashda xatolik')),
+    Route('/api/analytics/dashboard', sections_endpoint(
+        lambda user_id, args: dashboard_specs(user_id, range_from_args(args)),
+        build_dashboard, 'Analitikani yuklashda xatolik')),
+    Route('/api/analytics/category-analysis', sections_endpoint(
+        lambda user_id, args: category_specs(user_id),
+        build_category_analysis, 'Analitikani yuklashda xatolik')),
+    Route('/api/transactions', list_endpoint(endpoints.transactions_query, 'Tranzaksiyalarni yuklashda xatolik')),
+    Route('/api/warehouse/products', list_endpoint(endpoints.products_query, 'Mahsulotlarni yuklashda xatolik')),
+    Route('/api/warehouse/movements', list_endpoint(endpoints.movements_query,
+                                                    'Ombor harakatlarini yuklashda xatolik')),
+    Route('/api/employees', list_endpoint(endpoints.employees_query, 'Xodimlarni yuklashda xatolik')),
+    Route('/api/tasks', list_endpoint(endpoints.tasks_query, 'Vazifalarni yuklashda xatolik')),
+]
+
+
+@asynccontextmanager
+async def lifespan(app):
+    log_setup.configure()
+    # Connection'lar birinchi so'rovda ochiladi (Flask pool'i kabi); database'siz ham server ko'tariladi
+    app.state.pool = await aiomysql.create_pool(
+        minsize=ASYNC_DB_POOL_MIN,
+        maxsize=ASYNC_DB_POOL_SIZE,
+        pool_recycle=int(DB_POOL_MAX_LIFETIME),
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        db=os.getenv('DB_NAME', 'balansai_db'),
+        charset='utf8mb4',
+        autocommit=True,
+        connect_timeout=10,
+    )
+    try:
+        yield
+    finally:
+        app.state.pool.close()
+        await app.state.pool.wait_closed()
+
+
+# Flask'dagi chegara bilan; Starlette middleware'i faqat gzip va bitta daraja -
+# ro'yxat javoblarining odatiy hajmi (16KB-1MB) uchun compression.LEVELS dagi daraja
+middleware = [Middleware(GZipMiddleware, minimum_size=compression.COMPRESS_MIN_SIZE,
+                         compresslevel=compression.level_for('gzip', 64 * 1024))] if compression.COMPRESS_ENABLED else []
+app = Starlette(debug=False, routes=routes, middleware=middleware, lifespan=lifespan)
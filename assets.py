@@ -0,0 +1,125 @@
+"""
+Static JS bundle'lar: content-hash nomlar va uzoq muddatli cache
+
+- build_assets.py har bir bundle'ni (BUNDLES) birlashtiradi, minify qiladi va
+  static/dist/<nom>.<hash>.js ga yozadi (yonida .gz va .br), manifest.json -
+  mantiqiy nom -> hash'li fayl
+- Template'larda: `{% for src in asset_urls('index') %}<script src="{{ src }}"></script>{% endfor %}`.
+  Manifest bo'lsa bitta hash'li fayl, bo'lmasa (development) manba fayllar alohida.
+  `url_for('static', filename='bundles/index.js')` ham hash'li nomga aylanadi
+- /static/dist/ fayllari `Cache-Control: immutable` bilan beriladi: nom kontentdan
+  olingani uchun deploy'dan keyin HTML yangi nomni beradi, eskisi hech qachon qayta so'ralmaydi.
+  Brauzer qo'llasa oldindan siqilgan .br/.gz yuboriladi
+"""
+import json
+import logging
+import os
+
+from flask import abort, request, send_file, url_for
+
+from compression import accepted_encodings
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Bundle -> static/js ichidagi fayllar (tartib - <script> tartibi).
+# index: warehouse/reports/employees/ai_chat.js ham `const tg`, `const API_BASE` e'lon qiladi -
+# alohida <script> bo'lib ulanganda brauzer ularni SyntaxError bilan rad etardi (sahifa
+# `typeof loadProducts === 'function'` bilan tekshiradi), shuning uchun bundle'ga kirmaydi
+BUNDLES = {
+    'index': ['cache.js', 'app.js'],
+    'warehouse': ['cache.js', 'router.js', 'warehouse.js'],
+    'reports': ['cache.js', 'router.js', 'reports.js'],
+    'employees': ['cache.js', 'router.js', 'employees.js'],
+    'ai_chat': ['cache.js', 'router.js', 'ai_chat.js'],
+}
+
+# Accept-Encoding'dagi nom -> fayl kengaytmasi (afzallik tartibida)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_manifest = None
+_variants = {}
+
+
+def bundle_key(name):
+    """Manifest'dagi mantiqiy nom"""
+    return f'bundles/{name}.js'
+
+
+def load_manifest():
+    """static/dist/manifest.json (yo'q bo'lsa - bo'sh, manba fayllar ishlatiladi)"""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_PATH, encoding='utf-8') as f:
+                _manifest = json.load(f)
+        except FileNotFoundError:
+            _manifest = {}
+        except (OSError, ValueError) as e:
+            logger.warning("Asset manifest o'qilmadi: %s", e)
+            _manifest = {}
+    return _manifest
+
+
+def asset_urls(name):
+    """Bundle uchun <script src> ro'yxati"""
+    if bundle_key(name) in load_manifest():
+        return [url_for('static', filename=bundle_key(name))]
+    return [url_for('static', filename=f'js/{filename}') for filename in BUNDLES[name]]
+
+
+def _hashed_filename(endpoint, values):
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = load_manifest().get(values['filename'], values['filename'])
+
+
+def _variant(filename, suffix):
+    key = (filename, suffix)
+    if key not in _variants:
+        path = os.path.join(DIST_DIR, filename + suffix)
+        _variants[key] = path if os.path.isfile(path) else None
+    return _variants[key]
+
+
+def dist_file(filename):
+    """Hash'li fayl: oldindan siqilgan variant va immutable cache bilan"""
+    path = os.path.join(DIST_DIR, filename)
+    if os.path.basename(filename) != filename or not os.path.isfile(path):
+        abort(404)
+
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    encoding = None
+    for name, suffix in ENCODINGS:
+        if name in accepted and _variant(filename, suffix):
+            path, encoding = _variant(filename, suffix), name
+            break
+
+    response = send_file(path, mimetype='text/javascript' if filename.endswith('.js') else None,
+                         conditional=True, max_age=IMMUTABLE_MAX_AGE)
+    if encoding:
+        # ETag siqilgan fayldan olinadi - variantlar bir-biriga aralashmaydi
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def reset():
+    """Manifest qayta o'qilsin (build'dan keyin, process qayta ishga tushmasdan)"""
+    global _manifest
+    _manifest = None
+    _variants.clear()
+
+
+def init_app(app):
+    """/static/dist route'i, url_for hook'i va template'lar uchun asset_urls()"""
+    # Flask'ning /static/<path> route'idan aniqroq qoida - dist fayllari shu yerda
+    app.add_url_rule('/static/dist/<path:filename>', 'static_dist', dist_file)
+    app.url_defaults(_hashed_filename)
+    app.jinja_env.globals['asset_urls'] = asset_urls
+    if not load_manifest():
+        logger.info("Asset manifest yo'q - manba JS fayllar ishlatiladi (python build_assets.py)")
@@ -0,0 +1,72 @@
+"""
+AI chat intent router benchmark: xabar/s
+
+Ishga tushirish:
+    python benchmarks/bench_ai_router.py [--messages 50000]
+
+Database kerak emas. O'lchanadi:
+- classify: Aho-Corasick bo'yicha intent aniqlash
+- naive: xuddi shu kalit so'zlar bilan eski `any(word in message ...)` zanjiri (taqqoslash
+  uchun; so'z chegarasi va ball yo'q, shuning uchun "chiqim" ichidagi "hi" ham salom)
+- respond: DB talab qilmaydigan intent'lar (salom, yordam, rahmat ...) uchun to'liq javob;
+  ular uchun connection olinmaydi
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_intents import normalize, router  # noqa: E402
+
+SAMPLES = [
+    "Salom", "Assalomu alaykum!", "rahmat", "Yordam kerak", "Balansim qancha?",
+    "Bu oy daromad qanday?", "Prognoz ko'rsat", "Eng ko‘p sotilgan mahsulotlar",
+    "Ombor holati qanday", "Xodimlar haqida ma'lumot", "Vazifalar ro'yxati", "Tahlil",
+    "Hisobotlarni ko'rsat", "Привет", "Какой у меня баланс за месяц?", "Покажи прогноз",
+    "Остатки на складе", "Лучшие товары", "Сколько задач у сотрудников?", "спасибо",
+    "Салом, ҳисоботни кўрсат", "hello, show me the revenue", "what are the best selling products",
+    "bugun havo qanday", "nimadir boshqa narsa haqida uzunroq savol yozib ko'ramiz",
+]
+
+
+def naive_classify(message, table):
+    for name, words in table:
+        if any(word in message for word in words):
+            return name
+    return 'fallback'
+
+
+def rate(fn, messages):
+    started = time.perf_counter()
+    for message in messages:
+        fn(message)
+    return len(messages) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=50000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    messages = [rng.choice(SAMPLES) for _ in range(args.messages)]
+    table = [(intent.name, [normalize(word.lstrip('=')) for word in intent.keywords])
+             for intent in router.intents]
+    no_db = [message for message in SAMPLES if not router.classify(message).needs_db]
+    no_db_messages = [rng.choice(no_db) for _ in range(args.messages)]
+
+    print(f"{args.messages} xabar, {sum(len(words) for _, words in table)} kalit so'z, "
+          f"{len(router.matcher._goto)} avtomat holati")
+    print(f"  classify (Aho-Corasick + ball):  {rate(router.classify, messages):>10,.0f} xabar/s")
+    print(f"  naive any(word in message):      "
+          f"{rate(lambda m: naive_classify(normalize(m), table), messages):>10,.0f} xabar/s")
+    print(f"  respond, DB'siz intent'lar:      "
+          f"{rate(lambda m: router.respond(0, m, connect=None), no_db_messages):>10,.0f} xabar/s "
+          f"({len(no_db)}/{len(SAMPLES)} namuna xabar DB'siz)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Load-test: sync gunicorn (app.py) va ASGI uvicorn (asgi_app.py) taqqoslash
+
+Ishga tushirish (MySQL va ma'lumotlar kerak, masalan staging nusxasi):
+    pip install -r requirements-async.txt
+    python benchmarks/bench_async.py --mode sync --sessions 1000 --duration 30
+    python benchmarks/bench_async.py --mode async --sessions 1000 --duration 30
+
+Har bir sessiya - alohida keep-alive connection va alohida user tokeni (Mini App
+ochiq turgan foydalanuvchi). Sessiyalar navbat bilan hisobot, tranzaksiyalar va
+mahsulotlar ro'yxatini so'raydi. Ikkala rejimda ham bir xil --workers soni.
+
+Sync rejim production sozlamalari bilan (gunicorn.conf.py: preload, gthread);
+--no-preload - har bir worker ilovani o'zi yuklaydi (copy-on-write foydasini ko'rish uchun).
+
+Natija: ishga tushish vaqti, har bir worker RSS/PSS (PSS - umumiy sahifalar
+process'lar o'rtasida bo'lingan), rps, latency p50/p95/p99, xatoliklar, server
+process'lari RSS cho'qqisi va 1000 sessiyaga hisoblangan xotira.
+Response cache o'chiriladi (RESPONSE_CACHE_MAX_SIZE=0) - database yo'li o'lchanadi.
+"""
+import argparse
+import asyncio
+import http.client
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from session_token import SessionTokenSigner  # noqa: E402
+
+SECRET_KEY = 'bench-secret-key'
+PATHS = (
+    '/api/reports/summary?period=week',
+    '/api/transactions?limit=50',
+    '/api/warehouse/products?page_size=50',
+)
+
+
+def server_command(mode, host, port, workers):
+    if mode == 'sync':
+        return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'{host}:{port}',
+                '--workers', str(workers)]
+    return [sys.executable, '-m', 'uvicorn', 'asgi_app:app', '--host', host, '--port', str(port),
+            '--workers', str(workers), '--no-access-log']
+
+
+def process_tree(pid):
+    """pid va uning barcha avlodlari (/proc orqali)"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree = [pid]
+    for current in tree:
+        tree.extend(children.get(current, []))
+    return tree
+
+
+def _proc_kb(path, field):
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def rss_mb(pid):
+    return _proc_kb(f'/proc/{pid}/status', 'VmRSS:') / 1024
+
+
+def pss_mb(pid):
+    return _proc_kb(f'/proc/{pid}/smaps_rollup', 'Pss:') / 1024
+
+
+def tree_rss_mb(pid):
+    return sum(rss_mb(member) for member in process_tree(pid))
+
+
+class Session:
+    """Bitta keep-alive HTTP/1.1 connection (minimal client, tashqi kutubxonasiz)"""
+
+    def __init__(self, host, port, token):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.reader = None
+        self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\nAuthorization: Bearer {self.token}\r\n"
+            f"Connection: keep-alive\r\n\r\n".encode()
+        )
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('server connection yopildi')
+        status = int(status_line.split()[1])
+        length = 0
+        close = False
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'connection' and value.strip().lower() == 'close':
+                close = True
+        await self.reader.readexactly(length)
+        if close:
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def session_loop(session, deadline, latencies, errors, rng):
+    while time.perf_counter() < deadline:
+        path = rng.choice(PATHS)
+        started = time.perf_counter()
+        try:
+            status = await session.get(path)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            session.close()
+            errors['connection'] = errors.get('connection', 0) + 1
+            await asyncio.sleep(0.05)
+            continue
+        if status == 200:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors[status] = errors.get(status, 0) + 1
+    session.close()
+
+
+async def sample_rss(pid, stop, peak):
+    while not stop.is_set():
+        peak[0] = max(peak[0], tree_rss_mb(pid))
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_load(args, user_ids, server_pid):
+    signer = SessionTokenSigner(SECRET_KEY, ttl=args.duration + 600)
+    sessions = [Session(args.host, args.port, signer.issue(user_ids[i % len(user_ids)])['token'])
+                for i in range(args.sessions)]
+    latencies = []
+    errors = {}
+    peak = [tree_rss_mb(server_pid)]
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(server_pid, stop, peak))
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(session_loop(session, deadline, latencies, errors, random.Random(i))
+                           for i, session in enumerate(sessions)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+    return latencies, errors, elapsed, peak[0]
+
+
+def wait_until_ready(host, port, server_pid, workers, timeout=60):
+    """Barcha worker process'lari ko'tarilgan va server HTTP javob bergan bo'lsa True"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if len(process_tree(server_pid)) > workers:
+            connection = http.client.HTTPConnection(host, port, timeout=5)
+            try:
+                connection.request('GET', '/api/check-plan')
+                connection.getresponse().read()
+                return True
+            except OSError:
+                pass
+            finally:
+                connection.close()
+        time.sleep(0.05)
+    return False
+
+
+def worker_memory(server_pid):
+    """[(pid, rss_mb, pss_mb)] - master'dan tashqari barcha process'lar"""
+    return [(pid, rss_mb(pid), pss_mb(pid)) for pid in process_tree(server_pid)[1:]]
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=('sync', 'async'), required=True)
+    parser.add_argument('--sessions', type=int, default=1000, help='parallel Mini App sessiyalari')
+    parser.add_argument('--duration', type=int, default=30, help='sekund')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--no-preload', action='store_true', help='sync: GUNICORN_PRELOAD=false')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8010)
+    parser.add_argument('--user-ids', default='123456789',
+                        help="vergul bilan user_id'lar (database'da ma'lumoti borlari); sessiyalarga aylanib beriladi")
+    args = parser.parse_args()
+
+    user_ids = [int(value) for value in args.user_ids.split(',') if value.strip()]
+    env = dict(os.environ, SECRET_KEY=SECRET_KEY, DEBUG='False', BOT_TOKEN=os.getenv('BOT_TOKEN', 'bench'),
+               RESPONSE_CACHE_MAX_SIZE='0', PRECOMPUTE_IN_PROCESS='false',
+               GUNICORN_PRELOAD='false' if args.no_preload else 'true')
+    started = time.perf_counter()
+    server = subprocess.Popen(server_command(args.mode, args.host, args.port, args.workers), cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        if not wait_until_ready(args.host, args.port, server.pid, args.workers):
+            sys.exit(f"Server {args.host}:{args.port} da ko'tarilmadi")
+        startup = time.perf_counter() - started
+        time.sleep(1)  # preload'siz worker'lar import'ni tugatsin
+        idle_rss = tree_rss_mb(server.pid)
+        master_rss = rss_mb(server.pid)
+        idle_workers = worker_memory(server.pid)
+        latencies, errors, elapsed, peak_rss = asyncio.run(run_load(args, user_ids, server.pid))
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait(timeout=30)
+
+    latencies.sort()
+    ok = len(latencies)
+    preload = '' if args.mode == 'async' else (', preload yo\'q' if args.no_preload else ', preload')
+    print(f"{args.mode}: {args.workers} worker{preload}, {args.sessions} sessiya, {elapsed:.1f}s")
+    print(f"  ishga tushish:    {startup:.2f}s")
+    print(f"  master RSS:       {master_rss:.1f} MB")
+    for pid, rss, pss in idle_workers:
+        print(f"  worker {pid}: RSS {rss:.1f} MB, PSS {pss:.1f} MB (bo'sh)")
+    print(f"  rps (200):        {ok / elapsed:>10,.1f}")
+    print(f"  latency p50/p95/p99: {percentile(latencies, 0.5) * 1000:.1f} / "
+          f"{percentile(latencies, 0.95) * 1000:.1f} / {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"  xatoliklar:       {sum(errors.values())} {errors if errors else ''}")
+    print(f"  RSS bo'sh / cho'qqi: {idle_rss:.1f} / {peak_rss:.1f} MB")
+    print(f"  RSS / 1000 sessiya:  {peak_rss * 1000 / args.sessions:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
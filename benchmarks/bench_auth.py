@@ -0,0 +1,76 @@
+"""
+Auth benchmark: initData HMAC validatsiyasi va sessiya tokeni tekshiruvi
+
+Ishga tushirish:
+    python benchmarks/bench_auth.py [--iterations 100000]
+
+Eslatma: eski yo'lda har so'rovda check_business_plan() ham database'ga
+boradi - bu yerda faqat CPU qismi o'lchanadi, DB round-trip qo'shilmagan.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+import timeit
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import telegram_auth  # noqa: E402
+from session_token import SessionTokenSigner  # noqa: E402
+
+BOT_TOKEN = '123456:benchmark-token'
+
+
+def sign_init_data(user_id, bot_token=BOT_TOKEN):
+    """Telegram kabi imzolangan initData yaratish"""
+    fields = {
+        'auth_date': str(int(time.time())),
+        'query_id': 'AAHdF6IQAAAAAN0XohDhrOrc',
+        'user': json.dumps({'id': user_id, 'first_name': 'Bench', 'username': 'bench_user',
+                            'language_code': 'uz'}, separators=(',', ':')),
+    }
+    data_check_string = '\n'.join(f'{k}={fields[k]}' for k in sorted(fields))
+    secret_key = hmac.new(b'WebAppData', bot_token.encode(), hashlib.sha256).digest()
+    fields['hash'] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urllib.parse.urlencode(fields)
+
+
+def per_call_us(fn, iterations):
+    total = min(timeit.repeat(fn, number=iterations, repeat=5))
+    return total / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=100000)
+    args = parser.parse_args()
+
+    init_data = sign_init_data(987654321)
+    signer = SessionTokenSigner('benchmark-secret')
+    token = signer.issue(987654321, 'bench_user', True)['token']
+
+    # Natijalar to'g'riligini tekshirish
+    assert telegram_auth.validate_telegram_init_data(init_data, BOT_TOKEN)['user_id'] == 987654321
+    assert signer.verify(token)['user_id'] == 987654321
+
+    def initdata_cold():
+        telegram_auth._secret_key.cache_clear()
+        telegram_auth.validate_telegram_init_data(init_data, BOT_TOKEN)
+
+    results = {
+        'initdata_validate_uncached_key_us': per_call_us(initdata_cold, args.iterations),
+        'initdata_validate_us': per_call_us(
+            lambda: telegram_auth.validate_telegram_init_data(init_data, BOT_TOKEN), args.iterations),
+        'session_token_verify_us': per_call_us(lambda: signer.verify(token), args.iterations),
+    }
+    results['speedup'] = results['initdata_validate_uncached_key_us'] / results['session_token_verify_us']
+
+    print(json.dumps({k: round(v, 3) for k, v in results.items()}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
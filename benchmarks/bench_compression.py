@@ -0,0 +1,140 @@
+"""
+Javobni siqish: CPU narxi va tejalgan bayt (odatiy JSON javoblarda)
+
+Ishga tushirish:
+    python benchmarks/bench_compression.py [--repeat 20] [--mbps 2]
+
+Database kerak emas. Javoblar jadval tuzilishi bo'yicha sintetik qatorlardan
+(Flask jsonify bilan bir xil serializatsiya). Har bir payload va daraja uchun:
+siqish vaqti (median), hajm, va `--mbps` tarmoqda tejalgan uzatish vaqti
+minus CPU vaqti (net, ms - musbat bo'lsa siqish foydali).
+Oxirida compression.LEVELS tanlagan daraja va stream (eksport) narxi.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+import compression  # noqa: E402
+
+CATEGORIES = ['Oziq-ovqat', 'Ichimliklar', 'Maishiy kimyo', 'Kanselyariya', 'Elektronika', 'Kiyim']
+TX_CATEGORIES = ['Savdo', 'Ijara', 'Maosh', 'Transport', 'Kommunal', 'Xizmatlar', 'Boshqa']
+
+
+def product_rows(rng, n):
+    started = datetime(2026, 1, 1)
+    return [{
+        'id': i + 1,
+        'user_id': 9000000001,
+        'name': f"{rng.choice(CATEGORIES)} mahsulot {i + 1}",
+        'category': rng.choice(CATEGORIES),
+        'barcode': str(4780000000000 + rng.randrange(10 ** 6)),
+        'price': f'{rng.randrange(1000, 500000)}.00',
+        'quantity': rng.randrange(0, 500),
+        'min_quantity': rng.randrange(0, 20),
+        'unit': rng.choice(['dona', 'kg', 'litr', 'quti']),
+        'image_url': None,
+        'created_at': (started + timedelta(minutes=rng.randrange(500000))).strftime('%a, %d %b %Y %H:%M:%S GMT'),
+        'updated_at': (started + timedelta(minutes=rng.randrange(500000))).strftime('%a, %d %b %Y %H:%M:%S GMT'),
+    } for i in range(n)]
+
+
+def transaction_rows(rng, n):
+    started = datetime(2026, 1, 1)
+    return [{
+        'id': i + 1,
+        'user_id': 9000000001,
+        'transaction_type': rng.choice(['income', 'expense', 'expense', 'debt']),
+        'amount': f'{rng.randrange(10000, 20000000)}.00',
+        'currency': 'UZS',
+        'category': rng.choice(TX_CATEGORIES),
+        'description': rng.choice(['', 'Naqd', "Karta orqali to'lov", 'Yetkazib beruvchiga', 'Mijozdan']),
+        'created_at': (started + timedelta(minutes=rng.randrange(500000))).strftime('%a, %d %b %Y %H:%M:%S GMT'),
+    } for i in range(n)]
+
+
+def payloads(app):
+    rng = random.Random(42)
+    dashboard = {
+        'success': True,
+        'data': {
+            'summary': {'total_income': 152000000.0, 'total_expense': 98000000.0, 'transaction_count': 412},
+            'top_categories': [{'category': c, 'total': rng.randrange(10 ** 6, 10 ** 8)} for c in TX_CATEGORIES],
+            'daily': [{'day': f'2026-03-{d:02d}', 'income': rng.randrange(10 ** 7), 'expense': rng.randrange(10 ** 7)}
+                      for d in range(1, 31)],
+            'low_stock': product_rows(rng, 10),
+        },
+    }
+    return [
+        ('tasks (20)', {'success': True, 'data': [{'id': i, 'title': f'Vazifa {i}', 'status': 'pending',
+                                                      'employee_name': 'Xodim', 'due_date': '2026-03-01'}
+                                                     for i in range(20)]}),
+        ('transactions (50)', {'success': True, 'data': transaction_rows(rng, 50), 'next_cursor': 'abc'}),
+        ('dashboard', dashboard),
+        ('products (200)', {'success': True, 'data': product_rows(rng, 200)}),
+        ('products (2000)', {'success': True, 'data': product_rows(rng, 2000)}),
+        ('transactions (20000)', {'success': True, 'data': transaction_rows(rng, 20000)}),
+    ]
+
+
+def median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--mbps', type=float, default=2.0, help="Mobil tarmoq tezligi (Mbit/s)")
+    args = parser.parse_args()
+    bytes_per_ms = args.mbps * 1e6 / 8 / 1000
+
+    app = Flask(__name__)
+    encodings = {'gzip': (1, 4, 6, 9)}
+    if compression.brotli is not None:
+        encodings['br'] = (1, 4, 5, 6, 11)
+    else:
+        print("brotli o'rnatilmagan - faqat gzip (pip install brotli)\n")
+
+    for name, payload in payloads(app):
+        body = app.json.dumps(payload).encode('utf-8')
+        print(f"{name}: {len(body)} bayt, uzatish {len(body) / bytes_per_ms:.1f} ms")
+        print(f"  {'kodlash':<8} {'daraja':>6} {'hajm':>9} {'nisbat':>7} {'cpu ms':>8} {'net ms':>8}")
+        for encoding, levels in encodings.items():
+            chosen = compression.level_for(encoding, len(body))
+            for level in levels:
+                repeat = max(3, args.repeat if len(body) < 10 ** 6 else args.repeat // 5)
+                compressed = compression.compress(body, encoding, level)
+                cpu = median_ms(lambda: compression.compress(body, encoding, level), repeat)
+                saved = (len(body) - len(compressed)) / bytes_per_ms
+                mark = '  <- LEVELS' if level == chosen else ''
+                print(f"  {encoding:<8} {level:>6} {len(compressed):>9} {len(body) / len(compressed):>6.1f}x "
+                      f"{cpu:>8.3f} {saved - cpu:>8.1f}{mark}")
+        print()
+
+    # Eksport: 64KB bo'laklar, har biri flush qilinadi (compress_stream)
+    body = app.json.dumps(transaction_rows(random.Random(1), 20000)).encode('utf-8')
+    chunks = [body[i:i + 64 * 1024] for i in range(0, len(body), 64 * 1024)]
+    for encoding in encodings:
+        level = compression.STREAM_LEVELS[encoding]
+        streamed = b''.join(compression.compress_stream(iter(chunks), encoding, level))
+        cpu = median_ms(lambda: b''.join(compression.compress_stream(iter(chunks), encoding, level)),
+                        max(3, args.repeat // 5))
+        whole = len(compression.compress(body, encoding, level))
+        print(f"stream {encoding} (daraja {level}, {len(chunks)} bo'lak): {len(body)} -> {len(streamed)} bayt "
+              f"(bir martada {whole}), cpu {cpu:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
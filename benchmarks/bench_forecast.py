@@ -0,0 +1,71 @@
+"""
+Prognoz benchmark: bitta user uchun kirim/chiqim/kategoriyalar prognozi vaqti
+
+Ishga tushirish:
+    python benchmarks/bench_forecast.py [--days 365] [--categories 8] [--repeat 50]
+
+Sintetik rollup qatorlari (trend + haftalik mavsum + shovqin) ishlatiladi,
+database kerak emas. Barcha qatorlar bitta NumPy o'tishida hisoblanadi;
+taqqoslash uchun har bir qatorni alohida hisoblash vaqti ham ko'rsatiladi.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import forecasting  # noqa: E402
+from forecasting import build_series, compute_forecast, forecast_matrix  # noqa: E402
+
+
+def make_rows(days, categories, today):
+    rng = np.random.default_rng(42)
+    rows = []
+    for offset in range(days):
+        day = today - timedelta(days=days - offset)
+        weekend = day.weekday() >= 5
+        for index in range(categories):
+            kind = 'income' if index % 2 == 0 else 'expense'
+            amount = (1000 + 3 * offset) * (1 + index) + (400 if weekend else 0) + rng.normal(0, 80)
+            rows.append({'day': day, 'transaction_type': kind, 'category': f"kategoriya-{index}",
+                         'amount_sum': max(amount, 0)})
+    return rows
+
+
+def best_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--categories', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    today = date.today()
+    rows = make_rows(args.days, args.categories, today)
+    history = forecasting._history_range(today)
+    matrix, labels, _ = build_series(rows, history)
+
+    full = best_ms(lambda: compute_forecast(rows, today), args.repeat)
+    batched = best_ms(lambda: forecast_matrix(matrix), args.repeat)
+    one_by_one = best_ms(lambda: [forecast_matrix(matrix[i:i + 1]) for i in range(matrix.shape[0])], args.repeat)
+
+    print(f"{matrix.shape[0]} qator x {matrix.shape[1]} kun ({len(rows)} rollup qatori)")
+    print(f"  compute_forecast (qatorlarni yig'ish bilan): {full:.2f} ms")
+    print(f"  forecast_matrix, bitta o'tish:              {batched:.2f} ms")
+    print(f"  forecast_matrix, har bir qator alohida:     {one_by_one:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Mahsulot import benchmark: CSV o'qish + validatsiya (+ ixtiyoriy MySQL upsert) tezligi
+
+Ishga tushirish:
+    python benchmarks/bench_import.py [--rows 50000]
+    python benchmarks/bench_import.py --rows 5000 --user-id 123   # real database'ga yozadi
+
+`--user-id` berilmasa database'ga murojaat qilinmaydi (dry run): faqat fayl
+o'qish va qatorlarni tekshirish o'lchanadi. Berilsa - .env dagi database'ga
+shu user uchun `bench-` prefiksli shtrix-kodlar bilan yoziladi.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from product_import import iter_csv, import_products  # noqa: E402
+
+
+def make_csv(rows):
+    """Sinov CSV fayli (bytes)"""
+    out = io.StringIO()
+    out.write('name,category,barcode,price,quantity,min_quantity,unit\n')
+    for i in range(rows):
+        out.write(f"Mahsulot {i},Kategoriya {i % 20},bench-{i:09d},{(i % 500) * 1000}.50,{i % 40},5,dona\n")
+    return out.getvalue().encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--user-id', type=int, help='Real database\'ga shu user uchun yozish')
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    data = make_csv(args.rows)
+    print(f"CSV: {args.rows} qator, {len(data) / 1024 / 1024:.1f} MB")
+
+    connection = None
+    if args.user_id:
+        from database import get_db_connection
+        connection = get_db_connection()
+
+    started = time.perf_counter()
+    try:
+        report = import_products(connection, args.user_id or 0, iter_csv(io.BytesIO(data)),
+                                 dry_run=connection is None, batch_size=args.batch_size)
+    finally:
+        if connection is not None:
+            connection.close()
+    elapsed = time.perf_counter() - started
+
+    mode = 'MySQL upsert' if connection is not None else 'dry run (DB\'siz)'
+    print(f"{mode}: {report['imported']} qator, {report['failed']} xato")
+    print(f"  {elapsed:.2f}s, {report['rows'] / elapsed:,.0f} qator/s")
+
+    # Xotira alohida o'lchanadi: tracemalloc tezlikni bir necha barobar sekinlashtiradi
+    tracemalloc.start()
+    import_products(None, 0, iter_csv(io.BytesIO(data)), dry_run=True, batch_size=args.batch_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  Python xotira cho'qqisi: {peak / 1024:.0f} KB (CSV faylning o'zi bundan tashqari)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Ro'yxat javobini serializatsiya qilish narxi (ms) va hajmi
+
+Ishga tushirish:
+    python benchmarks/bench_json.py [--rows 2000] [--repeat 20]
+
+Database kerak emas. warehouse_products tuzilishidagi qatorlar (Decimal, datetime):
+- Flask DefaultJSONProvider (oldingi jsonify)
+- json_provider: orjson va standart json (JSON_PROVIDER=json holati)
+- ?format=columnar: tuple qatorlar, kalitlar bir marta
+DictCursor har qator uchun dict yasaydi - bu qadam ham alohida o'lchanadi.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+import json_provider  # noqa: E402
+
+COLUMNS = ['id', 'user_id', 'name', 'category', 'barcode', 'price', 'quantity', 'min_quantity',
+           'unit', 'image_url', 'created_at', 'updated_at']
+
+
+def tuple_rows(n):
+    rng = random.Random(42)
+    started = datetime(2026, 1, 1)
+    return tuple((
+        i + 1, 9000000001, f"Mahsulot {i + 1}", rng.choice(['Oziq-ovqat', 'Ichimliklar', 'Kanselyariya']),
+        str(4780000000000 + rng.randrange(10 ** 6)), Decimal(f'{rng.randrange(1000, 500000)}.00'),
+        rng.randrange(500), rng.randrange(20), 'dona', None,
+        started + timedelta(minutes=rng.randrange(500000)), started + timedelta(minutes=rng.randrange(500000)),
+    ) for i in range(n))
+
+
+def median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default = DefaultJSONProvider(app)
+    fast = json_provider.FastJSONProvider(app)
+    rows = tuple_rows(args.rows)
+    dict_rows = [dict(zip(COLUMNS, row)) for row in rows]
+    objects = {'success': True, 'data': dict_rows}
+    columnar = {'success': True, 'columns': COLUMNS, 'rows': rows}
+
+    def stdlib(obj):
+        orjson, json_provider.orjson = json_provider.orjson, None
+        try:
+            return json_provider.dumps(obj)
+        finally:
+            json_provider.orjson = orjson
+
+    cases = [
+        ("DictCursor: tuple -> dict", lambda: [dict(zip(COLUMNS, row)) for row in rows], None),
+        ("Flask default, dict qatorlar", lambda: default.dumps(objects, separators=(',', ':')).encode(), None),
+        ("json_provider (json), dict", lambda: stdlib(objects), None),
+        ("json_provider (json), columnar", lambda: stdlib(columnar), None),
+    ]
+    if json_provider.orjson is not None:
+        cases += [
+            ("json_provider (orjson), dict", lambda: fast.encode(objects), None),
+            ("json_provider (orjson), columnar", lambda: fast.encode(columnar), None),
+        ]
+    else:
+        print("orjson o'rnatilmagan - faqat standart json\n")
+
+    print(f"{args.rows} qator")
+    for name, fn, _ in cases:
+        result = fn()
+        size = f"{len(result):>9} bayt" if isinstance(result, bytes) else ''
+        print(f"  {name:<36} {median_ms(fn, args.repeat):8.2f} ms {size}")
+
+
+if __name__ == '__main__':
+    main()
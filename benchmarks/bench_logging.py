@@ -0,0 +1,78 @@
+"""
+Log yozish narxi request thread'da (mikrosekund/chaqiruv)
+
+Ishga tushirish:
+    python benchmarks/bench_logging.py [--iterations 50000]
+
+Taqqoslanadi:
+- print() -> /dev/null (eng yaxshi holat) va sekin o'qiladigan pipe'ga
+  (log yig'uvchi orqada qolgan holat: stdout to'lib, print kutib qoladi)
+- logger.debug, DEBUG o'chiq (production default)
+- logger.info navbatga (log_setup) - yozishni fon thread'i bajaradi
+"""
+import argparse
+import io
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('LOG_RATE_LIMIT', '0')  # noqa: E402 - har bir chaqiruv navbatga tushsin
+import log_setup  # noqa: E402
+
+
+def per_call_us(fn, iterations):
+    started = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def slow_pipe(read_per_tick=16384, tick=0.01):
+    """Har `tick` soniyada `read_per_tick` bayt o'qiladigan pipe (yozish tomoni)"""
+    read_fd, write_fd = os.pipe()
+
+    def drain():
+        while True:
+            time.sleep(tick)
+            if not os.read(read_fd, read_per_tick):
+                return
+
+    threading.Thread(target=drain, daemon=True).start()
+    return io.TextIOWrapper(io.FileIO(write_fd, 'w'), write_through=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=50000)
+    args = parser.parse_args()
+    n = args.iterations
+    line = "API request: user_id=%s, has_business_plan=True, path=/api/transactions"
+
+    with open(os.devnull, 'w') as devnull:
+        print_devnull = per_call_us(lambda i: print(line % i, file=devnull), n)
+    pipe = slow_pipe()
+    print_pipe = per_call_us(lambda i: print(line % i, file=pipe), n // 10)
+
+    log_setup.configure()
+    # Listener stdout o'rniga /dev/null'ga yozadi - o'lchov faqat request thread'i uchun
+    with open(os.devnull, 'w') as devnull:
+        log_setup._listener.handlers[0].setStream(devnull)
+        logger = logging.getLogger('bench')
+        logger.setLevel(logging.INFO)
+        debug_off = per_call_us(lambda i: logger.debug(line, i), n)
+        queued = per_call_us(lambda i: logger.info(line, i), n)
+        log_setup.shutdown()
+
+    print(f"{n} iteratsiya")
+    print(f"  print -> /dev/null:          {print_devnull:8.2f} us")
+    print(f"  print -> sekin pipe:         {print_pipe:8.2f} us")
+    print(f"  logger.debug (o'chiq):       {debug_off:8.2f} us")
+    print(f"  logger.info -> navbat:       {queued:8.2f} us  (tashlangan: {log_setup.stats()['dropped']})")
+
+
+if __name__ == '__main__':
+    main()
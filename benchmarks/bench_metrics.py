@@ -0,0 +1,82 @@
+"""
+Metrika overhead'i: bitta request uchun qo'shiladigan vaqt (mikrosekund)
+
+Ishga tushirish:
+    python benchmarks/bench_metrics.py [--iterations 200000]
+
+Database kerak emas. O'lchanadi:
+- request hook'lari: before_request + after_request (histogramma, Server-Timing) + teardown
+- record_query: har bir SQL so'rovga qo'shiladigan qism
+- timed(): auth/plan kabi o'ralgan funksiya chaqiruvi
+- /metrics render: scrape narxi (request yo'lida emas)
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, Response  # noqa: E402
+
+import metrics  # noqa: E402
+
+
+def per_call_us(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.add_url_rule('/api/transactions', 'transactions', lambda: 'ok')
+    response = Response('ok')
+    empty = per_call_us(lambda: None, args.iterations)
+    # Har iteratsiyada qo'shilgan header olib tashlanadi; bu narx natijadan ayriladi
+    header_cost = per_call_us(lambda: (response.headers.add('Server-Timing', 'x'),
+                                       response.headers.pop('Server-Timing')), args.iterations) / 2
+
+    with app.test_request_context('/api/transactions'):
+        def request_hooks():
+            metrics._before_request()
+            metrics.record_query(0.001)
+            metrics.record_query(0.001)
+            metrics._after_request(response)
+            metrics._teardown_request()
+            response.headers.pop('Server-Timing')
+
+        def one_query():
+            metrics.record_query(0.001)
+
+        wrapped = metrics.timed('plan')(lambda: None)
+
+        hooks = per_call_us(request_hooks, args.iterations) - empty - header_cost
+        metrics._before_request()
+        query = per_call_us(one_query, args.iterations) - empty
+        timed = per_call_us(wrapped, args.iterations) - empty
+        metrics._teardown_request()
+
+    render = per_call_us(metrics.render, 200)
+
+    # Taqqoslash uchun: bo'sh Flask request'ining o'zi (test client, WSGI qatlamisiz)
+    plain = Flask(__name__)
+    plain.add_url_rule('/api/transactions', 'transactions', lambda: 'ok')
+    client = plain.test_client()
+    flask_request = per_call_us(lambda: client.get('/api/transactions'), 5000)
+
+    print(f"{args.iterations} iteratsiya")
+    print(f"  request hook'lari (2 so'rov bilan): {hooks:6.2f} us/request")
+    print(f"  record_query:                       {query:6.2f} us/so'rov")
+    print(f"  timed() o'rami:                     {timed:6.2f} us/chaqiruv")
+    print(f"  /metrics render:                    {render:6.0f} us/scrape")
+    print(f"  (bo'sh Flask request:               {flask_request:6.0f} us)")
+
+
+if __name__ == '__main__':
+    main()
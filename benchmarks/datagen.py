@@ -0,0 +1,301 @@
+"""
+Sintetik ma'lumotlar: benchmark va load-test uchun database'ni to'ldirish
+
+Ishga tushirish (bo'sh staging/local database, migrations qo'llangan):
+    python benchmarks/datagen.py --scale 1
+    python benchmarks/datagen.py --scale 10 --reset --manifest bench_manifest.json
+
+--scale 1 = 10 user, har biriga 2000 tranzaksiya, 200 mahsulot, 1000 ombor harakati,
+10 xodim, 100 vazifa (365 kun ichida). Hajmlar --users, --transactions va h.k. bilan
+alohida o'zgartiriladi. Bir xil --seed va parametrlar - bir xil ma'lumotlar.
+
+User'lar --user-id-base dan boshlab ketma-ket (haqiqiy Telegram id'lari bilan
+to'qnashmaydi), `users` jadvalida business tarifi bilan yoziladi. --reset shu
+oraliqdagi avvalgi ma'lumotlarni o'chiradi.
+
+transactions_daily rollup'i trigger'lar bilan to'ldiriladi (migrations/001);
+trigger'siz database'da --rebuild-rollup. Manifest (JSON) - benchmarks/load.py
+qaysi user'lar, mahsulotlar va xodimlar bilan ishlashini shundan oladi.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pymysql  # noqa: E402
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+# --scale 1 dagi hajmlar; har biri scale'ga ko'paytiriladi (users) yoki user boshiga
+BASE_USERS = 10
+PER_USER = {
+    'transactions': 2000,
+    'products': 200,
+    'movements': 1000,
+    'employees': 10,
+    'tasks': 100,
+}
+# Manifest'ga user boshiga yoziladigan id'lar soni
+MANIFEST_SAMPLE = 50
+
+CATEGORIES = {
+    'income': ('Savdo', 'Xizmat', 'Ulgurji savdo', 'Onlayn savdo', 'Boshqa daromad'),
+    'expense': ('Ijara', 'Maosh', 'Mahsulot xaridi', 'Transport', 'Kommunal', 'Reklama', 'Soliq', 'Boshqa'),
+    'debt': ('Qarz berildi', 'Qarz olindi'),
+}
+TRANSACTION_TYPES = (('income', 0.35), ('expense', 0.6), ('debt', 0.05))
+PRODUCT_CATEGORIES = ('Oziq-ovqat', 'Ichimliklar', 'Maishiy kimyo', 'Kiyim', 'Elektronika', 'Qurilish', 'Boshqa')
+UNITS = ('dona', 'kg', 'litr', 'quti', 'metr')
+REASONS = {'in': ('purchase', 'other'), 'out': ('sale', 'sale', 'sale', 'loss', 'defect')}
+TASK_STATUSES = (('pending', 0.3), ('in_progress', 0.2), ('completed', 0.45), ('cancelled', 0.05))
+NAMES = ('Aziz', 'Dilnoza', 'Jasur', 'Malika', 'Sardor', 'Nilufar', 'Bekzod', 'Gulnora', 'Otabek', 'Shahnoza')
+TASK_TITLES = ('Ombor inventarizatsiyasi', 'Yetkazib berish', 'Mijoz bilan uchrashuv', 'Hisobot tayyorlash',
+               'Mahsulot buyurtmasi', 'Narxlarni yangilash', "To'lovni tekshirish", 'Vitrina tartibi')
+
+# user jadvallari: (jadval, user ustuni) - --reset o'chirish tartibida (FK'lar hisobga olingan)
+USER_TABLES = (
+    ('business_tasks', 'owner_id'),
+    ('business_employees', 'owner_id'),
+    ('warehouse_movements', 'user_id'),
+    ('warehouse_products', 'user_id'),
+    ('transactions', 'user_id'),
+    ('transactions_daily', 'user_id'),
+    ('analytics_snapshots', 'user_id'),
+    ('analytics_active_users', 'user_id'),
+)
+
+
+def connect():
+    # Pool va profiler'siz: katta executemany so'rovlari fingerprint qilinmasin
+    return pymysql.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        database=os.getenv('DB_NAME', 'balansai_db'),
+        charset='utf8mb4',
+        autocommit=False,
+        connect_timeout=10,
+    )
+
+
+def weighted(rng, choices):
+    value = rng.random()
+    for item, weight in choices:
+        value -= weight
+        if value < 0:
+            return item
+    return choices[-1][0]
+
+
+def random_time(rng, now, days):
+    return (now - timedelta(seconds=rng.randrange(days * 86400))).replace(microsecond=0)
+
+
+def amount(rng, median):
+    """Lognormal summa, 1000 so'mgacha yaxlitlangan"""
+    return max(1000, round(rng.lognormvariate(0, 0.9) * median, -3))
+
+
+def transaction_rows(rng, user_id, count, now, days):
+    for _ in range(count):
+        kind = weighted(rng, TRANSACTION_TYPES)
+        yield (user_id, kind, amount(rng, 400000 if kind == 'income' else 250000), 'UZS',
+               rng.choice(CATEGORIES[kind]), None if rng.random() < 0.6 else f'{kind} #{rng.randrange(10000)}',
+               random_time(rng, now, days))
+
+
+def product_rows(rng, user_id, count):
+    for i in range(count):
+        yield (user_id, f'Mahsulot {i + 1}', rng.choice(PRODUCT_CATEGORIES),
+               None if rng.random() < 0.1 else f'{user_id % 100000:05d}{i:08d}',
+               amount(rng, 25000), rng.randrange(0, 500), rng.choice((0, 5, 10, 20)), rng.choice(UNITS))
+
+
+def movement_rows(rng, user_id, product_ids, count, now, days):
+    for _ in range(count):
+        kind = 'in' if rng.random() < 0.35 else 'out'
+        yield (user_id, rng.choice(product_ids), kind, rng.randrange(1, 50), amount(rng, 25000),
+               rng.choice(REASONS[kind]), random_time(rng, now, days))
+
+
+def employee_rows(rng, user_id, count):
+    for i in range(count):
+        yield (user_id, 7_000_000_000 + (user_id % 1_000_000) * 1000 + i,
+               f'{rng.choice(NAMES)} {i + 1}', 'manager' if i == 0 else 'employee', rng.random() > 0.1)
+
+
+def task_rows(rng, user_id, employee_ids, count, now, days):
+    for _ in range(count):
+        status = weighted(rng, TASK_STATUSES)
+        created = random_time(rng, now, days)
+        yield (user_id, rng.choice(employee_ids) if employee_ids and rng.random() < 0.8 else None,
+               rng.choice(TASK_TITLES), None, created + timedelta(days=rng.randrange(1, 14)), status,
+               created, created + timedelta(hours=rng.randrange(1, 240)) if status == 'completed' else None)
+
+
+def insert_many(cursor, sql, rows, batch):
+    """executemany INSERT ... VALUES ni ko'p qatorli so'rovlarga aylantiradi; batch - bittasidagi qatorlar"""
+    total = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= batch:
+            cursor.executemany(sql, chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        cursor.executemany(sql, chunk)
+        total += len(chunk)
+    return total
+
+
+def user_ids_of(cursor, sql, user_id):
+    cursor.execute(sql, (user_id,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def upsert_user(cursor, user_id, now):
+    """Business tarifli user; `users` jadvali bot'niki - bo'lmasa 0 (load.py --secret-key bilan ishlaydi)"""
+    try:
+        cursor.execute(
+            """INSERT INTO users (user_id, username, first_name, subscription_type, subscription_expires_at, created_at)
+               VALUES (%s, %s, %s, 'business', %s, NOW())
+               ON DUPLICATE KEY UPDATE subscription_type = 'business',
+                                       subscription_expires_at = VALUES(subscription_expires_at)""",
+            (user_id, f'bench_{user_id}', 'Bench', now + timedelta(days=365))
+        )
+    except pymysql.err.ProgrammingError:
+        return 0
+    return 1
+
+
+def reset(connection, first_id, last_id):
+    with connection.cursor() as cursor:
+        for table, column in USER_TABLES:
+            try:
+                cursor.execute(f"DELETE FROM {table} WHERE {column} BETWEEN %s AND %s", (first_id, last_id))
+            except pymysql.err.ProgrammingError as e:
+                # Migratsiya qo'llanmagan jadval
+                print(f"  {table}: o'tkazib yuborildi ({e.args[1] if len(e.args) > 1 else e})")
+    connection.commit()
+
+
+def load_user(connection, rng, user_id, sizes, now, days, batch):
+    """Bitta user ma'lumotlari; qaytaradi: manifest yozuvi va jadvallar bo'yicha qatorlar soni"""
+    counts = {}
+    with connection.cursor() as cursor:
+        counts['users'] = upsert_user(cursor, user_id, now)
+        counts['transactions'] = insert_many(
+            cursor,
+            """INSERT INTO transactions (user_id, transaction_type, amount, currency, category, description, created_at)
+               VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+            transaction_rows(rng, user_id, sizes['transactions'], now, days), batch)
+        counts['products'] = insert_many(
+            cursor,
+            """INSERT INTO warehouse_products (user_id, name, category, barcode, price, quantity, min_quantity, unit)
+               VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+            product_rows(rng, user_id, sizes['products']), batch)
+        product_ids = user_ids_of(cursor, "SELECT id FROM warehouse_products WHERE user_id = %s ORDER BY id", user_id)
+        counts['movements'] = insert_many(
+            cursor,
+            """INSERT INTO warehouse_movements (user_id, product_id, movement_type, quantity, price, reason, created_at)
+               VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+            movement_rows(rng, user_id, product_ids, sizes['movements'] if product_ids else 0, now, days), batch)
+        counts['employees'] = insert_many(
+            cursor,
+            """INSERT INTO business_employees (owner_id, telegram_id, name, role, is_active)
+               VALUES (%s, %s, %s, %s, %s)""",
+            employee_rows(rng, user_id, sizes['employees']), batch)
+        employee_ids = user_ids_of(cursor, "SELECT id FROM business_employees WHERE owner_id = %s ORDER BY id",
+                                   user_id)
+        counts['tasks'] = insert_many(
+            cursor,
+            """INSERT INTO business_tasks (owner_id, employee_id, title, description, due_date, status,
+                                           created_at, completed_at)
+               VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+            task_rows(rng, user_id, employee_ids, sizes['tasks'], now, days), batch)
+    connection.commit()
+
+    entry = {
+        'user_id': user_id,
+        'product_ids': rng.sample(product_ids, min(MANIFEST_SAMPLE, len(product_ids))),
+        'employee_ids': employee_ids[:MANIFEST_SAMPLE],
+    }
+    return entry, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1.0, help='user soni = 10 x scale')
+    parser.add_argument('--users', type=int, help='user soni (scale o\'rniga)')
+    for name, default in PER_USER.items():
+        parser.add_argument(f'--{name}', type=int, default=default, help=f'user boshiga (default {default})')
+    parser.add_argument('--days', type=int, default=365, help='ma\'lumotlar shu kunlar ichida tarqaladi')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--user-id-base', type=int, default=9_000_000_000)
+    parser.add_argument('--batch', type=int, default=2000, help='bitta INSERT dagi qatorlar')
+    parser.add_argument('--reset', action='store_true', help="oraliqdagi avvalgi ma'lumotlarni o'chirish")
+    parser.add_argument('--rebuild-rollup', action='store_true', help="trigger'siz database: rollup.py rebuild")
+    parser.add_argument('--manifest', default='bench_manifest.json')
+    args = parser.parse_args()
+
+    users = args.users if args.users is not None else max(1, round(BASE_USERS * args.scale))
+    sizes = {name: getattr(args, name) for name in PER_USER}
+    first_id = args.user_id_base
+    last_id = first_id + users - 1
+    # Vaqtlar bugungi kun boshidan orqaga: bir kun ichida qayta yuklash bir xil ma'lumot beradi
+    now = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    connection = connect()
+    try:
+        if args.reset:
+            print(f"O'chirilmoqda: user_id {first_id}..{last_id}")
+            reset(connection, first_id, last_id)
+
+        started = time.perf_counter()
+        totals = dict.fromkeys(('users', *PER_USER), 0)
+        entries = []
+        for index in range(users):
+            user_id = first_id + index
+            # Har bir user o'z seed'i bilan: --users o'zgarsa ham oldingi user'lar ma'lumoti bir xil
+            rng = random.Random(f'{args.seed}:{user_id}')
+            entry, counts = load_user(connection, rng, user_id, sizes, now, args.days, args.batch)
+            entries.append(entry)
+            for name, count in counts.items():
+                totals[name] += count
+            elapsed = time.perf_counter() - started
+            rows = sum(totals.values())
+            print(f"  {index + 1}/{users} user, {rows:,} qator, {rows / elapsed:,.0f} qator/s", end='\r')
+        print()
+    finally:
+        connection.close()
+
+    if args.rebuild_rollup:
+        from rollup import rebuild
+        for entry in entries:
+            rebuild(user_id=entry['user_id'])
+
+    manifest = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'scale': args.scale if args.users is None else None,
+        'days': args.days,
+        'per_user': sizes,
+        'totals': totals,
+        'users': entries,
+    }
+    with open(args.manifest, 'w') as f:
+        json.dump(manifest, f, indent=1)
+
+    elapsed = time.perf_counter() - started
+    print(f"Tayyor: {users} user, {totals}, {elapsed:.1f}s -> {args.manifest}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,522 @@
+"""
+Load-test: Mini App sessiyalarini ishlab turgan serverga qayta o'ynash
+
+Ishga tushirish (server alohida, masalan `gunicorn -c gunicorn.conf.py`;
+ma'lumotlar: python benchmarks/datagen.py):
+    python benchmarks/load.py run --url http://127.0.0.1:5000 --concurrency 50 --duration 60 \\
+        --output results/base.json
+    python benchmarks/load.py compare results/base.json results/new.json
+
+Har bir virtual foydalanuvchi Mini App'ni ochadi (bootstrap: sahifa, auth, bosh
+sahifa ma'lumotlari), keyin og'irliklar bo'yicha sahifalarni aylanadi: ombor,
+hisobotlar, analitika, xodimlar/vazifalar, AI chat. Yozish amallari (harakat,
+mahsulot, vazifa, inventarizatsiya, import) kichik ulushda; --read-only o'chiradi.
+User'lar, mahsulot va xodim id'lari datagen manifest'idan.
+
+Auth:
+- --bot-token (yoki BOT_TOKEN): initData lokal imzolanadi, bootstrap'da
+  /api/check-plan va /api/auth/session haqiqiy yo'l bilan o'tadi
+- --secret-key (yoki SECRET_KEY): sessiya tokeni lokal imzolanadi, auth endpoint'lari
+  va HTML sahifalar (ular faqat initData qabul qiladi) chetlab o'tiladi. Server bilan
+  bir xil kalit bo'lishi kerak
+
+Natija: endpoint bo'yicha so'rovlar, xatoliklar, rps, p50/p95/p99/max (ms);
+--output JSON (run metadata, git commit, manifest bilan) - `compare` shu fayllarni
+taqqoslaydi. --warmup soniyadagi so'rovlar hisobga olinmaydi. Bir xil --seed -
+bir xil sessiya ketma-ketligi (server javob vaqtlari farq qilishi mumkin).
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.parse
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from session_token import SessionTokenSigner  # noqa: E402
+
+# Sahifa og'irliklari (bootstrap'dan keyingi navigatsiya)
+PAGES = (('home', 0.25), ('warehouse', 0.25), ('reports', 0.2), ('analytics', 0.1),
+         ('employees', 0.12), ('ai_chat', 0.08))
+PERIODS = ('day', 'week', 'month', 'month', 'year')
+AI_MESSAGES = ('Salom', 'Balansim qancha?', 'Bu oy daromad qancha', 'Kelgusi oy prognoz',
+               "Eng ko'p sotilgan mahsulotlar", 'Omborda nima kam qoldi', 'Xarajatlarim qayerga ketyapti')
+STATUS_FILTERS = ('pending', 'in_progress', 'completed')
+
+
+class HttpSession:
+    """Bitta keep-alive HTTP/1.1 connection (Content-Length va chunked javoblar)"""
+
+    def __init__(self, host, port, use_ssl=False):
+        self.host = host
+        self.port = port
+        self.ssl = use_ssl or None
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=b'', headers=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", "Connection: keep-alive"]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        if body or method in ('POST', 'PUT'):
+            lines.append(f"Content-Length: {len(body)}")
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('server connection yopildi')
+        status = int(status_line.split()[1])
+        length = None
+        chunked = close = False
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'transfer-encoding' and 'chunked' in value:
+                chunked = True
+            elif name == 'connection' and value == 'close':
+                close = True
+
+        if chunked:
+            parts = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    while (await self.reader.readline()) not in (b'\r\n', b''):
+                        pass
+                    break
+                parts.append(await self.reader.readexactly(size + 2))
+            payload = b''.join(part[:-2] for part in parts)
+        elif length is not None:
+            payload = await self.reader.readexactly(length)
+        else:
+            payload = await self.reader.read()
+            close = True
+        if close:
+            self.close()
+        return status, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def sign_init_data(bot_token, user_id):
+    """Telegram WebApp initData (telegram_auth.validate_telegram_init_data bilan bir xil algoritm)"""
+    fields = {
+        'auth_date': str(int(time.time())),
+        'query_id': f'bench{user_id}',
+        'user': json.dumps({'id': user_id, 'first_name': 'Bench', 'username': f'bench_{user_id}'},
+                           separators=(',', ':')),
+    }
+    check_string = '\n'.join(f'{key}={fields[key]}' for key in sorted(fields))
+    secret = hmac.new(b'WebAppData', bot_token.encode(), hashlib.sha256).digest()
+    fields['hash'] = hmac.new(secret, check_string.encode(), hashlib.sha256).hexdigest()
+    return urllib.parse.urlencode(fields)
+
+
+def multipart(fields, filename, content):
+    boundary = f'bench{random.getrandbits(64):016x}'
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+             for name, value in fields.items()]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 f'Content-Type: text/csv\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class Stats:
+    def __init__(self, measure_from):
+        self.measure_from = measure_from
+        self.endpoints = {}
+        self.sessions = 0
+
+    def record(self, key, status, seconds, size):
+        if time.perf_counter() < self.measure_from:
+            return
+        entry = self.endpoints.get(key)
+        if entry is None:
+            entry = self.endpoints[key] = {'latencies': [], 'statuses': {}, 'bytes': 0}
+        entry['statuses'][status] = entry['statuses'].get(status, 0) + 1
+        entry['bytes'] += size
+        if status == 200:
+            entry['latencies'].append(seconds)
+
+
+class VirtualUser:
+    """Bitta Mini App foydalanuvchisi: sessiyalar ketma-ket, har biri yangi connection bilan"""
+
+    def __init__(self, args, stats, users, rng):
+        self.args = args
+        self.stats = stats
+        self.users = users
+        self.rng = rng
+        self.client = None
+        self.user = None
+        self.headers = {}
+        self.init_data = None
+
+    async def call(self, key, method, path, payload=None, body=None, content_type=None):
+        """So'rov; 200 va JSON bo'lsa - dict, aks holda None"""
+        headers = dict(self.headers)
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            content_type = 'application/json'
+        if content_type:
+            headers['Content-Type'] = content_type
+        started = time.perf_counter()
+        try:
+            status, data = await self.client.request(method, path, body or b'', headers)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            self.client.close()
+            self.stats.record(f'{method} {key}', 'connection', time.perf_counter() - started, 0)
+            return None
+        self.stats.record(f'{method} {key}', status, time.perf_counter() - started, len(data))
+        if status != 200 or not data.startswith(b'{'):
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    async def think(self):
+        if self.args.think_ms > 0:
+            await asyncio.sleep(self.rng.expovariate(1000 / self.args.think_ms))
+
+    async def page(self, path):
+        """HTML sahifa: server faqat initData bilan beradi (Bearer emas) - sessiya tokeni rejimida o'tkaziladi"""
+        if self.init_data:
+            headers, self.headers = self.headers, {'X-Telegram-Init-Data': self.init_data}
+            try:
+                await self.call(path, 'GET', path)
+            finally:
+                self.headers = headers
+
+    def writes(self, probability):
+        return not self.args.read_only and self.rng.random() < probability
+
+    def product_id(self):
+        return self.rng.choice(self.user['product_ids']) if self.user['product_ids'] else None
+
+    async def bootstrap(self):
+        user_id = self.user['user_id']
+        self.headers = {}
+        self.init_data = None
+        if self.args.bot_token:
+            self.init_data = sign_init_data(self.args.bot_token, user_id)
+            await self.page('/')
+            self.headers = {'X-Telegram-Init-Data': self.init_data}
+            await self.call('/api/check-plan', 'GET', '/api/check-plan')
+            result = await self.call('/api/auth/session', 'POST', '/api/auth/session', body=b'')
+            if result and result.get('data'):
+                self.headers = {'Authorization': f"Bearer {result['data']['token']}"}
+        else:
+            token = self.args.signer.issue(user_id, username=f'bench_{user_id}', has_business_plan=True)
+            self.headers = {'Authorization': f"Bearer {token['token']}"}
+        await self.home()
+        for path in ('/api/warehouse/products', '/api/employees', '/api/tasks'):
+            await self.call(path, 'GET', path)
+
+    async def home(self):
+        await self.call('/api/reports/summary', 'GET', '/api/reports/summary?period=month')
+        await self.call('/api/transactions', 'GET', '/api/transactions?limit=5')
+
+    async def warehouse(self):
+        await self.page('/warehouse')
+        await self.call('/api/warehouse/products', 'GET', '/api/warehouse/products')
+        product_id = self.product_id()
+        if product_id is None:
+            return
+        await self.call('/api/warehouse/movements', 'GET', f'/api/warehouse/movements?product_id={product_id}')
+        if self.writes(0.2):
+            await self.call('/api/warehouse/movements', 'POST', '/api/warehouse/movements', {
+                'product_id': product_id, 'movement_type': self.rng.choice(('in', 'out')),
+                'quantity': self.rng.randrange(1, 10), 'price': 10000, 'reason': 'sale'})
+        if self.writes(0.03):
+            product = {'name': f'Bench {self.rng.getrandbits(32):08x}', 'category': 'Boshqa', 'price': 5000,
+                       'quantity': 10, 'min_quantity': 1, 'unit': 'dona'}
+            created = await self.call('/api/warehouse/products', 'POST', '/api/warehouse/products', product)
+            if created and created.get('data'):
+                path = f"/api/warehouse/products/{created['data']['id']}"
+                await self.call('/api/warehouse/products/<id>', 'PUT', path, dict(product, price=6000))
+                await self.call('/api/warehouse/products/<id>', 'DELETE', path)
+        if self.writes(0.03):
+            items = [{'product_id': pid, 'quantity': self.rng.randrange(0, 100)}
+                     for pid in self.rng.sample(self.user['product_ids'], min(5, len(self.user['product_ids'])))]
+            await self.call('/api/warehouse/stocktake', 'POST', '/api/warehouse/stocktake',
+                            {'items': items, 'dry_run': True})
+        if self.writes(0.01):
+            rows = ''.join(f'Bench import {i},Boshqa,,{1000 * (i + 1)},{i},0,dona\n' for i in range(20))
+            body, content_type = multipart({'dry_run': 'true'}, 'products.csv',
+                                           ('name,category,barcode,price,quantity,min_quantity,unit\n' + rows).encode())
+            await self.call('/api/warehouse/products/import', 'POST', '/api/warehouse/products/import',
+                            body=body, content_type=content_type)
+
+    async def reports(self):
+        await self.page('/reports')
+        await self.call('/api/reports/summary', 'GET', f'/api/reports/summary?period={self.rng.choice(PERIODS)}')
+        page = await self.call('/api/transactions', 'GET', '/api/transactions?limit=50')
+        if page and page.get('next_cursor') and self.rng.random() < 0.5:
+            await self.call('/api/transactions', 'GET',
+                            f"/api/transactions?limit=50&cursor={urllib.parse.quote(page['next_cursor'])}")
+        await self.call('/api/analytics/category-analysis', 'GET', '/api/analytics/category-analysis')
+        if self.rng.random() < 0.03:
+            await self.call('/api/export/<table>', 'GET', '/api/export/transactions?format=csv&period=month')
+
+    async def analytics(self):
+        await self.call('/api/analytics/dashboard', 'GET', f'/api/analytics/dashboard?period={self.rng.choice(PERIODS)}')
+        await self.call('/api/analytics/forecast', 'GET', '/api/analytics/forecast')
+
+    async def employees(self):
+        await self.page('/employees')
+        await self.call('/api/employees', 'GET', '/api/employees')
+        await self.call('/api/tasks', 'GET', '/api/tasks')
+        await self.call('/api/tasks', 'GET', f'/api/tasks?status={self.rng.choice(STATUS_FILTERS)}')
+        if self.writes(0.1):
+            employee_ids = self.user['employee_ids']
+            task = {'title': 'Bench vazifa', 'description': None, 'status': 'pending',
+                    'employee_id': self.rng.choice(employee_ids) if employee_ids else None}
+            created = await self.call('/api/tasks', 'POST', '/api/tasks', task)
+            if created and created.get('data'):
+                path = f"/api/tasks/{created['data']['id']}"
+                await self.call('/api/tasks/<id>', 'PUT', path, dict(task, status='completed'))
+                await self.call('/api/tasks/<id>', 'DELETE', path)
+        if self.writes(0.03):
+            employee = {'name': 'Bench xodim', 'role': 'employee', 'telegram_id': 6_000_000_000 + self.rng.randrange(10**6)}
+            created = await self.call('/api/employees', 'POST', '/api/employees', employee)
+            if created and created.get('data'):
+                path = f"/api/employees/{created['data']['id']}"
+                await self.call('/api/employees/<id>', 'PUT', path, dict(employee, is_active=False))
+                await self.call('/api/employees/<id>', 'DELETE', path)
+
+    async def ai_chat(self):
+        await self.page('/ai-chat')
+        for _ in range(self.rng.randint(1, 3)):
+            await self.call('/api/ai/chat', 'POST', '/api/ai/chat', {'message': self.rng.choice(AI_MESSAGES)})
+            await self.think()
+
+    async def run(self, deadline):
+        while time.perf_counter() < deadline:
+            self.user = self.rng.choice(self.users)
+            self.client = HttpSession(self.args.host, self.args.port, self.args.ssl)
+            try:
+                await self.bootstrap()
+                for _ in range(self.rng.randint(1, self.args.max_pages)):
+                    if time.perf_counter() >= deadline:
+                        break
+                    await self.think()
+                    page = _weighted(self.rng, PAGES)
+                    await getattr(self, page)()
+                self.stats.sessions += time.perf_counter() >= self.stats.measure_from
+            finally:
+                self.client.close()
+
+
+def _weighted(rng, choices):
+    value = rng.random()
+    for item, weight in choices:
+        value -= weight
+        if value < 0:
+            return item
+    return choices[-1][0]
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def summarize(stats, elapsed):
+    endpoints = {}
+    total_ok = total_errors = 0
+    for key in sorted(stats.endpoints):
+        entry = stats.endpoints[key]
+        latencies = sorted(entry['latencies'])
+        requests = sum(entry['statuses'].values())
+        errors = requests - len(latencies)
+        total_ok += len(latencies)
+        total_errors += errors
+        endpoints[key] = {
+            'requests': requests,
+            'errors': errors,
+            'statuses': {str(status): count for status, count in entry['statuses'].items()},
+            'rps': round(requests / elapsed, 2),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            'bytes': entry['bytes'],
+        }
+    everything = sorted(latency for entry in stats.endpoints.values() for latency in entry['latencies'])
+    totals = {
+        'requests': total_ok + total_errors,
+        'errors': total_errors,
+        'sessions': stats.sessions,
+        'rps': round((total_ok + total_errors) / elapsed, 2),
+        'p50_ms': round(percentile(everything, 0.5) * 1000, 2),
+        'p95_ms': round(percentile(everything, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(everything, 0.99) * 1000, 2),
+    }
+    return totals, endpoints
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_table(result):
+    totals = result['totals']
+    print(f"{result['meta']['url']}: {result['meta']['concurrency']} virtual user, {result['duration_s']}s, "
+          f"{totals['sessions']} sessiya")
+    print(f"{'endpoint':<44} {'sorov':>7} {'xato':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for key, row in result['endpoints'].items():
+        print(f"{key:<44} {row['requests']:>7} {row['errors']:>5} {row['rps']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+    print(f"{'JAMI':<44} {totals['requests']:>7} {totals['errors']:>5} {totals['rps']:>8.1f} "
+          f"{totals['p50_ms']:>8.1f} {totals['p95_ms']:>8.1f} {totals['p99_ms']:>8.1f}")
+
+
+async def run_load(args, users):
+    started = time.perf_counter()
+    stats = Stats(started + args.warmup)
+    deadline = started + args.warmup + args.duration
+    rng = random.Random(args.seed)
+    virtual_users = [VirtualUser(args, stats, users, random.Random(rng.getrandbits(64)))
+                     for _ in range(args.concurrency)]
+    await asyncio.gather(*(user.run(deadline) for user in virtual_users))
+    return stats, time.perf_counter() - stats.measure_from
+
+
+def run(args):
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    users = manifest['users'][:args.users] if args.users else manifest['users']
+    if not users:
+        sys.exit("Manifest'da user yo'q: python benchmarks/datagen.py")
+
+    url = urllib.parse.urlsplit(args.url)
+    args.host = url.hostname
+    args.ssl = url.scheme == 'https'
+    args.port = url.port or (443 if args.ssl else 80)
+    if not args.bot_token:
+        if not args.secret_key:
+            sys.exit('--bot-token yoki --secret-key kerak (server bilan bir xil)')
+        args.signer = SessionTokenSigner(args.secret_key, ttl=args.warmup + args.duration + 600)
+
+    stats, elapsed = asyncio.run(run_load(args, users))
+    totals, endpoints = summarize(stats, elapsed)
+    result = {
+        'meta': {
+            'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'url': args.url,
+            'git_commit': git_commit(),
+            'concurrency': args.concurrency,
+            'warmup_s': args.warmup,
+            'think_ms': args.think_ms,
+            'max_pages': args.max_pages,
+            'read_only': args.read_only,
+            'seed': args.seed,
+            'auth': 'init_data' if args.bot_token else 'session_token',
+            'manifest': {key: manifest.get(key) for key in ('seed', 'scale', 'days', 'per_user', 'totals')},
+            'users': len(users),
+        },
+        'duration_s': round(elapsed, 2),
+        'totals': totals,
+        'endpoints': endpoints,
+    }
+    print_table(result)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=1)
+        print(f"-> {args.output}")
+
+
+def _change(before, after):
+    if not before:
+        return ''
+    return f"{(after - before) / before * 100:+.0f}%"
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    print(f"base: {base['meta'].get('git_commit')} {base['meta']['started_at']}  "
+          f"new: {new['meta'].get('git_commit')} {new['meta']['started_at']}")
+    print(f"{'endpoint':<44} {'rps':>16} {'p50 ms':>20} {'p95 ms':>20} {'p99 ms':>20}")
+    regressions = []
+    rows = [(key, base['endpoints'].get(key), new['endpoints'].get(key))
+            for key in sorted(set(base['endpoints']) | set(new['endpoints']))]
+    rows.append(('JAMI', base['totals'], new['totals']))
+    for key, before, after in rows:
+        if not before or not after:
+            print(f"{key:<44} {'faqat ' + ('new' if after else 'base'):>16}")
+            continue
+        cells = [f"{after['rps']:>8.1f} {_change(before['rps'], after['rps']):>7}"]
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+            cells.append(f"{after[metric]:>11.1f} {_change(before[metric], after[metric]):>8}")
+        slower = before['p95_ms'] and (after['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 > args.threshold
+        if slower:
+            regressions.append(key)
+        print(f"{key:<44} {' '.join(cells)}{'  !' if slower else ''}")
+    if regressions:
+        print(f"\np95 {args.threshold:.0f}% dan ko'proq sekinlashgan: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help='Load-test')
+    run_parser.add_argument('--url', default='http://127.0.0.1:5000')
+    run_parser.add_argument('--manifest', default='bench_manifest.json')
+    run_parser.add_argument('--users', type=int, help="manifest'dagi birinchi N user")
+    run_parser.add_argument('--concurrency', type=int, default=20, help='parallel virtual foydalanuvchilar')
+    run_parser.add_argument('--duration', type=int, default=60, help="o'lchash, sekund")
+    run_parser.add_argument('--warmup', type=int, default=10, help='hisobga olinmaydigan boshlang\'ich sekundlar')
+    run_parser.add_argument('--think-ms', type=float, default=0, help="so'rovlar orasidagi o'rtacha pauza")
+    run_parser.add_argument('--max-pages', type=int, default=8, help='bitta sessiyadagi maksimal sahifalar')
+    run_parser.add_argument('--read-only', action='store_true', help='yozish amallarisiz')
+    run_parser.add_argument('--seed', type=int, default=1)
+    run_parser.add_argument('--bot-token', default=os.getenv('BOT_TOKEN', ''))
+    run_parser.add_argument('--secret-key', default=os.getenv('SECRET_KEY', ''))
+    run_parser.add_argument('--output', help='natija JSON fayli')
+    compare_parser = subparsers.add_parser('compare', help='Ikki natijani taqqoslash')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=10, help='p95 regressiya chegarasi, %%')
+    compare_parser.add_argument('--fail-on-regression', action='store_true', help='regressiya bo\'lsa exit 1')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+JS bundle'larni yig'ish (deploy'da, ilovadan oldin)
+
+    python build_assets.py [--no-minify] [--keep N]
+
+- assets.BUNDLES bo'yicha static/js fayllari birlashtiriladi va minify qilinadi
+  (izohlar va ortiqcha bo'shliqlar; satr, template literal va regex'lar o'zgarmaydi,
+  qator ko'chishlari ASI uchun saqlanadi)
+- static/dist/<bundle>.<sha256[:10]>.js, yonida .gz va .br (brotli o'rnatilgan bo'lsa:
+  pip install brotli), static/dist/manifest.json
+- Bir bundle'da ikki fayl bir xil top-level const/let/class/function e'lon qilsa
+  build to'xtaydi: bitta <script> ichida bu SyntaxError (yoki jim qayta yozish) bo'lardi
+- Eski hash'li fayllardan oxirgi --keep tasi qoladi: deploy paytida eski HTML ochgan
+  mijozlar ham o'z fayllarini oladi
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+from assets import BUNDLES, DIST_DIR, MANIFEST_PATH, STATIC_DIR, bundle_key
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JS_DIR = os.path.join(STATIC_DIR, 'js')
+
+# Shulardan keyingi `/` - regex boshlanishi (bo'lmasa bo'lish)
+_REGEX_AFTER_CHARS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_AFTER_WORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void',
+                      'throw', 'instanceof', 'yield', 'await'}
+# Atrofidagi bo'shliq olib tashlansa token'lar qo'shilib ketmaydigan belgilar
+# (+, -, / bundan mustasno: `a + +b`, `a / /re/`)
+_TIGHT = set('{}()[];,:=<>!?&|*%^~')
+_TOP_LEVEL_DECL = re.compile(r'^(?:async\s+)?(?:const|let|var|class|function\*?)\s+([A-Za-z_$][\w$]*)', re.M)
+
+
+def _is_ident(ch):
+    return ch.isalnum() or ch in '_$'
+
+
+def _regex_allowed(out):
+    """Chiqarilgan koddan keyin `/` regex bo'la oladimi"""
+    text = ''.join(out[-20:]).rstrip()
+    if not text:
+        return True
+    if text[-1] in _REGEX_AFTER_CHARS:
+        return True
+    word = re.search(r'[A-Za-z_$][\w$]*$', text)
+    return bool(word) and word.group() in _REGEX_AFTER_WORDS
+
+
+def minify_js(source):
+    """Izoh va bo'shliqlarni olib tashlash (token'lar va qator ko'chishlari saqlanadi)"""
+    out = []
+    i, n = 0, len(source)
+    # Har bir ochiq `${` uchun ichidagi `{` chuqurligi
+    template_braces = []
+    pending_space = None  # None | ' ' | '\n'
+
+    def emit(text):
+        nonlocal pending_space
+        if pending_space and out:
+            prev, nxt = out[-1][-1], text[0]
+            if pending_space == '\n':
+                if prev not in '{;,(' and nxt not in '})],;':
+                    out.append('\n')
+            elif not (prev in _TIGHT or nxt in _TIGHT):
+                out.append(' ')
+        pending_space = None
+        out.append(text)
+
+    def read_template(start):
+        """start - ochilgan ` dan keyingi indeks; ` yoki ${ gacha o'qiydi"""
+        j = start
+        while j < n:
+            ch = source[j]
+            if ch == '\\':
+                j += 2
+                continue
+            if ch == '`':
+                return j + 1, False
+            if ch == '$' and j + 1 < n and source[j + 1] == '{':
+                return j + 2, True
+            j += 1
+        raise ValueError("Yopilmagan template literal")
+
+    while i < n:
+        ch = source[i]
+        nxt = source[i + 1] if i + 1 < n else ''
+
+        if ch in ' \t\r\n':
+            j = i
+            while j < n and source[j] in ' \t\r\n':
+                j += 1
+            if pending_space != '\n':
+                pending_space = '\n' if '\n' in source[i:j] else ' '
+            i = j
+        elif ch == '/' and nxt == '/':
+            j = source.find('\n', i)
+            i = n if j == -1 else j
+        elif ch == '/' and nxt == '*':
+            j = source.find('*/', i + 2)
+            if j == -1:
+                raise ValueError("Yopilmagan /* izoh")
+            if '\n' in source[i:j]:
+                pending_space = '\n'
+            elif pending_space is None:
+                pending_space = ' '
+            i = j + 2
+        elif ch in '\'"':
+            j = i + 1
+            while j < n and source[j] != ch:
+                if source[j] == '\n':
+                    raise ValueError(f"Yopilmagan satr: {source[i:j][:40]!r}")
+                j += 2 if source[j] == '\\' else 1
+            emit(source[i:j + 1])
+            i = j + 1
+        elif ch == '`':
+            j, opened = read_template(i + 1)
+            emit(source[i:j])
+            if opened:
+                template_braces.append(0)
+            i = j
+        elif ch == '/' and _regex_allowed(out):
+            j, in_class = i + 1, False
+            while j < n:
+                c = source[j]
+                if c == '\\':
+                    j += 2
+                    continue
+                if c == '\n':
+                    raise ValueError(f"Regex tanib bo'lmadi: {source[i:j][:40]!r}")
+                if c == '[':
+                    in_class = True
+                elif c == ']':
+                    in_class = False
+                elif c == '/' and not in_class:
+                    break
+                j += 1
+            j += 1
+            while j < n and _is_ident(source[j]):
+                j += 1
+            emit(source[i:j])
+            i = j
+        elif ch == '{' and template_braces:
+            template_braces[-1] += 1
+            emit(ch)
+            i += 1
+        elif ch == '}' and template_braces and template_braces[-1] == 0:
+            # ${...} tugadi - template davom etadi
+            template_braces.pop()
+            j, opened = read_template(i + 1)
+            emit(source[i:j])
+            if opened:
+                template_braces.append(0)
+            i = j
+        else:
+            if ch == '}' and template_braces:
+                template_braces[-1] -= 1
+            j = i + 1
+            if _is_ident(ch):
+                while j < n and _is_ident(source[j]):
+                    j += 1
+            emit(source[i:j])
+            i = j
+
+    return ''.join(out) + '\n'
+
+
+def check_declarations(name, files):
+    """Bundle'dagi fayllar bir xil top-level nomni e'lon qilmasligi kerak"""
+    seen = {}
+    for filename, source in files:
+        for declared in _TOP_LEVEL_DECL.findall(source):
+            if declared in seen and seen[declared] != filename:
+                raise SystemExit(f"{name}: '{declared}' {seen[declared]} va {filename} da e'lon qilingan - "
+                                 f"bitta bundle'da bo'la olmaydi")
+            seen[declared] = filename
+
+
+def build_bundle(name, files, minify=True):
+    """(mantiqiy nom, hash'li fayl nomi, kontent)"""
+    sources = []
+    for filename in files:
+        with open(os.path.join(JS_DIR, filename), encoding='utf-8') as f:
+            sources.append((filename, f.read()))
+    check_declarations(name, sources)
+
+    parts = []
+    for filename, source in sources:
+        body = minify_js(source) if minify else source
+        # `;` - oldingi fayl qavs bilan boshlanadigan keyingisiga qo'shilib ketmasin
+        parts.append(f'/* {filename} */\n{body.rstrip()}\n;')
+    content = ('\n'.join(parts) + '\n').encode('utf-8')
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    return bundle_key(name), f'{name}.{digest}.js', content
+
+
+def _write(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def prune(keep):
+    """Har bir bundle'ning eng yangi `keep` ta versiyasidan eskilarini o'chirish"""
+    versions = {}
+    for filename in os.listdir(DIST_DIR):
+        match = re.match(r'^(\w+)\.[0-9a-f]{10}\.js$', filename)
+        if match:
+            versions.setdefault(match.group(1), []).append(filename)
+    for filenames in versions.values():
+        filenames.sort(key=lambda f: os.path.getmtime(os.path.join(DIST_DIR, f)), reverse=True)
+        for old in filenames[keep:]:
+            for suffix in ('', '.gz', '.br'):
+                try:
+                    os.remove(os.path.join(DIST_DIR, old + suffix))
+                except FileNotFoundError:
+                    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--no-minify', action='store_true', help="Fayllar faqat birlashtiriladi")
+    parser.add_argument('--keep', type=int, default=3, help="Har bir bundle'ning saqlanadigan versiyalari")
+    args = parser.parse_args()
+
+    os.makedirs(DIST_DIR, exist_ok=True)
+    if brotli is None:
+        print("brotli o'rnatilmagan - faqat .gz yoziladi (pip install brotli)", file=sys.stderr)
+
+    manifest = {}
+    for name, files in BUNDLES.items():
+        key, filename, content = build_bundle(name, files, minify=not args.no_minify)
+        path = os.path.join(DIST_DIR, filename)
+        _write(path, content)
+        # mtime'siz: bir xil kontent - bir xil .gz bayt'lari
+        _write(path + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+        sizes = f"gz {os.path.getsize(path + '.gz')}"
+        if brotli is not None:
+            _write(path + '.br', brotli.compress(content, quality=11))
+            sizes += f", br {os.path.getsize(path + '.br')}"
+        source_size = sum(os.path.getsize(os.path.join(JS_DIR, f)) for f in files)
+        print(f"{filename}: {source_size} -> {len(content)} bayt ({sizes})")
+        manifest[key] = f'dist/{filename}'
+
+    _write(MANIFEST_PATH, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    prune(args.keep)
+    print(f"Manifest: {MANIFEST_PATH}")
+
+
+if __name__ == '__main__':
+    main()
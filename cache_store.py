@@ -0,0 +1,97 @@
+"""
+Process ichidagi kichik kesh (LRU + TTL)
+Har bir gunicorn worker o'z nusxasiga ega
+"""
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+_MISSING = object()
+# Monitoring uchun (metrics.py): barcha yaratilgan keshlar
+_stores = weakref.WeakSet()
+
+
+class CacheStore:
+    """
+    Thread-safe LRU kesh.
+
+    - `max_size` dan oshganda eng kam ishlatilgan yozuv chiqarib tashlanadi
+    - har bir yozuv o'z TTL'iga ega bo'lishi mumkin (`ttl=None` - muddatsiz)
+    - hit/miss hisoblagichlari monitoring uchun `stats()` orqali beriladi
+    """
+
+    def __init__(self, name, max_size=10000, default_ttl=None):
+        self.name = name
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        _stores.add(self)
+
+    def get(self, key, default=None):
+        """Kalit bo'yicha qiymatni olish (muddati o'tgan bo'lsa - miss)"""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                value, expires_at = item
+                if expires_at is None or expires_at > now:
+                    self._data.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._data[key]
+            self._misses += 1
+            return default
+
+    def set(self, key, value, ttl=_MISSING):
+        """Qiymatni saqlash; `ttl` soniyada (berilmasa - default_ttl)"""
+        if ttl is _MISSING:
+            ttl = self.default_ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key):
+        """Bitta yozuvni o'chirish"""
+        with self._lock:
+            removed = self._data.pop(key, _MISSING) is not _MISSING
+            if removed:
+                self._invalidations += 1
+            return removed
+
+    def clear(self):
+        """Barcha yozuvlarni o'chirish"""
+        with self._lock:
+            count = len(self._data)
+            self._data.clear()
+            self._invalidations += count
+            return count
+
+    def stats(self):
+        """Kesh statistikasi"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'name': self.name,
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
+
+
+def all_stats():
+    """Barcha keshlar statistikasi (nomi bo'yicha tartibda)"""
+    return sorted((store.stats() for store in list(_stores)), key=lambda stats: stats['name'])
@@ -0,0 +1,180 @@
+"""
+Javoblarni siqish (Accept-Encoding bo'yicha gzip / brotli)
+
+- Faqat matnli turlar (JSON, CSV, NDJSON, HTML) va COMPRESS_MIN_SIZE dan katta javoblar:
+  kichik javobda header va CPU tejalgan baytdan qimmat
+- Daraja javob hajmiga qarab: 16KB gacha eng yuqori daraja ham ~0.1 ms,
+  katta javobda daraja pasayadi - CPU vaqti hajm bilan tez o'smasin
+  (o'lchovlar: benchmarks/bench_compression.py)
+- Stream javoblar (eksport) bo'lakma-bo'lak siqiladi: har bo'lak flush qilinadi,
+  mijoz birinchi baytlarni oxirini kutmasdan oladi
+- Kodlash tanlansa ham, tanlanmasa ham siqiladigan turdagi javobga
+  `Vary: Accept-Encoding` qo'shiladi - proxy/CDN variantlarni aralashtirmaydi
+- Siqilgan javobning ETag'i weak bo'ladi (W/"..."): bayt'lar boshqa, ma'no bir xil.
+  If-None-Match weak solishtiriladi (response_cache), 304 ikkala variantda ishlaydi
+
+brotli ixtiyoriy (pip install brotli); o'rnatilmagan bo'lsa faqat gzip.
+"""
+import logging
+import os
+import time
+import zlib
+
+from flask import request
+
+import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+COMPRESS_MIMETYPES = frozenset(
+    os.getenv('COMPRESS_MIMETYPES', 'application/json,application/x-ndjson,text/csv,text/html,text/plain').split(','))
+
+# (hajm chegarasi, daraja): birinchi mos kelgani; None - qolgan hammasi
+LEVELS = {
+    'br': ((16 * 1024, 6), (1024 * 1024, 5), (None, 4)),
+    'gzip': ((16 * 1024, 9), (1024 * 1024, 6), (None, 4)),
+}
+# Stream'da umumiy hajm oldindan noma'lum - tez daraja
+STREAM_LEVELS = {'br': 4, 'gzip': 4}
+
+
+def accepted_encodings(header):
+    """Accept-Encoding -> qabul qilinadigan kodlashlar to'plami (q=0 lar chiqariladi)"""
+    accepted = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_encoding(header):
+    """Server afzalligi: br (o'rnatilgan bo'lsa), keyin gzip"""
+    accepted = accepted_encodings(header)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def level_for(encoding, size):
+    for limit, level in LEVELS[encoding]:
+        if limit is None or size < limit:
+            return level
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    # wbits=31 - gzip header/trailer
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def chunk(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def compress_stream(chunks, encoding, level, close=None):
+    """Bo'laklarni siqib berish; oxirida (yoki uzilganda) manba generator yopiladi"""
+    stream = _BrotliStream(level) if encoding == 'br' else _GzipStream(level)
+    try:
+        for data in chunks:
+            if data:
+                compressed = stream.chunk(data)
+                if compressed:
+                    yield compressed
+        yield stream.finish()
+    finally:
+        if close is not None:
+            close()
+
+
+def _compressible(response):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.mimetype not in COMPRESS_MIMETYPES:
+        return False
+    # send_file (direct_passthrough) va o'zi siqilgan javoblar (assets.dist_file) tegilmaydi
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return False
+    return 'no-transform' not in response.headers.get('Cache-Control', '')
+
+
+def _weaken_etag(response):
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def _after_request(response):
+    if not _compressible(response):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+    if encoding is None or request.method == 'HEAD':
+        return response
+
+    if response.is_streamed:
+        source = response.response
+        response.response = compress_stream(response.iter_encoded(), encoding, STREAM_LEVELS[encoding],
+                                             close=getattr(source, 'close', None))
+        response.headers.pop('Content-Length', None)
+        response.headers['Content-Encoding'] = encoding
+        _weaken_etag(response)
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    started = time.perf_counter()
+    compressed = compress(body, encoding, level_for(encoding, len(body)))
+    metrics.add_timing('compress', time.perf_counter() - started)
+    if len(compressed) >= len(body):
+        return response
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    _weaken_etag(response)
+    return response
+
+
+def init_app(app):
+    """metrics.init_app'dan keyin: after_request teskari tartibda - siqish vaqti Server-Timing'ga kiradi"""
+    if not COMPRESS_ENABLED:
+        return
+    if brotli is None:
+        logger.info("brotli o'rnatilmagan - faqat gzip siqiladi")
+    app.after_request(_after_request)
@@ -0,0 +1,135 @@
+"""
+Foydalanuvchi ma'lumotlari versiyasi (response kesh kaliti uchun)
+
+Har bir (user_id, scope) uchun hisoblagich: yozish endpoint'lari uni oshiradi,
+keshlangan javoblar esa o'qilgan paytdagi versiyalar bilan saqlanadi.
+Versiya o'zgarsa - kesh kaliti ham o'zgaradi, eski yozuv ishlatilmaydi.
+
+Hisoblagichlar fayl bilan bog'langan umumiy mmap'da turadi, shuning uchun bitta
+serverdagi barcha gunicorn worker'lari bir xil versiyani ko'radi. user_id'lar
+`DATA_VERSION_BUCKETS` ta bucket'ga taqsimlanadi: ikki user bitta bucket'ga
+tushsa, birining yozuvi ikkinchisining keshini ham yangilaydi (ortiqcha miss,
+lekin hech qachon eskirgan javob emas).
+"""
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows (development)
+    fcntl = None
+
+SCOPES = ('transactions', 'warehouse', 'employees')
+DATA_VERSION_BUCKETS = int(os.getenv('DATA_VERSION_BUCKETS', '65536'))
+DATA_VERSION_FILE = os.getenv(
+    'DATA_VERSION_FILE', os.path.join(tempfile.gettempdir(), 'balansai_data_versions.bin')
+)
+PLAN_VERSION_FILE = os.getenv(
+    'PLAN_VERSION_FILE', os.path.join(tempfile.gettempdir(), 'balansai_plan_versions.bin')
+)
+
+_COUNTER = struct.Struct('<Q')
+# Fayl boshida umumiy epoch: bump_all() barcha user'larni birdan yangilaydi
+_HEADER_SIZE = _COUNTER.size
+
+
+class _SharedCounters:
+    """mmap'dagi 8 baytli hisoblagichlar; o'zgartirish flock bilan"""
+
+    def __init__(self, path, slots):
+        self.path = path
+        self.size = _HEADER_SIZE + slots * _COUNTER.size
+        self._pid = None
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+
+    def _open(self):
+        # flock fork'dan keyin parent bilan umumiy bo'lib qoladi - har bir process o'zi ochadi
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size < self.size:
+                    os.ftruncate(fd, self.size)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            self._file = fd
+            self._map = mmap.mmap(fd, self.size)
+            self._pid = pid
+
+    def read(self, offsets):
+        self._open()
+        fcntl.flock(self._file, fcntl.LOCK_SH)
+        try:
+            return tuple(_COUNTER.unpack_from(self._map, offset)[0] for offset in offsets)
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def increment(self, offsets):
+        self._open()
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            for offset in offsets:
+                value = _COUNTER.unpack_from(self._map, offset)[0] + 1
+                _COUNTER.pack_into(self._map, offset, value)
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+
+class _LocalCounters:
+    """fcntl bo'lmagan muhit uchun: faqat joriy process ichida"""
+
+    def __init__(self, path, slots):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def read(self, offsets):
+        with self._lock:
+            return tuple(self._values.get(offset, 0) for offset in offsets)
+
+    def increment(self, offsets):
+        with self._lock:
+            for offset in offsets:
+                self._values[offset] = self._values.get(offset, 0) + 1
+
+
+class DataVersions:
+    def __init__(self, path=DATA_VERSION_FILE, buckets=DATA_VERSION_BUCKETS, scopes=SCOPES):
+        self.buckets = buckets
+        self.scopes = scopes
+        self._scope_index = {scope: index for index, scope in enumerate(scopes)}
+        counters = _SharedCounters if fcntl is not None else _LocalCounters
+        self._counters = counters(path, buckets * len(scopes))
+
+    def _offsets(self, user_id, scopes):
+        base = (int(user_id) % self.buckets) * len(self.scopes)
+        try:
+            return [_HEADER_SIZE + (base + self._scope_index[scope]) * _COUNTER.size for scope in scopes]
+        except KeyError as e:
+            raise ValueError(f"scope invalid: {e.args[0]}")
+
+    def get(self, user_id, scopes):
+        """(epoch, *scope versiyalari) - kesh kalitiga qo'shiladi"""
+        return self._counters.read([0, *self._offsets(user_id, scopes)])
+
+    def bump(self, user_id, scopes):
+        """Yozishdan keyin user'ning berilgan scope'lari versiyasini oshirish"""
+        self._counters.increment(self._offsets(user_id, scopes))
+
+    def bump_all(self):
+        """Barcha user'lar uchun (masalan, rollup qayta qurilgandan keyin)"""
+        self._counters.increment([0])
+
+
+data_versions = DataVersions()
+# Obuna versiyasi: bot tarifni o'zgartirganda barcha worker'lardagi plan keshi eskiradi
+plan_versions = DataVersions(PLAN_VERSION_FILE, scopes=('plan',))
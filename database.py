@@ -1,36 +1,380 @@
 """
 Database connection module
 Bot bilan bir xil MySQL database bilan ishlaydi
+
+Connection'lar pool orqali qayta ishlatiladi: har bir so'rov uchun yangi
+TCP + auth handshake qilinmaydi. `get_db_connection()` pool'dan connection
+oladi, `connection.close()` esa uni pool'ga qaytaradi.
 """
+import logging
 import pymysql
+from pymysql.constants import SERVER_STATUS
 import os
+import threading
+import time
+import weakref
+from collections import deque
 from dotenv import load_dotenv
 
+from metrics import record_checkout_wait, record_query
+from query_profiler import PROFILER_ENABLED, record as record_profile
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5'))
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))
+DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', '300'))
+DB_POOL_PING_INTERVAL = float(os.getenv('DB_POOL_PING_INTERVAL', '10'))
+
+
+class PoolTimeoutError(pymysql.err.OperationalError):
+    """Pool'dan belgilangan vaqt ichida connection olib bo'lmadi"""
+
+
+class _ProfiledCursorMixin:
+    """
+    execute() vaqti, qatorlar soni va SQL shabloni - metrics (Server-Timing) va
+    query_profiler'ga. executemany() ham har bir batch uchun execute() ni chaqiradi
+    """
+
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = super().execute(query, args)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            record_query(elapsed)
+            if PROFILER_ENABLED:
+                # Unbuffered (SS) cursor'da rowcount noma'lum: -1 yoki 2**64 - 1
+                rows = self.rowcount if 0 <= self.rowcount < 2 ** 63 else None
+                params_count = len(args) if isinstance(args, (tuple, list, dict)) else int(args is not None)
+                record_profile(query, elapsed, rows, params_count, failed)
+
+
+_profiled_cursor_classes = {}
+
+
+def _profiled_cursor_class(cursor_class):
+    profiled = _profiled_cursor_classes.get(cursor_class)
+    if profiled is None:
+        profiled = type(f'Profiled{cursor_class.__name__}', (_ProfiledCursorMixin, cursor_class), {})
+        _profiled_cursor_classes[cursor_class] = profiled
+    return profiled
+
+
+class _ProfiledConnection(pymysql.connections.Connection):
+    """Har qanday cursor turi (DictCursor, SSCursor, ...) profil qilinadigan nusxasi bilan beriladi"""
+
+    def cursor(self, cursor=None):
+        return _profiled_cursor_class(cursor or self.cursorclass)(self)
+
+
+def _connect():
+    """Yangi MySQL connection yaratadi (faqat pool ichidan chaqiriladi)"""
+    return _ProfiledConnection(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        database=os.getenv('DB_NAME', 'balansai_db'),
+        charset='utf8mb4',
+        cursorclass=pymysql.cursors.DictCursor,
+        autocommit=False,
+        connect_timeout=10,
+        read_timeout=30,
+        write_timeout=30
+    )
+
+
+class _PoolEntry:
+    """Pool'dagi real connection va uning vaqt belgilari"""
+    __slots__ = ('raw', 'generation', 'created_at', 'last_used_at')
+
+    def __init__(self, raw, generation):
+        now = time.monotonic()
+        self.raw = raw
+        self.generation = generation
+        self.created_at = now
+        self.last_used_at = now
+
+
+class PooledConnection:
+    """
+    Pool'dan olingan connection uchun proxy.
+    `close()` real connection'ni yopmaydi, balki pool'ga qaytaradi.
+    Qolgan barcha metodlar (cursor, commit, rollback, ...) real connection'ga uzatiladi.
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get('_entry')
+        if entry is None:
+            raise pymysql.err.InterfaceError(0, 'Connection pool\'ga qaytarilgan')
+        return getattr(entry.raw, name)
+
+    @property
+    def open(self):
+        return self._entry is not None and self._entry.raw.open
+
+    def close(self):
+        """Connection'ni pool'ga qaytarish"""
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(self, entry)
+
+    def invalidate(self):
+        """Connection'ni pool'ga qaytarmasdan yopish (buzilgan holatda)"""
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(self, entry, discard=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # close() chaqirilmay qolgan bo'lsa ham connection yo'qolib ketmasin
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Chegaralangan MySQL connection pool.
+
+    - `max_size` dan ortiq connection ochilmaydi, bo'sh joy `timeout` soniya kutiladi
+    - uzoq turib qolgan connection olishda ping bilan tekshiriladi
+    - `max_lifetime` / `max_idle` dan oshgan connection'lar yangilanadi
+    - gunicorn fork'dan keyin parent'ning socket'lari ishlatilmaydi
+    """
+
+    def __init__(self, connect=_connect, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 max_lifetime=DB_POOL_MAX_LIFETIME, max_idle=DB_POOL_MAX_IDLE,
+                 ping_interval=DB_POOL_PING_INTERVAL):
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.ping_interval = ping_interval
+        self._generation = 0
+        self._init_state()
+
+    def _init_state(self):
+        self._generation += 1
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._idle = deque()
+        self._local = threading.local()
+        self._in_use = 0
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'ping_failures': 0,
+            'timeouts': 0,
+            'wait_total_ms': 0.0,
+            'wait_max_ms': 0.0,
+        }
+
+    def reset_after_fork(self):
+        """
+        Fork'dan keyin child process'da chaqiriladi.
+        Parent'ning socket'lari yopilmaydi (COM_QUIT parent connection'ini buzadi),
+        faqat havolalar tashlab yuboriladi.
+        """
+        self._init_state()
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self.reset_after_fork()
+
+    def _is_expired(self, entry, now):
+        if self.max_lifetime and now - entry.created_at > self.max_lifetime:
+            return True
+        if self.max_idle and now - entry.last_used_at > self.max_idle:
+            return True
+        return False
+
+    def _checkout_entry(self):
+        """Bo'sh connection'ni olish yoki yangisini yaratish"""
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                entry = _PoolEntry(self._connect(), self._generation)
+                with self._lock:
+                    self._stats['created'] += 1
+                return entry
+
+            now = time.monotonic()
+            if self._is_expired(entry, now):
+                self._close_raw(entry.raw)
+                with self._lock:
+                    self._stats['recycled'] += 1
+                continue
+
+            if now - entry.last_used_at >= self.ping_interval:
+                try:
+                    entry.raw.ping(reconnect=False)
+                except Exception:
+                    self._close_raw(entry.raw)
+                    with self._lock:
+                        self._stats['ping_failures'] += 1
+                    continue
+            return entry
+
+    def connection(self):
+        """Pool'dan connection olish"""
+        self._check_pid()
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise PoolTimeoutError(
+                2003, f"Database connection pool band: {self.max_size} ta connection {self.timeout}s ichida bo'shamadi"
+            )
+        waited = time.perf_counter() - started
+        waited_ms = waited * 1000
+        record_checkout_wait(waited)
+
+        try:
+            entry = self._checkout_entry()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._stats['checkouts'] += 1
+            self._stats['wait_total_ms'] += waited_ms
+            if waited_ms > self._stats['wait_max_ms']:
+                self._stats['wait_max_ms'] = waited_ms
+
+        conn = PooledConnection(self, entry)
+        self._thread_conns()[id(conn)] = conn
+        return conn
+
+    def _thread_conns(self):
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            conns = self._local.conns = weakref.WeakValueDictionary()
+        return conns
+
+    def _release(self, conn, entry, discard=False):
+        conns = getattr(self._local, 'conns', None)
+        if conns is not None:
+            conns.pop(id(conn), None)
+
+        # Fork'dan oldin olingan connection child'da pool'ga qaytarilmaydi
+        if entry.generation != self._generation or self._pid != os.getpid():
+            return
+
+        raw = entry.raw
+        if not discard and raw.open:
+            try:
+                # Yopilgan connection kabi: commit qilinmagan ishlar bekor qilinadi
+                if raw.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+                    raw.rollback()
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        if discard:
+            self._close_raw(raw)
+        else:
+            entry.last_used_at = time.monotonic()
+            with self._lock:
+                self._idle.append(entry)
+
+        with self._lock:
+            self._in_use -= 1
+        self._slots.release()
+
+    def release_thread_connections(self):
+        """Joriy thread'da close() qilinmay qolgan connection'larni pool'ga qaytarish"""
+        conns = getattr(self._local, 'conns', None)
+        if not conns:
+            return 0
+        leaked = list(conns.values())
+        for conn in leaked:
+            conn.close()
+        return len(leaked)
+
+    @staticmethod
+    def _close_raw(raw):
+        try:
+            raw.close()
+        except Exception:
+            try:
+                raw._force_close()
+            except Exception:
+                pass
+
+    def stats(self):
+        """Pool holati va checkout kutish metrikalari"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['max_size'] = self.max_size
+            stats['in_use'] = self._in_use
+            stats['idle'] = len(self._idle)
+        checkouts = stats['checkouts']
+        stats['wait_avg_ms'] = round(stats['wait_total_ms'] / checkouts, 3) if checkouts else 0.0
+        stats['wait_total_ms'] = round(stats['wait_total_ms'], 3)
+        stats['wait_max_ms'] = round(stats['wait_max_ms'], 3)
+        return stats
+
+    def close_all(self):
+        """Barcha bo'sh connection'larni yopish"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for entry in idle:
+            self._close_raw(entry.raw)
+
+
+pool = ConnectionPool()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=pool.reset_after_fork)
+
+
 def get_db_connection():
     """
-    MySQL database connection yaratadi
+    MySQL database connection'ni pool'dan oladi
     Environment variables orqali config qilinadi
+    `connection.close()` connection'ni pool'ga qaytaradi
     """
     try:
-        connection = pymysql.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASSWORD', ''),
-            database=os.getenv('DB_NAME', 'balansai_db'),
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor,
-            autocommit=False,
-            connect_timeout=10,
-            read_timeout=30,
-            write_timeout=30
-        )
-        return connection
+        return pool.connection()
     except Exception as e:
-        print(f"Database connection error: {e}")
+        logger.error("Database connection error: %s", e)
         raise
 
+
+def release_thread_connections():
+    """Request oxirida yopilmay qolgan connection'larni pool'ga qaytarish"""
+    return pool.release_thread_connections()
+
+
+def get_pool_stats():
+    """Connection pool metrikalari"""
+    return pool.stats()
+
+
 def execute_query(query, params=None, fetch_one=False, fetch_all=False):
     """
     Database query'ni bajaradi
@@ -49,8 +393,7 @@ def execute_query(query, params=None, fetch_one=False, fetch_all=False):
             return result
     except Exception as e:
         connection.rollback()
-        print(f"Query execution error: {e}")
+        logger.error("Query execution error: %s", e)
         raise
     finally:
         connection.close()
-
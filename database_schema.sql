@@ -1,5 +1,8 @@
 -- Database schema for Business Tarifi Mini App
 -- Bot bilan bir xil database'da ishlaydi
+-- Bu fayldan keyin migrations/*.sql tartib bo'yicha bajariladi: rollup va trigger'lar,
+-- composite index'lar va import uchun warehouse_products (user_id, barcode) UNIQUE kaliti
+-- faqat o'sha yerda (README: "Database sozlash")
 
 -- Transactions jadvali (biznes uchun ham)
 CREATE TABLE IF NOT EXISTS transactions (
@@ -96,3 +99,40 @@ CREATE TABLE IF NOT EXISTS debts (
     INDEX idx_status (status)
 );
 
+
+-- Transactions_daily jadvali (TRANZAKSIYALAR KUNLIK ROLLUP)
+-- Hisobot/analitika shu jadvaldan o'qiydi. Trigger'lar va procedure:
+-- migrations/001_transactions_daily.sql
+CREATE TABLE IF NOT EXISTS transactions_daily (
+    user_id BIGINT NOT NULL,
+    day DATE NOT NULL,
+    transaction_type ENUM('income', 'expense', 'debt') NOT NULL,
+    category VARCHAR(100) NOT NULL DEFAULT '',
+    amount_sum DECIMAL(20,2) NOT NULL DEFAULT 0,
+    tx_count INT NOT NULL DEFAULT 0,
+    amount_min DECIMAL(15,2) NULL,
+    amount_max DECIMAL(15,2) NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, day, transaction_type, category)
+);
+
+-- Analytics_snapshots jadvali (OLDINDAN HISOBLANGAN ANALITIKA)
+-- precompute.py yozadi, analitika endpoint'lari o'qiydi: migrations/005_analytics_snapshots.sql
+CREATE TABLE IF NOT EXISTS analytics_snapshots (
+    user_id BIGINT NOT NULL,
+    kind VARCHAR(32) NOT NULL,
+    day DATE NOT NULL,
+    fingerprint VARCHAR(512) NOT NULL,
+    payload MEDIUMTEXT NOT NULL,
+    computed_at TIMESTAMP(3) NOT NULL,
+    checked_at TIMESTAMP(3) NOT NULL,
+    compute_ms INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, kind)
+);
+
+-- Analytics_active_users jadvali (MINI APP'NI OCHGAN USER'LAR)
+CREATE TABLE IF NOT EXISTS analytics_active_users (
+    user_id BIGINT PRIMARY KEY,
+    last_seen_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_last_seen (last_seen_at)
+);
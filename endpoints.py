@@ -0,0 +1,139 @@
+"""
+Ro'yxat endpoint'larining framework'ga bog'liq bo'lmagan qismi
+
+Request argumentlaridan qaysi SQL bajarilishini tanlash va javob shakli shu
+yerda: Flask (app.py) ham, ASGI (asgi_app.py) ham bir xil funksiyalarni
+ishlatadi, faqat so'rovni o'z driver'i bilan bajaradi.
+"""
+import logging
+from typing import Any, NamedTuple
+
+from pagination import page_from_args
+import queries
+
+logger = logging.getLogger(__name__)
+
+TASK_STATUSES = ('pending', 'in_progress', 'completed', 'cancelled')
+
+
+class ListQuery(NamedTuple):
+    """Bajariladigan so'rov; `page` bo'lsa - keyset sahifa (LIMIT size + 1)"""
+    sql: str
+    params: tuple
+    page: Any = None
+
+
+def products_query(user_id, args):
+    """?page_size=&cursor= berilsa - sahifalab, aks holda to'liq ro'yxat; ?fields= - faqat shu ustunlar"""
+    page = page_from_args(args)
+    fields = queries.PRODUCTS_FIELDS.parse(args.get('fields'), page)
+    if page:
+        keyset = queries.PRODUCTS_FIELDS.apply_keyset(queries.PRODUCTS_PAGE, fields)
+        return ListQuery(*keyset.bind((user_id,), page), page)
+    return ListQuery(queries.PRODUCTS_FIELDS.apply(queries.PRODUCTS_LIST, fields), (user_id,))
+
+
+def movements_query(user_id, args):
+    """
+    ?product_id= - mahsulot tarixi: page_size/cursor berilmasa to'liq ro'yxat (avvalgidek LIMIT'siz)
+    Barcha harakatlar doim sahifalanadi (default 100 ta - avvalgi LIMIT 100 bilan bir xil)
+    """
+    product_id = args.get('product_id')
+    if product_id:
+        page = page_from_args(args)
+        if page:
+            return ListQuery(*queries.MOVEMENTS_BY_PRODUCT_PAGE.bind((user_id, product_id), page), page)
+        return ListQuery(queries.MOVEMENTS_BY_PRODUCT, (user_id, product_id))
+    page = page_from_args(args, required=True)
+    return ListQuery(*queries.MOVEMENTS_PAGE.bind((user_id,), page), page)
+
+
+def transactions_query(user_id, args):
+    """?limit= (yoki page_size=) sahifa o'lchami, maksimal 1000"""
+    page = page_from_args(args, default_size=50, max_size=1000,
+                          size_params=('page_size', 'limit'), required=True)
+    fields = queries.TRANSACTIONS_FIELDS.parse(args.get('fields'), page)
+    keyset = queries.TRANSACTIONS_FIELDS.apply_keyset(queries.TRANSACTIONS_PAGE, fields)
+    return ListQuery(*keyset.bind((user_id,), page), page)
+
+
+def employees_query(user_id, args):
+    page = page_from_args(args)
+    fields = queries.EMPLOYEES_FIELDS.parse(args.get('fields'), page)
+    if page:
+        keyset = queries.EMPLOYEES_FIELDS.apply_keyset(queries.EMPLOYEES_PAGE, fields)
+        return ListQuery(*keyset.bind((user_id,), page), page)
+    return ListQuery(queries.EMPLOYEES_FIELDS.apply(queries.EMPLOYEES_LIST, fields), (user_id,))
+
+
+def tasks_query(user_id, args):
+    status = args.get('status')
+    if status not in TASK_STATUSES:
+        status = None
+    page = page_from_args(args)
+    fieldset = queries.TASKS_FIELDS
+    fields = fieldset.parse(args.get('fields'), page)
+    if page and status:
+        keyset = fieldset.apply_keyset(queries.TASKS_BY_STATUS_PAGE, fields)
+        return ListQuery(*keyset.bind((user_id, status), page), page)
+    if page:
+        return ListQuery(*fieldset.apply_keyset(queries.TASKS_PAGE, fields).bind((user_id,), page), page)
+    if status:
+        return ListQuery(fieldset.apply(queries.TASKS_BY_STATUS, fields), (user_id, status))
+    return ListQuery(fieldset.apply(queries.TASKS_LIST, fields), (user_id,))
+
+
+def list_payload(query, rows):
+    """Ro'yxat javobi: sahifalangan bo'lsa keyingi sahifa uchun `?cursor=<next_cursor>`"""
+    if query.page:
+        rows, next_cursor = query.page.split(rows)
+        return {'success': True, 'data': rows, 'next_cursor': next_cursor}
+    return {'success': True, 'data': rows or []}
+
+
+def wants_columnar(args):
+    """?format=columnar - {columns, rows}: har qator uchun dict yasalmaydi, kalitlar takrorlanmaydi"""
+    fmt = args.get('format')
+    if fmt not in (None, '', 'columnar'):
+        raise ValueError("format: columnar")
+    return fmt == 'columnar'
+
+
+def columnar_payload(query, columns, rows):
+    """list_payload'ning columnar ko'rinishi; rows - tuple cursor qatorlari (description tartibida)"""
+    if query.page:
+        rows, next_cursor = query.page.split(rows, columns)
+        return {'success': True, 'columns': columns, 'rows': rows, 'next_cursor': next_cursor}
+    return {'success': True, 'columns': columns, 'rows': rows or []}
+
+
+def no_business_plan_payload(redirect_url):
+    """Business plan bo'lmagan user uchun (403)"""
+    return {
+        'success': False,
+        'error': 'Bu ilova faqat Biznes tarifi uchun. Iltimos, Biznes tarifiga o\'ting.',
+        'redirect': redirect_url,
+        'has_business_plan': False
+    }
+
+
+def error_payload(error, default_message, debug):
+    """
+    API xatoligi javobi
+
+    Returns:
+        (dict, status)
+    """
+    error_message = str(error) if error else default_message
+    logger.error("API xatolik: %s", error_message)
+
+    # Database xatoliklari
+    if "connection" in error_message.lower() or "database" in error_message.lower():
+        return {'success': False, 'error': 'Ma\'lumotlar bazasi bilan bog\'lanishda xatolik'}, 500
+
+    # Validation xatoliklari
+    if "required" in error_message.lower() or "invalid" in error_message.lower():
+        return {'success': False, 'error': error_message}, 400
+
+    # Umumiy xatolik
+    return {'success': False, 'error': default_message if debug else 'Xatolik yuz berdi'}, 500
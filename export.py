@@ -0,0 +1,188 @@
+"""
+CSV / NDJSON eksport
+
+Qatorlar `SSDictCursor` (unbuffered) orqali MySQL'dan bo'lak-bo'lak o'qiladi va
+darhol klientga yoziladi: worker xotirasi qator soniga bog'liq emas.
+Natija to'liq o'qilmaguncha connection band bo'ladi, shuning uchun eksport
+uchun alohida connection olinadi va yarim yo'lda to'xtatilsa pool'ga
+qaytarilmasdan yopiladi.
+"""
+import csv
+import io
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import pymysql
+
+from database import get_db_connection
+from periods import range_predicate
+
+EXPORT_FETCH_SIZE = int(os.getenv('EXPORT_FETCH_SIZE', '1000'))
+EXPORT_FLUSH_BYTES = int(os.getenv('EXPORT_FLUSH_BYTES', str(64 * 1024)))
+# Sekin klient o'qiyotganda MySQL natijani yuborishni kutadi (default 60s)
+EXPORT_NET_WRITE_TIMEOUT = int(os.getenv('EXPORT_NET_WRITE_TIMEOUT', '600'))
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Jadval -> (SELECT ... WHERE user_id = %s, created_at ustuni)
+# Tartib (created_at, id) - (user_id, created_at) index'i bo'yicha o'qiladi
+EXPORTS = {
+    'transactions': (
+        """SELECT id, transaction_type, amount, currency, category, description, created_at
+   FROM transactions
+   WHERE user_id = %s""",
+        ''
+    ),
+    'warehouse_movements': (
+        """SELECT wm.id, wm.product_id, wp.name as product_name, wm.movement_type,
+       wm.quantity, wm.price, wm.reason, wm.created_at
+   FROM warehouse_movements wm
+   JOIN warehouse_products wp ON wm.product_id = wp.id
+   WHERE wm.user_id = %s""",
+        'wm.'
+    ),
+    'warehouse_products': (
+        """SELECT id, name, category, barcode, price, quantity, min_quantity, unit,
+       image_url, created_at, updated_at
+   FROM warehouse_products
+   WHERE user_id = %s""",
+        ''
+    ),
+}
+
+
+def build_export_query(table, user_id, date_range=None):
+    """
+    Eksport SQL'i va parametrlari
+
+    Raises:
+        KeyError: jadval eksport qilinmasa
+    """
+    sql, prefix = EXPORTS[table]
+    params = [user_id]
+    if date_range is not None:
+        sql += f" AND {range_predicate(prefix + 'created_at')}"
+        params.extend(date_range.params)
+    sql += f"\n   ORDER BY {prefix}created_at, {prefix}id"
+    return sql, tuple(params)
+
+
+def _plain(value):
+    """JSON/CSV uchun qiymat: Decimal aniqligi saqlanadi, sanalar ISO formatida"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', 'replace')
+    return value
+
+
+class _CsvEncoder:
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._columns = None
+
+    def header(self, columns):
+        self._columns = columns
+        self._writer.writerow(columns)
+
+    def row(self, row):
+        self._writer.writerow(['' if row[c] is None else _plain(row[c]) for c in self._columns])
+
+    def size(self):
+        return self._buffer.tell()
+
+    def take(self):
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+
+class _NdjsonEncoder:
+    def __init__(self):
+        self._parts = []
+        self._size = 0
+
+    def header(self, columns):
+        pass
+
+    def row(self, row):
+        line = json.dumps(row, ensure_ascii=False, default=_plain, separators=(',', ':')) + '\n'
+        self._parts.append(line)
+        self._size += len(line)
+
+    def size(self):
+        return self._size
+
+    def take(self):
+        data = ''.join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        return data
+
+
+ENCODERS = {'csv': _CsvEncoder, 'ndjson': _NdjsonEncoder}
+
+
+def stream_export(table, user_id, fmt='csv', date_range=None,
+                  fetch_size=EXPORT_FETCH_SIZE, flush_bytes=EXPORT_FLUSH_BYTES):
+    """
+    Eksport generatori: taxminan `flush_bytes` hajmdagi bo'laklarni (bytes) qaytaradi
+
+    Xotirada bir vaqtda eng ko'pi `fetch_size` qator va bitta bo'lak turadi.
+    """
+    sql, params = build_export_query(table, user_id, date_range)
+    encoder = ENCODERS[fmt]()
+
+    connection = get_db_connection()
+    finished = False
+    try:
+        # `with` ishlatilmaydi: SSCursor.close() qolgan barcha qatorlarni o'qib tashlaydi
+        cursor = connection.cursor(pymysql.cursors.SSDictCursor)
+        cursor.execute("SET SESSION net_write_timeout = %s", (EXPORT_NET_WRITE_TIMEOUT,))
+        cursor.execute(sql, params)
+        encoder.header([column[0] for column in cursor.description])
+
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for row in rows:
+                encoder.row(row)
+                if encoder.size() >= flush_bytes:
+                    yield encoder.take().encode('utf-8')
+
+        tail = encoder.take()
+        if tail:
+            yield tail.encode('utf-8')
+
+        cursor.close()
+        cursor = connection.cursor()
+        cursor.execute("SET SESSION net_write_timeout = DEFAULT")
+        cursor.close()
+        finished = True
+    finally:
+        if finished:
+            connection.close()
+        else:
+            # Natija oxirigacha o'qilmagan (klient uzildi yoki xatolik):
+            # bunday connection'da keyingi so'rov ishlamaydi
+            connection.invalidate()
+
+
+def export_filename(table, fmt, date_range=None):
+    """Content-Disposition uchun fayl nomi"""
+    if date_range is not None:
+        last_day = date_range.end - timedelta(days=1)
+        return f"{table}_{date_range.start.isoformat()}_{last_day.isoformat()}.{fmt}"
+    return f"{table}_{date.today().isoformat()}.{fmt}"
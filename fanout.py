@@ -0,0 +1,146 @@
+"""
+Mustaqil SELECT'larni parallel bajarish (fan-out)
+
+Har bir so'rov pool'dan alohida connection oladi va umumiy, chegaralangan
+thread pool'da bajariladi: endpoint kechikishi so'rovlar yig'indisi emas,
+eng sekin so'rov atrofida bo'ladi.
+
+Har bir so'rovning o'z timeout'i bor. Vaqtida tugamagan yoki xato bergan
+bo'lim `default` qiymat bilan qaytadi va `failed` ro'yxatiga tushadi -
+qolgan bo'limlar baribir javobda bo'ladi.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, NamedTuple
+
+from database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+FANOUT_MAX_WORKERS = int(os.getenv('FANOUT_MAX_WORKERS', '8'))
+FANOUT_QUERY_TIMEOUT = float(os.getenv('FANOUT_QUERY_TIMEOUT', '5'))
+
+
+class QuerySpec(NamedTuple):
+    """
+    Bitta bo'lim so'rovi
+
+    fetch: 'one' (fetchone) yoki 'all' (fetchall)
+    default: so'rov bajarilmasa bo'limga qo'yiladigan qiymat
+    timeout: soniyada (None - FANOUT_QUERY_TIMEOUT)
+    """
+    name: str
+    sql: str
+    params: tuple = ()
+    fetch: str = 'all'
+    default: Any = None
+    timeout: Any = None
+
+
+class FanoutResult(NamedTuple):
+    data: dict
+    failed: list
+    errors: dict
+    timings_ms: dict
+
+    @property
+    def partial(self):
+        return bool(self.failed)
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Process'ga bitta executor (fork'dan keyin parent thread'lari yo'q - qayta yaratiladi)"""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix='fanout')
+                _executor_pid = pid
+    return _executor
+
+
+def reset_after_fork():
+    """Fork'dan keyin child'da: parent executor'ining thread'lari yo'q, lock holati noma'lum"""
+    global _executor, _executor_pid, _executor_lock
+    _executor = None
+    _executor_pid = None
+    _executor_lock = threading.Lock()
+
+
+def with_time_limit(sql, timeout):
+    """
+    MySQL tomonida ham so'rovni to'xtatish: `SELECT /*+ MAX_EXECUTION_TIME(ms) */`
+    Aks holda client timeout'dan keyin ham so'rov connection'ni band qilib turadi.
+    """
+    stripped = sql.lstrip()
+    if not stripped[:6].upper() == 'SELECT':
+        return sql
+    return f"SELECT /*+ MAX_EXECUTION_TIME({int(timeout * 1000)}) */{stripped[6:]}"
+
+
+def _run(spec, timeout):
+    started = time.perf_counter()
+    connection = get_db_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(with_time_limit(spec.sql, timeout), spec.params)
+            if spec.fetch == 'one':
+                result = cursor.fetchone()
+            else:
+                result = cursor.fetchall()
+    finally:
+        connection.close()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def run_queries(specs):
+    """
+    Specs'larni parallel bajarish
+
+    Returns:
+        FanoutResult: data[name] - natija (yoki default), failed - bajarilmagan bo'limlar
+    """
+    executor = _get_executor()
+    started = time.monotonic()
+    submitted = []
+    for spec in specs:
+        timeout = spec.timeout if spec.timeout is not None else FANOUT_QUERY_TIMEOUT
+        # copy_context: fan-out thread'idagi so'rovlar ham joriy request metrikalariga yoziladi
+        submitted.append((spec, timeout, executor.submit(contextvars.copy_context().run, _run, spec, timeout)))
+
+    data = {}
+    failed = []
+    errors = {}
+    timings_ms = {}
+    for spec, timeout, future in submitted:
+        remaining = max(0.0, timeout - (time.monotonic() - started))
+        try:
+            result, elapsed_ms = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            future.cancel()
+            failed.append(spec.name)
+            errors[spec.name] = f"timeout ({timeout}s)"
+            data[spec.name] = spec.default
+            logger.warning("Fan-out so'rov timeout: %s (%ss)", spec.name, timeout)
+            continue
+        except Exception as e:
+            failed.append(spec.name)
+            errors[spec.name] = str(e)
+            data[spec.name] = spec.default
+            logger.error("Fan-out so'rov xatolik: %s: %s", spec.name, e)
+            continue
+
+        data[spec.name] = result if result is not None else spec.default
+        timings_ms[spec.name] = round(elapsed_ms, 2)
+
+    return FanoutResult(data, failed, errors, timings_ms)
@@ -0,0 +1,333 @@
+"""
+Daromad/chiqim prognozi
+
+transactions_daily rollup'idan kunlik qatorlar olinadi va bitta matritsaga
+yig'iladi: [kirim, chiqim, kategoriya_1, ..., kategoriya_k] x kunlar.
+Barcha qatorlar bir vaqtda, NumPy bilan hisoblanadi:
+
+- haftalik mavsumiylik lag-7 avtokorrelyatsiyasi bo'yicha aniqlanadi
+- tarix yetarli bo'lsa - damped Holt / Holt-Winters (additive, m=7);
+  silliqlash parametrlari to'r bo'yicha, har bir qator uchun alohida tanlanadi
+- tarix qisqa bo'lsa - chiziqli trend (eng kichik kvadratlar)
+- ishonch oralig'i bir qadamli xatolar dispersiyasidan (taxminiy, 95%)
+
+Natija user uchun keshlanadi; kalit - rollup "barmoq izi" (qatorlar soni,
+tx_count yig'indisi, oxirgi updated_at), ya'ni yangi tranzaksiya kelguncha.
+"""
+import os
+from datetime import date, datetime, timedelta
+from itertools import product
+
+import numpy as np
+
+from cache_store import CacheStore
+from periods import PeriodRange
+import queries
+
+FORECAST_HORIZON_DAYS = int(os.getenv('FORECAST_HORIZON_DAYS', '30'))
+FORECAST_HISTORY_DAYS = int(os.getenv('FORECAST_HISTORY_DAYS', '365'))
+FORECAST_MAX_CATEGORIES = int(os.getenv('FORECAST_MAX_CATEGORIES', '8'))
+FORECAST_CACHE_TTL = int(os.getenv('FORECAST_CACHE_TTL', '3600'))
+
+MIN_HISTORY_DAYS = 14      # bundan kam - prognoz qilinmaydi
+HOLT_MIN_DAYS = 28         # bundan kam - chiziqli trend
+SEASON_LENGTH = 7
+SEASONALITY_THRESHOLD = 0.3
+DAMPING = 0.98
+Z_95 = 1.96
+
+# (alpha, beta, gamma) to'ri - hammasi bir vaqtda baholanadi
+_ALPHAS = (0.05, 0.15, 0.3, 0.5)
+_BETAS = (0.01, 0.05, 0.15)
+_GAMMAS = (0.05, 0.15, 0.3)
+_GRID = np.array(list(product(_ALPHAS, _BETAS, _GAMMAS)))
+
+forecast_cache = CacheStore('forecast', max_size=10000, default_ttl=FORECAST_CACHE_TTL)
+
+
+class InsufficientHistory(Exception):
+    """Prognoz uchun kunlik tarix yetarli emas"""
+
+
+# ===== MODELLAR (sof NumPy, database'siz) =====
+
+def _damped_sum(horizon, phi=DAMPING):
+    """sum_{h=1..H} (phi + phi^2 + ... + phi^h) - trendning H kunlik yig'indiga hissasi"""
+    powers = phi ** np.arange(1, horizon + 1)
+    return np.cumsum(powers).sum()
+
+
+def detect_seasonality(matrix, season=SEASON_LENGTH):
+    """
+    Har bir qator uchun haftalik mavsumiylik bormi (lag-7 avtokorrelyatsiya)
+
+    Trend avval chiziqli regressiya bilan olib tashlanadi.
+    """
+    series_count, length = matrix.shape
+    if length < 4 * season:
+        return np.zeros(series_count, dtype=bool)
+    t = np.arange(length, dtype=float)
+    t_centered = t - t.mean()
+    slope = (matrix - matrix.mean(axis=1, keepdims=True)) @ t_centered / (t_centered @ t_centered)
+    residual = matrix - matrix.mean(axis=1, keepdims=True) - slope[:, None] * t_centered
+    denominator = (residual ** 2).sum(axis=1)
+    numerator = (residual[:, season:] * residual[:, :-season]).sum(axis=1)
+    acf = np.divide(numerator, denominator, out=np.zeros(series_count), where=denominator > 0)
+    return acf > SEASONALITY_THRESHOLD
+
+
+def holt_winters(matrix, seasonal, horizon, season=SEASON_LENGTH, phi=DAMPING):
+    """
+    Damped Holt (seasonal=False) yoki additive Holt-Winters, barcha qatorlar va
+    barcha (alpha, beta, gamma) kombinatsiyalari uchun bir vaqtda
+
+    Returns:
+        tuple: (H kunlik yig'indi, sigma, tanlangan alpha) - har biri (S,) shaklda
+    """
+    series_count, length = matrix.shape
+    params = _GRID.shape[0]
+    alpha = _GRID[:, 0:1]                                   # (P, 1)
+    beta = _GRID[:, 1:2]
+    # Mavsumiy bo'lmagan qatorlarda mavsum komponenti 0 bo'lib qoladi
+    gamma = _GRID[:, 2:3] * seasonal[None, :]               # (P, S)
+
+    first_week = matrix[:, :season]
+    level = np.broadcast_to(first_week.mean(axis=1), (params, series_count)).copy()
+    second_week = matrix[:, season:2 * season].mean(axis=1)
+    trend = np.broadcast_to((second_week - first_week.mean(axis=1)) / season,
+                            (params, series_count)).copy()
+    seasonals = np.where(seasonal[:, None], first_week - first_week.mean(axis=1, keepdims=True), 0.0)
+    seasonals = np.broadcast_to(seasonals, (params, series_count, season)).copy()
+
+    sse = np.zeros((params, series_count))
+    for t in range(length):
+        y = matrix[:, t]
+        position = t % season
+        previous_season = seasonals[:, :, position]
+        error = y - (level + phi * trend + previous_season)
+        if t >= season:
+            sse += error ** 2
+        new_level = alpha * (y - previous_season) + (1 - alpha) * (level + phi * trend)
+        trend = beta * (new_level - level) + (1 - beta) * phi * trend
+        seasonals[:, :, position] = gamma * (y - new_level) + (1 - gamma) * previous_season
+        level = new_level
+
+    best = sse.argmin(axis=0)                               # (S,)
+    columns = np.arange(series_count)
+    level = level[best, columns]
+    trend = trend[best, columns]
+    seasonals = seasonals[best, columns]                    # (S, m)
+    sigma = np.sqrt(sse[best, columns] / max(length - season, 1))
+
+    # Keyingi H kunning mavsum komponentlari yig'indisi
+    future_positions = (length + np.arange(horizon)) % season
+    seasonal_sum = seasonals[:, future_positions].sum(axis=1)
+    total = horizon * level + _damped_sum(horizon, phi) * trend + seasonal_sum
+    return total, sigma, _GRID[best, 0]
+
+
+def linear_trend(matrix, horizon):
+    """
+    Chiziqli trend: y = a + b*t, barcha qatorlar uchun bitta matritsa amali
+
+    Returns:
+        tuple: (H kunlik yig'indi, sigma)
+    """
+    _, length = matrix.shape
+    t = np.arange(length, dtype=float)
+    t_mean = t.mean()
+    t_centered = t - t_mean
+    y_mean = matrix.mean(axis=1)
+    slope = (matrix - y_mean[:, None]) @ t_centered / (t_centered @ t_centered)
+    intercept = y_mean - slope * t_mean
+    fitted = intercept[:, None] + slope[:, None] * t
+    sigma = np.sqrt(((matrix - fitted) ** 2).sum(axis=1) / max(length - 2, 1))
+    future_t = np.arange(length, length + horizon, dtype=float)
+    total = horizon * intercept + slope * future_t.sum()
+    return total, sigma
+
+
+def forecast_matrix(matrix, horizon=FORECAST_HORIZON_DAYS):
+    """
+    Kunlik qatorlar matritsasi (S x T) uchun H kunlik yig'indi prognozi
+
+    Ishonch oralig'i taxminiy: kunlik shovqin (H*sigma^2) va daraja
+    bahosidagi xato (H^2 * sigma^2 * alpha / (2 - alpha)) yig'indisi.
+
+    Returns:
+        dict: value, lower, upper, seasonal (S,) massivlar va model nomi
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    _, length = matrix.shape
+    if length < MIN_HISTORY_DAYS:
+        raise InsufficientHistory(length)
+
+    if length >= HOLT_MIN_DAYS:
+        seasonal = detect_seasonality(matrix)
+        total, sigma, alpha = holt_winters(matrix, seasonal, horizon)
+        level_variance = alpha / (2 - alpha)
+        model = np.where(seasonal, 'holt_winters', 'holt')
+    else:
+        seasonal = np.zeros(matrix.shape[0], dtype=bool)
+        total, sigma = linear_trend(matrix, horizon)
+        level_variance = 1.0 / length
+        model = np.full(matrix.shape[0], 'linear')
+
+    spread = Z_95 * sigma * np.sqrt(horizon + horizon ** 2 * level_variance)
+    value = np.maximum(total, 0.0)
+    return {
+        'value': value,
+        'lower': np.maximum(total - spread, 0.0),
+        'upper': np.maximum(total + spread, 0.0),
+        'seasonal': seasonal,
+        'model': model,
+    }
+
+
+# ===== MA'LUMOT VA NATIJA =====
+
+def _history_range(today):
+    # Bugungi (tugallanmagan) kun tarixga kirmaydi
+    return PeriodRange(today - timedelta(days=FORECAST_HISTORY_DAYS), today)
+
+
+def build_series(rows, history, max_categories=FORECAST_MAX_CATEGORIES):
+    """
+    Rollup qatorlaridan matritsa: 0 - kirim, 1 - chiqim, keyin eng katta kategoriyalar
+
+    Returns:
+        tuple: (matrix, labels, first_day) - birinchi tranzaksiya kunidan boshlab
+    """
+    if not rows:
+        return np.zeros((2, 0)), [], history.end
+
+    days = np.array([(row['day'] - history.start).days for row in rows])
+    amounts = np.array([float(row['amount_sum'] or 0) for row in rows])
+    types = [row['transaction_type'] for row in rows]
+    categories = [row['category'] or '' for row in rows]
+
+    first = int(days.min())
+    length = (history.end - history.start).days - first
+    days -= first
+
+    # Har bir tur bo'yicha eng katta kategoriyalar alohida qator bo'ladi
+    totals = {}
+    for kind, category, amount in zip(types, categories, amounts):
+        totals[(kind, category)] = totals.get((kind, category), 0.0) + amount
+    top = sorted(totals, key=totals.get, reverse=True)[:max_categories]
+    labels = [('income', None), ('expense', None), *top]
+    index = {label: position for position, label in enumerate(labels)}
+
+    matrix = np.zeros((len(labels), length))
+    np.add.at(matrix, (np.array([0 if kind == 'income' else 1 for kind in types]), days), amounts)
+    category_rows = np.array([index.get((kind, category), -1) for kind, category in zip(types, categories)])
+    selected = category_rows >= 0
+    np.add.at(matrix, (category_rows[selected], days[selected]), amounts[selected])
+    return matrix, labels, history.start + timedelta(days=first)
+
+
+def _monthly_history(matrix, first_day, months=6):
+    """get_forecast'ning eski `historical` formati: oylik kirim/chiqim, yangidan eskiga"""
+    totals = {}
+    for offset in range(matrix.shape[1]):
+        month = (first_day + timedelta(days=offset)).strftime('%Y-%m')
+        income, expense = totals.get(month, (0.0, 0.0))
+        totals[month] = (income + float(matrix[0, offset]), expense + float(matrix[1, offset]))
+    return [
+        {'month': month, 'income': round(income, 2), 'expense': round(expense, 2)}
+        for month, (income, expense) in sorted(totals.items(), reverse=True)[:months]
+    ]
+
+
+def _growth_rate(forecast, recent):
+    return round((forecast - recent) / recent * 100, 2) if recent > 0 else 0.0
+
+
+def compute_forecast(rows, today=None, horizon=FORECAST_HORIZON_DAYS):
+    """
+    Rollup qatorlaridan to'liq prognoz (database'siz, test/benchmark uchun ham)
+
+    Returns:
+        dict: historical, forecast (kirim/chiqim/kategoriyalar) yoki message
+    """
+    today = today or date.today()
+    history = _history_range(today)
+    matrix, labels, first_day = build_series(rows, history)
+    historical = _monthly_history(matrix, first_day)
+
+    try:
+        result = forecast_matrix(matrix, horizon)
+    except InsufficientHistory:
+        return {
+            'historical': historical,
+            'forecast': {
+                'message': f"Prognoz uchun yetarli ma'lumot yo'q. Kamida {MIN_HISTORY_DAYS} kunlik ma'lumot kerak."
+            }
+        }
+
+    def section(position):
+        return {
+            'value': round(float(result['value'][position]), 2),
+            'lower': round(float(result['lower'][position]), 2),
+            'upper': round(float(result['upper'][position]), 2),
+            'model': str(result['model'][position]),
+            'seasonal': bool(result['seasonal'][position]),
+        }
+
+    recent_days = min(horizon, matrix.shape[1])
+    recent_income = float(matrix[0, -recent_days:].sum()) * horizon / recent_days
+    recent_expense = float(matrix[1, -recent_days:].sum()) * horizon / recent_days
+    income = section(0)
+    expense = section(1)
+
+    return {
+        'historical': historical,
+        'forecast': {
+            # Eski maydonlar (oy = keyingi `horizon` kun)
+            'next_month_income': income['value'],
+            'next_month_expense': expense['value'],
+            'next_month_profit': round(income['value'] - expense['value'], 2),
+            'income_growth_rate': _growth_rate(income['value'], recent_income),
+            'expense_growth_rate': _growth_rate(expense['value'], recent_expense),
+            'horizon_days': horizon,
+            'history_days': int(matrix.shape[1]),
+            'confidence': 0.95,
+            'income': income,
+            'expense': expense,
+            'categories': [
+                {'type': kind, 'category': category or None, **section(position)}
+                for position, (kind, category) in enumerate(labels) if category is not None
+            ],
+        }
+    }
+
+
+def _fingerprint(cursor, user_id, history):
+    cursor.execute(queries.FORECAST_FINGERPRINT, (user_id, *history.params))
+    row = cursor.fetchone() or {}
+    updated_at = row.get('updated_at')
+    if isinstance(updated_at, datetime):
+        updated_at = updated_at.isoformat()
+    return (row.get('rollup_rows'), str(row.get('tx_count')), str(row.get('amount_sum')), updated_at)
+
+
+def forecast_for_user(connection, user_id, today=None):
+    """
+    User prognozi (keshdan yoki qayta hisoblab)
+
+    Kesh kaliti rollup barmoq izini o'z ichiga oladi: bot yozgan tranzaksiyalar
+    ham darhol yangi prognozga olib keladi. Bitta arzon so'rov, keyin kesh.
+    """
+    today = today or date.today()
+    history = _history_range(today)
+    with connection.cursor() as cursor:
+        key = (user_id, today.toordinal(), _fingerprint(cursor, user_id, history))
+        cached = forecast_cache.get(key)
+        if cached is not None:
+            return cached
+        cursor.execute(queries.DAILY_CATEGORY_SERIES, (user_id, *history.params))
+        rows = cursor.fetchall()
+
+    result = compute_forecast(rows, today)
+    forecast_cache.set(key, result)
+    return result
@@ -0,0 +1,117 @@
+"""
+Gunicorn sozlamalari (production)
+
+    gunicorn -c gunicorn.conf.py
+
+- Ilova master'da bir marta yuklanadi (preload_app) va worker'lar fork qilinadi:
+  kod va import qilingan modullar copy-on-write bilan umumiy, har bir worker
+  faqat o'z o'zgargan sahifalari uchun xotira oladi
+- post_fork: parent'dan qolgan connection pool, fan-out executor va fon
+  thread'lari har bir worker'da qayta yaratiladi
+- Worker'lar max_requests (+ jitter) so'rovdan keyin navbat bilan almashtiriladi
+
+Worker soni CPU bo'yicha (cgroup kvotasi hisobga olinadi), env bilan
+o'zgartiriladi: WEB_CONCURRENCY, GUNICORN_THREADS, GUNICORN_MAX_WORKERS
+(GUNICORN_PRELOAD=false - taqqoslash uchun har bir worker o'zi yuklaydi).
+
+Worker turi faqat gthread: gevent monkey-patch post_fork'dan keyin bajariladi,
+preload qilingan modullardagi lock/threading.local'lar esa haqiqiy OS obyektlari
+bo'lib qoladi (greenlet'lar bitta connection to'plamini bo'lishadi, pool kutishi
+butun hub'ni bloklaydi). Ko'p ochiq ulanish kerak bo'lsa - asgi_app.py.
+"""
+import gc
+import math
+import os
+import shutil
+import tempfile
+
+
+def _cpu_count():
+    """Konteynerga ajratilgan CPU (os.cpu_count() host CPU'larini qaytaradi)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+CPU_COUNT = _cpu_count()
+
+# Worker'lar metrikalarini shu yerga yozadi, /metrics hammasini jamlaydi (metrics.py).
+# Config master'da ilovadan oldin yuklanadi - env worker'larga ham o'tadi
+_OWN_METRICS_DIR = not os.getenv('METRICS_DIR')
+if _OWN_METRICS_DIR:
+    os.environ['METRICS_DIR'] = os.path.join(tempfile.gettempdir(), f'balansai_metrics_{os.getpid()}')
+os.makedirs(os.environ['METRICS_DIR'], exist_ok=True)
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+wsgi_app = 'app:create_app(background=False)'
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', 2 * CPU_COUNT + 1))
+workers = max(1, min(workers, int(os.getenv('GUNICORN_MAX_WORKERS', '8'))))
+# Har bir thread bir vaqtda 1 + fan-out connection oladi: DB_POOL_SIZE'ni shunga moslang
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Xotira sizib chiqsa ham worker cheksiz o'smaydi; jitter - hammasi birdan qayta ishga tushmasin
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', str(max_requests // 10)))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def when_ready(server):
+    # Preload qilingan obyektlar GC tomonidan tekshirilmaydi - refcount'dan tashqari
+    # sahifalarga yozilmaydi va worker'lar ularni ko'chirib olmaydi
+    gc.freeze()
+    server.log.info(f"CPU={CPU_COUNT}, worker_class={worker_class}, workers={workers}")
+
+
+def post_fork(server, worker):
+    import database
+    import fanout
+    import log_setup
+    import metrics
+    import precompute
+    import query_profiler
+
+    log_setup.reset_after_fork()
+    database.pool.reset_after_fork()
+    fanout.reset_after_fork()
+    metrics.reset_after_fork()
+    query_profiler.reset_after_fork()
+    precompute.start_in_process()
+
+
+def worker_exit(server, worker):
+    import database
+    import log_setup
+    import metrics
+
+    metrics.flush()
+    database.pool.close_all()
+    log_setup.shutdown()
+
+
+def child_exit(server, worker):
+    # Master'da: chiqqan worker'ning counter'lari archive'ga o'tadi
+    import metrics
+
+    metrics.archive_worker(worker.pid)
+
+
+def on_exit(server):
+    if _OWN_METRICS_DIR:
+        shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
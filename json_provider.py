@@ -0,0 +1,91 @@
+"""
+JSON serializatsiya: orjson (o'rnatilgan bo'lsa) yoki standart json
+
+Ko'rinish jsonify (DefaultJSONProvider) bilan bir xil: kalitlar tartiblangan,
+ixcham, Decimal -> satr, datetime/date -> HTTP sana ("Wed, 01 Jan 2026 10:00:00 GMT").
+Farqi - ASCII bo'lmagan belgilar \\uXXXX emas, UTF-8 bo'lib yoziladi (kirill
+matnli javob 2-3 baravar kichik).
+
+orjson Decimal'ni bilmaydi va datetime'ni ISO qilib yozadi - ikkalasi ham
+`default` ga yo'naltiriladi. orjson qabul qilmagan qiymatlar (64-bitdan katta
+int, satr bo'lmagan kalitlar) standart json bilan yoziladi.
+JSON_PROVIDER=json - orjson ishlatilmaydi.
+"""
+import json
+import os
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if os.getenv('JSON_PROVIDER', 'orjson').lower() != 'orjson':
+    orjson = None
+
+if orjson is not None:
+    _OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY)
+
+_DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def http_date(value):
+    """werkzeug.http.http_date bilan bir xil (naive datetime - UTC), email.utils'siz"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return (f'{_DAYS[value.weekday()]}, {value.day:02d} {_MONTHS[value.month - 1]} {value.year:04d} '
+                f'{value.hour:02d}:{value.minute:02d}:{value.second:02d} GMT')
+    return f'{_DAYS[value.weekday()]}, {value.day:02d} {_MONTHS[value.month - 1]} {value.year:04d} 00:00:00 GMT'
+
+
+def default(o):
+    """MySQL qatorlaridagi turlar birinchi tekshiriladi, qolgani - Flask'niki"""
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, date):
+        return http_date(o)
+    return DefaultJSONProvider.default(o)
+
+
+def dumps(obj):
+    """Ixcham JSON (bytes)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=_OPTIONS)
+        except TypeError:
+            pass
+    return json.dumps(obj, default=default, ensure_ascii=False, sort_keys=True,
+                      separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    app.json: jsonify va response() shu orqali; javob tanasi to'g'ridan-to'g'ri bytes
+    (str'ga aylantirib qayta kodlanmaydi)
+    """
+
+    default = staticmethod(default)
+    ensure_ascii = False
+
+    def encode(self, obj, **kwargs):
+        # indent (debug) yoki o'zgartirilgan sozlamalar - standart json
+        if not self.ensure_ascii and self.sort_keys and kwargs.get('separators', (',', ':')) == (',', ':') \
+                and kwargs.keys() <= {'separators'}:
+            return dumps(obj)
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        return self.encode(obj, **kwargs).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            body = self.encode(obj, indent=2)
+        else:
+            body = self.encode(obj)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
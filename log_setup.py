@@ -0,0 +1,223 @@
+"""
+Logging: request thread'da I/O yo'q
+
+- Barcha yozuvlar QueueHandler orqali navbatga tushadi, stdout'ga fon thread'i
+  (QueueListener) yozadi. Navbat to'lsa yozuv tashlab yuboriladi, request kutmaydi
+- Format: JSON (bir qator - bir yozuv) yoki text (LOG_FORMAT=text, development uchun).
+  `extra={...}` bilan berilgan maydonlar JSON'ga alohida kalit bo'lib tushadi
+- Darajalar: LOG_LEVEL (umumiy), LOG_LEVELS="app=DEBUG,database=WARNING" (logger bo'yicha)
+- Har request'dagi DEBUG yozuvlar LOG_DEBUG_SAMPLE ulushda saqlanadi; bir xil DEBUG/INFO
+  shablon LOG_RATE_WINDOW soniyada LOG_RATE_LIMIT martadan ko'p yozilmaydi (tashlanganlar
+  soni keyingi yozuvning `suppressed` maydonida). WARNING va undan yuqori doim yoziladi
+- Xabar (`%` formatlash, traceback matni) request thread'da satrga aylantiriladi;
+  JSON/text formatlash va stdout'ga yozish - fon thread'ida
+
+Modullarda:
+    logger = logging.getLogger(__name__)
+    logger.debug("Plan: user_id=%s", user_id)   # f-string emas: shablon cheklov kaliti bo'ladi,
+                                                # tashlangan yozuv umuman formatlanmaydi
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_DEBUG_SAMPLE = float(os.getenv('LOG_DEBUG_SAMPLE', '0.01'))
+LOG_RATE_LIMIT = int(os.getenv('LOG_RATE_LIMIT', '20'))
+LOG_RATE_WINDOW = float(os.getenv('LOG_RATE_WINDOW', '60'))
+
+# LogRecord'ning o'z atributlari; qolganlari extra={...} dan keladi
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'template'}
+
+_lock = threading.Lock()
+_handler = None
+_listener = None
+_configured_pid = None
+
+
+def _extra_fields(record):
+    return {k: v for k, v in record.__dict__.items() if k not in _RECORD_ATTRS and not k.startswith('_')}
+
+
+class StructuredFormatter(logging.Formatter):
+    """JSON yoki `vaqt LEVEL logger: xabar k=v` qatori"""
+
+    def __init__(self, as_json=True):
+        super().__init__()
+        self.as_json = as_json
+
+    def format(self, record):
+        ts = datetime.fromtimestamp(record.created, timezone.utc)
+        fields = _extra_fields(record)
+        if self.as_json:
+            data = {
+                'ts': ts.isoformat(timespec='milliseconds'),
+                'level': record.levelname,
+                'logger': record.name,
+                'pid': record.process,
+                'msg': record.getMessage(),
+            }
+            data.update(fields)
+            if record.exc_text:
+                data['exc'] = record.exc_text
+            return json.dumps(data, ensure_ascii=False, default=str)
+        line = f"{ts.strftime('%H:%M:%S.%f')[:-3]} {record.levelname:<7} {record.name}: {record.getMessage()}"
+        if fields:
+            line += ' ' + ' '.join(f'{k}={v}' for k, v in fields.items())
+        if record.exc_text:
+            line += '\n' + record.exc_text
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """
+    DEBUG yozuvlarni namunalash va bir xil DEBUG/INFO shablonni cheklash
+
+    WARNING/ERROR cheklanmaydi - hodisa paytida aynan shular kerak. Kalit - `logger.debug("...%s", x)` dagi shablon: qiymatlar har xil bo'lsa ham
+    bitta xabar turi bitta hisoblagichga tushadi
+    """
+
+    def __init__(self, debug_sample=LOG_DEBUG_SAMPLE, rate_limit=LOG_RATE_LIMIT, window=LOG_RATE_WINDOW):
+        super().__init__()
+        self.debug_sample = debug_sample
+        self.rate_limit = rate_limit
+        self.window = window
+        self._windows = {}  # (logger, shablon) -> [boshlangan, soni, tashlangan]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno <= logging.DEBUG and self.debug_sample < 1 and random.random() >= self.debug_sample:
+            return False
+        if self.rate_limit <= 0 or record.levelno > logging.INFO:
+            return True
+
+        key = (record.name, record.msg if isinstance(record.msg, str) else type(record.msg).__name__)
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                if len(self._windows) >= 10000:
+                    self._windows.clear()
+                self._windows[key] = [now, 1, 0]
+            elif state[1] < self.rate_limit:
+                state[1] += 1
+                suppressed = 0
+            else:
+                state[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Navbat to'lsa kutmaydi va stderr'ga traceback yozmaydi - yozuv tashlanadi.
+    Xabar bu yerda (request thread'da) satrga aylantiriladi: args'dagi obyektlar
+    keyin o'zgarsa ham log o'sha paytdagi qiymatni ko'rsatadi
+    """
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.template = record.msg
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # To'xtatishda navbat to'la bo'lishi mumkin - qolganlari yozilguncha kutiladi
+        self.queue.put(self._sentinel)
+
+
+def _parse_levels(spec):
+    levels = {}
+    for item in spec.split(','):
+        name, sep, level = item.strip().partition('=')
+        if sep and name:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _start():
+    global _handler, _listener, _configured_pid
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(StructuredFormatter(as_json=LOG_FORMAT != 'text'))
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(SamplingFilter())
+    listener = _QueueListener(log_queue, stream, respect_handler_level=False)
+    listener.start()
+
+    root = logging.getLogger()
+    if _handler is not None:
+        root.removeHandler(_handler)
+    root.addHandler(handler)
+    _handler, _listener, _configured_pid = handler, listener, os.getpid()
+
+
+def configure():
+    """Root logger'ni navbatga ulash (takroriy chaqiruv hech narsa qilmaydi)"""
+    with _lock:
+        if _configured_pid is not None:
+            return
+        # Formatter chiqarmaydigan maydonlar yig'ilmaydi. process qoladi: JSON'dagi `pid`
+        # va gunicorn formatter'idagi %(process)d
+        logging.logThreads = False
+        logging.logMultiprocessing = False
+        logging.logAsyncioTasks = False
+        root = logging.getLogger()
+        root.setLevel(LOG_LEVEL)
+        for name, level in _parse_levels(LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+        _start()
+        atexit.register(shutdown)
+
+
+def reset_after_fork():
+    """
+    gunicorn post_fork'da: master'ning listener thread'i child'ga o'tmaydi,
+    navbat va thread qaytadan yaratiladi
+    """
+    with _lock:
+        if _configured_pid is None or _configured_pid == os.getpid():
+            return
+        _start()
+
+
+def shutdown():
+    """Navbatda qolgan yozuvlarni chiqarib, listener'ni to'xtatish"""
+    with _lock:
+        if _listener is not None and _configured_pid == os.getpid() and _listener._thread is not None:
+            _listener.stop()
+
+
+def stats():
+    """Tashlangan yozuvlar (navbat to'lgan) va navbatdagi yozuvlar soni"""
+    if _handler is None:
+        return {'dropped': 0, 'queued': 0}
+    return {'dropped': _handler.dropped, 'queued': _handler.queue.qsize()}
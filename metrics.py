@@ -0,0 +1,430 @@
+"""
+Request metrikalari: Prometheus /metrics va Server-Timing header
+
+Har bir request uchun yoziladi:
+- route/method/status bo'yicha latency histogrammasi
+- bajarilayotgan request'lar soni (route bo'yicha)
+- request ichidagi SQL so'rovlar soni va pool'dan connection kutish vaqti
+- keshlarning hit/miss hisoblagichlari (cache_store), pool holati
+
+Javobdagi `Server-Timing`: auth, plan, db, db-wait, serialize va total (ms,
+total'da SQL so'rovlar soni) - brauzer DevTools'da ko'rinadi.
+
+Hisoblagichlar process ichida, request yo'lida faqat lock ostida bir nechta
+dict amali. gunicorn'da har bir worker o'z holatini METRICS_DIR ga har
+METRICS_FLUSH_INTERVAL soniyada yozadi va /metrics barcha worker'larnikini
+jamlaydi: scrape qaysi worker'ga tushishidan qat'i nazar natija bir xil.
+Chiqqan worker'ning counter va histogrammalari master tomonidan `archive`
+ga qo'shiladi (Prometheus counter'i kamaymasin), gauge'lari tashlanadi.
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from flask import Response, request
+
+import cache_store
+from json_provider import FastJSONProvider
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+# Bo'sh bo'lsa - faqat joriy process (development); gunicorn.conf.py o'rnatadi
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+# Berilsa /metrics `Authorization: Bearer <METRICS_TOKEN>` talab qiladi
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# name -> (help, buckets, label nomlari)
+HISTOGRAMS = {
+    'http_request_duration_seconds': (
+        "Request davomiyligi", LATENCY_BUCKETS, ('route', 'method', 'status')),
+    'http_request_db_queries': (
+        "Bitta request'dagi SQL so'rovlar soni", QUERY_COUNT_BUCKETS, ('route',)),
+    'db_pool_checkout_wait_seconds': (
+        "Pool'dan connection olishni kutish", WAIT_BUCKETS, ()),
+}
+COUNTERS = {
+    'cache_hits_total': ("Kesh hit'lari", ('cache',)),
+    'cache_misses_total': ("Kesh miss'lari", ('cache',)),
+    'cache_evictions_total': ("LRU bo'yicha chiqarilgan yozuvlar", ('cache',)),
+    'db_pool_checkouts_total': ("Pool'dan olingan connection'lar", ()),
+    'db_pool_connections_created_total': ("Ochilgan MySQL connection'lar", ()),
+    'db_pool_timeouts_total': ("Pool band bo'lib olinmagan connection'lar", ()),
+}
+GAUGES = {
+    'http_requests_in_flight': ("Bajarilayotgan request'lar", ('route',)),
+    'cache_entries': ("Keshdagi yozuvlar", ('cache',)),
+    'db_pool_in_use': ("Band connection'lar", ()),
+    'db_pool_idle': ("Bo'sh connection'lar", ()),
+}
+
+
+class RequestTimings:
+    """Joriy request davomida yig'iladigan vaqtlar (soniya)"""
+    __slots__ = ('started', 'route', 'method', 'durations', 'queries')
+
+    def __init__(self, route, method):
+        self.started = time.perf_counter()
+        self.route = route
+        self.method = method
+        self.durations = {}
+        self.queries = 0
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def server_timing(self, total):
+        parts = [f'{name};dur={seconds * 1000:.3f}' for name, seconds in self.durations.items()]
+        parts.append(f'total;dur={total * 1000:.3f};desc="{self.queries} queries"')
+        return ', '.join(parts)
+
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+_lock = threading.Lock()
+_histograms = {}
+_in_flight = {}
+_flusher_pid = None
+# Boshqa modullarning worker bo'yicha holati (masalan, query_profiler) - snapshot bilan yoziladi
+_providers = {}
+
+
+def reset_after_fork():
+    """Fork'dan keyin child'da: parent hisoblagichlari bu worker'niki emas"""
+    global _lock, _histograms, _in_flight, _flusher_pid
+    _lock = threading.Lock()
+    _histograms = {}
+    _in_flight = {}
+    _flusher_pid = None
+
+
+def _observe(name, labels, value):
+    """Lock ostida chaqiriladi; qiymatlar: [bucket'lar..., +Inf, sum]"""
+    buckets = HISTOGRAMS[name][1]
+    entry = _histograms.get((name, labels))
+    if entry is None:
+        entry = _histograms[(name, labels)] = [0] * (len(buckets) + 1) + [0.0]
+    entry[bisect_left(buckets, value)] += 1
+    entry[-1] += value
+
+
+# ===== REQUEST ICHIDAN CHAQIRILADI =====
+
+def add_timing(name, seconds):
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+def timed(name):
+    """Funksiya vaqtini Server-Timing'ga qo'shish: @metrics.timed('plan')"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add_timing(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def record_query(seconds):
+    """database: har bir SQL so'rovdan keyin"""
+    timings = _current.get()
+    if timings is not None:
+        timings.queries += 1
+        timings.add('db', seconds)
+
+
+def record_checkout_wait(seconds):
+    """database: pool'dan connection olingandan keyin"""
+    timings = _current.get()
+    if timings is not None:
+        timings.add('db-wait', seconds)
+    with _lock:
+        _observe('db_pool_checkout_wait_seconds', (), seconds)
+
+
+# ===== FLASK =====
+
+class TimedJSONProvider(FastJSONProvider):
+    """jsonify serializatsiyasi vaqti - Server-Timing `serialize`"""
+
+    def encode(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().encode(obj, **kwargs)
+        finally:
+            add_timing('serialize', time.perf_counter() - started)
+
+
+def _before_request():
+    # LocalProxy orqali har bir atribut qimmat - request bir marta olinadi
+    current_request = request._get_current_object()
+    rule = current_request.url_rule
+    route = rule.rule if rule is not None else 'unmatched'
+    _current.set(RequestTimings(route, current_request.method))
+    with _lock:
+        _in_flight[route] = _in_flight.get(route, 0) + 1
+
+
+def _after_request(response):
+    timings = _current.get()
+    if timings is None:
+        return response
+    total = time.perf_counter() - timings.started
+    with _lock:
+        _observe('http_request_duration_seconds', (timings.route, timings.method, response.status_code), total)
+        _observe('http_request_db_queries', (timings.route,), timings.queries)
+    response.headers.add('Server-Timing', timings.server_timing(total))
+    if METRICS_DIR and _flusher_pid != os.getpid():
+        _start_flusher()
+    return response
+
+
+def _teardown_request(exc=None):
+    timings = _current.get()
+    if timings is None:
+        return
+    _current.set(None)
+    with _lock:
+        _in_flight[timings.route] -= 1
+
+
+def metrics_view():
+    if METRICS_TOKEN and request.headers.get('Authorization', '') != f'Bearer {METRICS_TOKEN}':
+        return Response('unauthorized\n', status=401, mimetype='text/plain')
+    return Response(render(), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app):
+    """Hook'lar boshqa before_request'lardan oldin ro'yxatdan o'tishi kerak (auth vaqti ham kirsin)"""
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    if not METRICS_ENABLED:
+        return
+    app.json = TimedJSONProvider(app)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+
+# ===== SNAPSHOT VA JAMLASH =====
+
+def snapshot():
+    """Joriy process holati: {'histograms': [...], 'counters': [...], 'gauges': [...]}"""
+    from database import pool
+
+    with _lock:
+        histograms = [[name, list(labels), list(values)] for (name, labels), values in _histograms.items()]
+        gauges = [['http_requests_in_flight', [route], count] for route, count in _in_flight.items()]
+
+    counters = []
+    for stats in cache_store.all_stats():
+        labels = [stats['name']]
+        counters.append(['cache_hits_total', labels, stats['hits']])
+        counters.append(['cache_misses_total', labels, stats['misses']])
+        counters.append(['cache_evictions_total', labels, stats['evictions']])
+        gauges.append(['cache_entries', labels, stats['size']])
+
+    pool_stats = pool.stats()
+    counters.append(['db_pool_checkouts_total', [], pool_stats['checkouts']])
+    counters.append(['db_pool_connections_created_total', [], pool_stats['created']])
+    counters.append(['db_pool_timeouts_total', [], pool_stats['timeouts']])
+    gauges.append(['db_pool_in_use', [], pool_stats['in_use']])
+    gauges.append(['db_pool_idle', [], pool_stats['idle']])
+    extra = {name: provider() for name, provider in _providers.items()}
+    return {'pid': os.getpid(), 'histograms': histograms, 'counters': counters, 'gauges': gauges,
+            'extra': extra}
+
+
+def register_snapshot(name, provider):
+    """provider() - JSON'ga yoziladigan joriy process holati; worker_snapshots(name) bilan o'qiladi"""
+    _providers[name] = provider
+
+
+def worker_snapshots(name):
+    """Ishlab turgan barcha worker'larning `name` holati (joriy process - jonli)"""
+    own_pid = os.getpid()
+    payloads = [_providers[name]()]
+    if METRICS_DIR:
+        try:
+            names = os.listdir(METRICS_DIR)
+        except OSError:
+            names = []
+        for file_name in names:
+            if not file_name.startswith('worker_') or file_name == f'worker_{own_pid}.json':
+                continue
+            data = _read_json(os.path.join(METRICS_DIR, file_name))
+            if data is not None and name in data.get('extra', {}):
+                payloads.append(data['extra'][name])
+    return payloads
+
+
+def _snapshot_path(name):
+    return os.path.join(METRICS_DIR, f'{name}.json')
+
+
+def _write_json(path, data):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def flush():
+    """Joriy process holatini METRICS_DIR ga yozish"""
+    if METRICS_DIR:
+        _write_json(_snapshot_path(f'worker_{os.getpid()}'), snapshot())
+
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            flush()
+        except Exception as e:
+            logger.warning("Metrikalarni yozishda xatolik: %s", e)
+
+
+def _start_flusher():
+    global _flusher_pid
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name='metrics-flush', daemon=True).start()
+
+
+def _merge(total, data, with_gauges):
+    for name, labels, values in data['histograms']:
+        key = (name, tuple(labels))
+        current = total['histograms'].get(key)
+        total['histograms'][key] = values if current is None else [a + b for a, b in zip(current, values)]
+    for name, labels, value in data['counters']:
+        key = (name, tuple(labels))
+        total['counters'][key] = total['counters'].get(key, 0) + value
+    if with_gauges:
+        for name, labels, value in data['gauges']:
+            key = (name, tuple(labels))
+            total['gauges'][key] = total['gauges'].get(key, 0) + value
+
+
+def archive_worker(pid):
+    """
+    gunicorn master (child_exit): chiqqan worker'ning counter/histogrammalarini
+    archive'ga qo'shish. Archive'ni faqat master yozadi - lock kerak emas
+    """
+    if not METRICS_DIR:
+        return
+    path = _snapshot_path(f'worker_{pid}')
+    data = _read_json(path)
+    if data is not None:
+        total = {'histograms': {}, 'counters': {}, 'gauges': {}}
+        archived = _read_json(_snapshot_path('archive'))
+        if archived is not None:
+            _merge(total, archived, with_gauges=False)
+        _merge(total, data, with_gauges=False)
+        _write_json(_snapshot_path('archive'), {
+            'histograms': [[name, list(labels), values] for (name, labels), values in total['histograms'].items()],
+            'counters': [[name, list(labels), value] for (name, labels), value in total['counters'].items()],
+            'gauges': [],
+        })
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def collect():
+    """Barcha worker'lar (fayldan) va joriy process (jonli) holati jamlangan"""
+    total = {'histograms': {}, 'counters': {}, 'gauges': {}}
+    own_pid = os.getpid()
+    if METRICS_DIR:
+        try:
+            names = os.listdir(METRICS_DIR)
+        except OSError:
+            names = []
+        for name in names:
+            if not name.endswith('.json') or name == f'worker_{own_pid}.json':
+                continue
+            data = _read_json(os.path.join(METRICS_DIR, name))
+            if data is not None:
+                _merge(total, data, with_gauges=name != 'archive.json')
+    _merge(total, snapshot(), with_gauges=True)
+    return total
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Prometheus text format (0.0.4)"""
+    total = collect()
+    lines = []
+
+    for name, (help_text, buckets, label_names) in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (metric, labels), values in sorted(total['histograms'].items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), values[:-1]):
+                cumulative += count
+                le = f'le="{bound if bound == "+Inf" else float(bound)}"'
+                lines.append(f'{name}_bucket{_format_labels(label_names, labels, le)} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(label_names, labels)} {_format_number(values[-1])}')
+            lines.append(f'{name}_count{_format_labels(label_names, labels)} {cumulative}')
+
+    for kind, metrics in (('counter', COUNTERS), ('gauge', GAUGES)):
+        values = total['counters' if kind == 'counter' else 'gauges']
+        for name, (help_text, label_names) in metrics.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (metric, labels), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(label_names, labels)} {_format_number(value)}')
+
+    # Kesh hit ratio - jamlangan hit/miss bo'yicha
+    lines.append('# HELP cache_hit_ratio Kesh hit ulushi (process ishga tushgandan beri)')
+    lines.append('# TYPE cache_hit_ratio gauge')
+    for (metric, labels), hits in sorted(total['counters'].items()):
+        if metric != 'cache_hits_total':
+            continue
+        lookups = hits + total['counters'].get(('cache_misses_total', labels), 0)
+        ratio = hits / lookups if lookups else 0.0
+        lines.append(f'cache_hit_ratio{_format_labels(("cache",), labels)} {ratio!r}')
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,84 @@
+-- transactions_daily: tranzaksiyalarning kunlik rollup jadvali
+-- Hisobot va analitika endpoint'lari xom transactions o'rniga shu jadvalni o'qiydi.
+-- Trigger'lar bot va ilova yozgan har bir qatorni darhol rollup'ga qo'shadi.
+--
+-- Bajarish:
+--   mysql -u root -p balansai_db < migrations/001_transactions_daily.sql
+-- Mavjud ma'lumotlarni to'ldirish:
+--   python rollup.py rebuild
+
+CREATE TABLE IF NOT EXISTS transactions_daily (
+    user_id BIGINT NOT NULL,
+    day DATE NOT NULL,
+    transaction_type ENUM('income', 'expense', 'debt') NOT NULL,
+    category VARCHAR(100) NOT NULL DEFAULT '',  -- NULL kategoriya '' sifatida saqlanadi
+    amount_sum DECIMAL(20,2) NOT NULL DEFAULT 0,
+    tx_count INT NOT NULL DEFAULT 0,
+    amount_min DECIMAL(15,2) NULL,
+    amount_max DECIMAL(15,2) NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, day, transaction_type, category)
+);
+
+DROP PROCEDURE IF EXISTS transactions_daily_refresh;
+DROP TRIGGER IF EXISTS trg_transactions_daily_insert;
+DROP TRIGGER IF EXISTS trg_transactions_daily_update;
+DROP TRIGGER IF EXISTS trg_transactions_daily_delete;
+
+DELIMITER //
+
+-- Bitta (user, kun, tur, kategoriya) guruhini xom qatorlardan qayta hisoblash.
+-- DELETE/UPDATE'da ishlatiladi: min/max'ni ayirib bo'lmaydi.
+CREATE PROCEDURE transactions_daily_refresh(
+    IN p_user_id BIGINT, IN p_day DATE, IN p_type VARCHAR(10), IN p_category VARCHAR(100)
+)
+BEGIN
+    DELETE FROM transactions_daily
+     WHERE user_id = p_user_id AND day = p_day
+       AND transaction_type = p_type AND category = p_category;
+
+    INSERT INTO transactions_daily
+        (user_id, day, transaction_type, category, amount_sum, tx_count, amount_min, amount_max)
+    SELECT user_id, p_day, transaction_type, p_category,
+           SUM(amount), COUNT(*), MIN(amount), MAX(amount)
+      FROM transactions
+     WHERE user_id = p_user_id
+       AND created_at >= p_day AND created_at < p_day + INTERVAL 1 DAY
+       AND transaction_type = p_type
+       AND IFNULL(category, '') = p_category
+     GROUP BY user_id, transaction_type;
+END //
+
+CREATE TRIGGER trg_transactions_daily_insert AFTER INSERT ON transactions
+FOR EACH ROW
+BEGIN
+    INSERT INTO transactions_daily
+        (user_id, day, transaction_type, category, amount_sum, tx_count, amount_min, amount_max)
+    VALUES
+        (NEW.user_id, DATE(NEW.created_at), NEW.transaction_type, IFNULL(NEW.category, ''),
+         NEW.amount, 1, NEW.amount, NEW.amount)
+    ON DUPLICATE KEY UPDATE
+        amount_sum = amount_sum + VALUES(amount_sum),
+        tx_count = tx_count + 1,
+        amount_min = LEAST(IFNULL(amount_min, VALUES(amount_min)), VALUES(amount_min)),
+        amount_max = GREATEST(IFNULL(amount_max, VALUES(amount_max)), VALUES(amount_max));
+END //
+
+CREATE TRIGGER trg_transactions_daily_update AFTER UPDATE ON transactions
+FOR EACH ROW
+BEGIN
+    CALL transactions_daily_refresh(OLD.user_id, DATE(OLD.created_at), OLD.transaction_type, IFNULL(OLD.category, ''));
+    IF NOT (NEW.user_id <=> OLD.user_id AND DATE(NEW.created_at) <=> DATE(OLD.created_at)
+            AND NEW.transaction_type <=> OLD.transaction_type
+            AND IFNULL(NEW.category, '') <=> IFNULL(OLD.category, '')) THEN
+        CALL transactions_daily_refresh(NEW.user_id, DATE(NEW.created_at), NEW.transaction_type, IFNULL(NEW.category, ''));
+    END IF;
+END //
+
+CREATE TRIGGER trg_transactions_daily_delete AFTER DELETE ON transactions
+FOR EACH ROW
+BEGIN
+    CALL transactions_daily_refresh(OLD.user_id, DATE(OLD.created_at), OLD.transaction_type, IFNULL(OLD.category, ''));
+END //
+
+DELIMITER ;
@@ -0,0 +1,21 @@
+-- Hot so'rovlar uchun composite index'lar
+-- user_id bo'yicha filtr + created_at bo'yicha oraliq/tartib bitta index'dan o'qiladi.
+-- Tekshirish: python scripts/explain_check.py --user-id <id>
+
+ALTER TABLE transactions
+    ADD INDEX idx_user_created_type_amount (user_id, created_at, transaction_type, amount);
+
+ALTER TABLE warehouse_movements
+    ADD INDEX idx_user_type_reason_created (user_id, movement_type, reason, created_at),
+    ADD INDEX idx_user_created (user_id, created_at),
+    ADD INDEX idx_user_product_created (user_id, product_id, created_at);
+
+ALTER TABLE warehouse_products
+    ADD INDEX idx_user_created (user_id, created_at);
+
+ALTER TABLE business_employees
+    ADD INDEX idx_owner_created (owner_id, created_at);
+
+ALTER TABLE business_tasks
+    ADD INDEX idx_owner_created (owner_id, created_at),
+    ADD INDEX idx_owner_status_created (owner_id, status, created_at);
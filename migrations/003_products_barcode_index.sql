@@ -0,0 +1,5 @@
+-- Inventarizatsiya (POST /api/warehouse/stocktake) sanoq qatorlarini barcode bo'yicha
+-- mahsulotga bog'laydi: (user_id, barcode) index'isiz har bir sanoq full scan bo'ladi.
+
+ALTER TABLE warehouse_products
+    ADD INDEX idx_user_barcode (user_id, barcode);
@@ -0,0 +1,13 @@
+-- Import (POST /api/warehouse/products/import) mahsulotni (user_id, barcode) bo'yicha
+-- upsert qiladi: INSERT ... ON DUPLICATE KEY UPDATE uchun UNIQUE kalit kerak.
+-- Barcode'siz mahsulotlar NULL saqlanadi (NULL'lar UNIQUE'ni buzmaydi).
+--
+-- Migratsiyadan oldin takroriy shtrix-kodlarni tekshirish:
+--   SELECT user_id, barcode, COUNT(*) FROM warehouse_products
+--   WHERE barcode IS NOT NULL GROUP BY user_id, barcode HAVING COUNT(*) > 1;
+
+UPDATE warehouse_products SET barcode = NULL WHERE barcode = '';
+
+ALTER TABLE warehouse_products
+    DROP INDEX idx_user_barcode,
+    ADD UNIQUE KEY uq_user_barcode (user_id, barcode);
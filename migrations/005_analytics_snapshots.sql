@@ -0,0 +1,25 @@
+-- Oldindan hisoblangan analitika (precompute.py)
+-- Scheduler faol user'lar uchun dashboard/summary/forecast/kategoriya javoblarini
+-- shu jadvalga yozadi, endpoint'lar esa avval shu yerdan o'qiydi.
+--
+-- Bajarish:
+--   mysql -u root -p balansai_db < migrations/005_analytics_snapshots.sql
+
+CREATE TABLE IF NOT EXISTS analytics_snapshots (
+    user_id BIGINT NOT NULL,
+    kind VARCHAR(32) NOT NULL,
+    day DATE NOT NULL,                      -- hisoblangan kun ('month', 'oxirgi 30 kun' shu kunga nisbatan)
+    fingerprint VARCHAR(512) NOT NULL,      -- hisoblashdan oldingi ma'lumot barmoq izi
+    payload MEDIUMTEXT NOT NULL,            -- javobning 'data' qismi (JSON)
+    computed_at TIMESTAMP(3) NOT NULL,      -- payload hisoblangan vaqt
+    checked_at TIMESTAMP(3) NOT NULL,       -- oxirgi tekshiruv (watermark)
+    compute_ms INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, kind)
+);
+
+-- Mini App'ni ochgan user'lar (scheduler faqat shularni hisoblaydi)
+CREATE TABLE IF NOT EXISTS analytics_active_users (
+    user_id BIGINT PRIMARY KEY,
+    last_seen_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_last_seen (last_seen_at)
+);
@@ -0,0 +1,7 @@
+-- Dashboard'dagi vazifalar soni (GET /api/tasks?fields=id,status) status bo'yicha
+-- sanaladi: status index'da bo'lsa so'rov jadvalga murojaat qilmaydi (Using index).
+-- Mahsulot/xodim soni (?fields=id) va tranzaksiya id/type/amount ko'rinishini
+-- migrations/002 dagi index'lar allaqachon qoplaydi.
+
+ALTER TABLE business_tasks
+    ADD INDEX idx_owner_created_status (owner_id, created_at, status);
@@ -0,0 +1,127 @@
+"""
+Keyset (cursor) pagination
+
+Ro'yxatlar `ORDER BY created_at DESC, id DESC` tartibida qaytadi, keyingi sahifa
+OFFSET bilan emas, oxirgi qatorning (created_at, id) juftligidan keyin
+"seek" qilinadi: N-sahifa ham 1-sahifa kabi index'dan bir xil narxda o'qiladi.
+Yangi qo'shilgan qatorlar boshiga tushadi, shuning uchun sahifalar orasida
+takrorlanish yoki tushib qolish bo'lmaydi.
+
+Cursor - klient uchun shaffof bo'lmagan base64url satr.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import NamedTuple, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at, row_id):
+    """Oxirgi qator (created_at, id) sidan cursor yasash"""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat(sep=' ')
+    raw = json.dumps([created_at, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor):
+    """
+    Cursor'ni (created_at, id) ga qaytarish
+
+    Raises:
+        ValueError: cursor buzilgan bo'lsa
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError("cursor invalid")
+
+
+class PageRequest(NamedTuple):
+    """Sahifa o'lchami va (bo'lsa) oldingi sahifaning oxirgi kaliti"""
+    size: int
+    after: Optional[Tuple[datetime, int]] = None
+
+    def split(self, rows, columns=None):
+        """
+        `size + 1` ta o'qilgan qatorlardan sahifa va next_cursor ajratish
+
+        Args:
+            columns: qatorlar tuple bo'lsa (columnar javob) - ustun nomlari
+
+        Returns:
+            tuple: (rows, next_cursor) - oxirgi sahifada next_cursor None
+        """
+        rows = list(rows or [])
+        if len(rows) <= self.size:
+            return rows, None
+        rows = rows[:self.size]
+        last = rows[-1] if columns is None else dict(zip(columns, rows[-1]))
+        return rows, encode_cursor(last['created_at'], last['id'])
+
+
+def page_from_args(args, default_size=DEFAULT_PAGE_SIZE, max_size=MAX_PAGE_SIZE,
+                   size_params=('page_size',), required=False):
+    """
+    Request argumentlaridan PageRequest: `?page_size=N&cursor=...`
+
+    `required=False` bo'lsa va hech biri berilmagan bo'lsa None qaytadi
+    (eski, to'liq ro'yxat rejimi).
+
+    Raises:
+        ValueError: page_size yoki cursor noto'g'ri bo'lsa
+    """
+    size_param = next((name for name in size_params if args.get(name) is not None), size_params[0])
+    size = args.get(size_param)
+    cursor = args.get('cursor')
+    if size is None and cursor is None and not required:
+        return None
+
+    if size is None:
+        size = default_size
+    else:
+        try:
+            size = int(size)
+        except ValueError:
+            raise ValueError(f"{size_param} invalid")
+    size = max(1, min(size, max_size))
+
+    after = decode_cursor(cursor) if cursor else None
+    return PageRequest(size, after)
+
+
+def seek_predicate(prefix=''):
+    """`(created_at, id) < (%s, %s)` ni index range sifatida yozish"""
+    created_at = f"{prefix}created_at"
+    row_id = f"{prefix}id"
+    return f"({created_at} < %s OR ({created_at} = %s AND {row_id} < %s))"
+
+
+class KeysetQuery(NamedTuple):
+    """Bitta ro'yxat uchun birinchi sahifa va seek (keyingi sahifa) SQL'lari"""
+    first: str
+    after: str
+
+    @classmethod
+    def build(cls, select_where, prefix=''):
+        """
+        Args:
+            select_where: `SELECT ... FROM ... WHERE ...` (ORDER/LIMIT'siz)
+            prefix: jadval aliasi, masalan 'wm.'
+        """
+        order = f"ORDER BY {prefix}created_at DESC, {prefix}id DESC\n   LIMIT %s"
+        return cls(
+            f"{select_where}\n   {order}",
+            f"{select_where} AND {seek_predicate(prefix)}\n   {order}"
+        )
+
+    def bind(self, params, page):
+        """(sql, params) - `size + 1` qator o'qiladi (keyingi sahifa borligini bilish uchun)"""
+        if page.after is None:
+            return self.first, (*params, page.size + 1)
+        created_at, row_id = page.after
+        return self.after, (*params, created_at, created_at, row_id, page.size + 1)
@@ -0,0 +1,112 @@
+"""
+Hisobot davrlari uchun yarim ochiq [start, end) sana oraliqlari
+
+`YEAR(created_at) = YEAR(NOW())` kabi shartlar index'dan foydalana olmaydi.
+Bu yerda davr oldindan sanaga aylantiriladi va SQL'ga
+`column >= %s AND column < %s` ko'rinishida beriladi.
+"""
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+PERIODS = ('day', 'week', 'month', 'year')
+
+
+class PeriodRange(NamedTuple):
+    """Yarim ochiq oraliq: start <= x < end"""
+    start: date
+    end: date
+
+    @property
+    def params(self):
+        return (self.start, self.end)
+
+
+def _today():
+    return datetime.now().date()
+
+
+def period_range(period, today=None):
+    """
+    Davrni joriy kun/hafta/oy/yil oralig'iga aylantirish
+
+    Hafta yakshanbadan boshlanadi (MySQL YEARWEEK() default rejimi kabi).
+    Noma'lum davr uchun 'month' ishlatiladi.
+    """
+    today = today or _today()
+    if period == 'day':
+        return PeriodRange(today, today + timedelta(days=1))
+    if period == 'week':
+        start = today - timedelta(days=(today.weekday() + 1) % 7)
+        return PeriodRange(start, start + timedelta(days=7))
+    if period == 'year':
+        return PeriodRange(date(today.year, 1, 1), date(today.year + 1, 1, 1))
+
+    start = date(today.year, today.month, 1)
+    if today.month == 12:
+        return PeriodRange(start, date(today.year + 1, 1, 1))
+    return PeriodRange(start, date(today.year, today.month + 1, 1))
+
+
+def last_days(days, today=None):
+    """Bugun bilan birga oxirgi `days` kun: [today - days, today + 1)"""
+    today = today or _today()
+    return PeriodRange(today - timedelta(days=days), today + timedelta(days=1))
+
+
+def _shift_months(day, months):
+    """Sanani `months` oy orqaga surish (oy oxiri kunlari qisqartiriladi)"""
+    year, month = divmod(day.year * 12 + day.month - 1 - months, 12)
+    month += 1
+    for day_number in (day.day, 30, 29, 28):
+        try:
+            return date(year, month, day_number)
+        except ValueError:
+            continue
+
+
+def trailing_months(months, today=None):
+    """`DATE_SUB(CURDATE(), INTERVAL n MONTH)` dan bugungacha: [today - n oy, today + 1)"""
+    today = today or _today()
+    return PeriodRange(_shift_months(today, months), today + timedelta(days=1))
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} sana formati invalid, YYYY-MM-DD kutilmoqda")
+
+
+def custom_range(date_from, date_to):
+    """
+    Foydalanuvchi bergan from/to (ikkalasi ham kiritiladi) oralig'i
+
+    Raises:
+        ValueError: sana formati noto'g'ri yoki from > to bo'lsa
+    """
+    start = _parse_date(date_from, 'from')
+    end = _parse_date(date_to, 'to')
+    if start > end:
+        raise ValueError("from sanasi to sanasidan keyin - invalid oraliq")
+    return PeriodRange(start, end + timedelta(days=1))
+
+
+def range_from_args(args, default='month'):
+    """
+    Request argumentlaridan oraliq: `?period=day|week|month|year`
+    yoki `?from=YYYY-MM-DD&to=YYYY-MM-DD` (period=custom bilan yoki usiz)
+    """
+    date_from = args.get('from')
+    date_to = args.get('to')
+    if date_from or date_to or args.get('period') == 'custom':
+        return custom_range(date_from or date_to, date_to or date_from)
+
+    period = args.get('period', default)
+    if period not in PERIODS:
+        period = default
+    return period_range(period)
+
+
+def range_predicate(column):
+    """`column >= %s AND column < %s` - parametrlar: PeriodRange.params"""
+    return f"{column} >= %s AND {column} < %s"
@@ -0,0 +1,598 @@
+"""
+Og'ir analitikani oldindan hisoblash (request yo'lidan tashqarida)
+
+Scheduler yaqinda Mini App'ni ochgan user'lar (analytics_active_users) uchun
+summary, dashboard, prognoz va kategoriya tahlilini analytics_snapshots
+jadvaliga yozib boradi. Endpoint'lar `@serves_snapshot(kind)` orqali avval
+snapshot'ni o'qiydi; snapshot yo'q, boshqa kunniki yoki barmoq izi hozirgi
+ma'lumotga mos kelmasa - odatdagidek jonli hisoblanadi.
+
+Scheduler:
+- vaqti kelgan user'lar ustuvorlik navbatiga o'tadi: hali hisoblanmaganlar,
+  keyin eng yaqinda kirganlar birinchi
+- `PRECOMPUTE_WORKERS` ta worker thread (chegaralangan parallellik)
+- keyingi ishga tushish ±`PRECOMPUTE_JITTER` ga siljitiladi: kun almashganda
+  hamma user bir vaqtda database'ga tushmaydi
+- watermark'lar (checked_at) database'da: qayta ishga tushganda hammasi
+  qaytadan hisoblanmaydi, barmoq izi o'zgarmagan snapshot qayta hisoblanmaydi
+- MySQL GET_LOCK: bir vaqtda faqat bitta scheduler ishlaydi
+
+Ishga tushirish:
+    python precompute.py run                    # doimiy (sidecar)
+    python precompute.py run --once             # faol user'larni bir marta (cron)
+    python precompute.py refresh --user-id 123  # bitta user, majburiy
+
+Gunicorn worker ichida: PRECOMPUTE_IN_PROCESS=true (lock olgan bitta worker ishlaydi).
+"""
+import argparse
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import wraps
+from typing import Any, NamedTuple
+
+from flask import jsonify, request, session
+
+from analytics import (build_category_analysis, build_dashboard, build_summary, category_specs,
+                       dashboard_specs, run_sections, summary_specs)
+from cache_store import CacheStore
+from database import get_db_connection
+from forecasting import forecast_for_user
+import json_provider
+import log_setup
+from periods import period_range
+import queries
+
+logger = logging.getLogger(__name__)
+
+PRECOMPUTE_WORKERS = int(os.getenv('PRECOMPUTE_WORKERS', '2'))
+# Bitta user snapshot'lari necha soniyada bir tekshiriladi
+PRECOMPUTE_INTERVAL = float(os.getenv('PRECOMPUTE_INTERVAL', '900'))
+PRECOMPUTE_JITTER = float(os.getenv('PRECOMPUTE_JITTER', '0.2'))
+PRECOMPUTE_ACTIVE_DAYS = int(os.getenv('PRECOMPUTE_ACTIVE_DAYS', '7'))
+# Faol user'lar ro'yxati va leader lock shu oraliqda yangilanadi
+PRECOMPUTE_SCAN_INTERVAL = float(os.getenv('PRECOMPUTE_SCAN_INTERVAL', '60'))
+PRECOMPUTE_IN_PROCESS = os.getenv('PRECOMPUTE_IN_PROCESS', 'false').lower() == 'true'
+# User faolligi bitta worker'dan shu oraliqda bir marta yoziladi
+PRECOMPUTE_ACTIVITY_INTERVAL = int(os.getenv('PRECOMPUTE_ACTIVITY_INTERVAL', '600'))
+
+LEADER_LOCK = 'balansai_precompute'
+
+
+class Incomplete(Exception):
+    """Bo'limlardan biri bajarilmadi - qisman natija snapshot qilinmaydi"""
+
+
+def _complete(result):
+    if result.partial:
+        raise Incomplete(', '.join(result.failed))
+    return result.data
+
+
+def _compute_summary(user_id):
+    return build_summary(_complete(run_sections(summary_specs(user_id, period_range('month')))))
+
+
+def _compute_dashboard(user_id):
+    return build_dashboard(_complete(run_sections(dashboard_specs(user_id, period_range('month')))))
+
+
+def _compute_forecast(user_id):
+    connection = get_db_connection()
+    try:
+        return forecast_for_user(connection, user_id)
+    finally:
+        connection.close()
+
+
+def _compute_category_analysis(user_id):
+    return build_category_analysis(_complete(run_sections(category_specs(user_id))))
+
+
+class SnapshotKind(NamedTuple):
+    """
+    Oldindan hisoblanadigan javob
+
+    scopes: javob bog'liq ma'lumotlar (endpoint'ning @cached_response scopes bilan bir xil)
+    accepts: snapshot berilishi mumkin bo'lgan query parametrlari (qolganlari - jonli)
+    """
+    name: str
+    scopes: tuple
+    compute: Any
+    accepts: tuple
+
+
+_DEFAULT_PERIOD = ({}, {'period': 'month'})
+
+KINDS = {kind.name: kind for kind in (
+    SnapshotKind('summary', ('transactions', 'warehouse'), _compute_summary, _DEFAULT_PERIOD),
+    SnapshotKind('dashboard', ('transactions', 'warehouse', 'employees'), _compute_dashboard,
+                 _DEFAULT_PERIOD),
+    SnapshotKind('forecast', ('transactions',), _compute_forecast, ({},)),
+    SnapshotKind('category_analysis', ('transactions',), _compute_category_analysis, ({},)),
+)}
+
+_FINGERPRINTS_SQL = queries.snapshot_fingerprints_sql({name: kind.scopes for name, kind in KINDS.items()})
+_LOOKUP_SQL = {name: queries.snapshot_lookup_sql(kind.scopes) for name, kind in KINDS.items()}
+
+
+def _dumps(data):
+    # jsonify bilan bir xil ko'rinish (Decimal, sana) - snapshot'dan berilgan javob jonlisidan farq qilmaydi
+    return json_provider.dumps(data).decode('utf-8')
+
+
+# ===== HISOBLASH =====
+
+def refresh_user(user_id, force=False):
+    """
+    Bitta user snapshot'larini yangilash
+
+    Barmoq izi hisoblashdan OLDIN o'qiladi: hisoblash paytida yozilgan ma'lumot
+    snapshot'ni eskirgan qiladi (yashirib qo'ymaydi).
+
+    Returns:
+        dict: kind -> 'computed' | 'fresh' (o'zgarmagan) | 'partial' (saqlanmadi)
+    """
+    today = date.today()
+    connection = get_db_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(_FINGERPRINTS_SQL, (user_id,))
+            fingerprints = cursor.fetchone()
+            cursor.execute(queries.SNAPSHOT_WATERMARKS, (user_id,))
+            existing = {row['kind']: (row['day'], row['fingerprint']) for row in cursor.fetchall()}
+        connection.commit()
+    finally:
+        connection.close()
+
+    outcome = {}
+    computed = []
+    for name, kind in KINDS.items():
+        fingerprint = fingerprints[name]
+        if not force and existing.get(name) == (today, fingerprint):
+            outcome[name] = 'fresh'
+            continue
+        started = time.perf_counter()
+        try:
+            data = kind.compute(user_id)
+        except Incomplete as e:
+            logger.warning("Precompute: user_id=%s %s qisman, saqlanmadi (%s)", user_id, name, e)
+            outcome[name] = 'partial'
+            continue
+        elapsed_ms = round((time.perf_counter() - started) * 1000)
+        computed.append((user_id, name, today, fingerprint, _dumps(data), elapsed_ms))
+        outcome[name] = 'computed'
+
+    connection = get_db_connection()
+    try:
+        with connection.cursor() as cursor:
+            if computed:
+                cursor.executemany(queries.SNAPSHOT_UPSERT, computed)
+            fresh = [(user_id, name) for name, state in outcome.items() if state == 'fresh']
+            if fresh:
+                cursor.executemany(queries.SNAPSHOT_TOUCH, fresh)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+    return outcome
+
+
+def active_users(connection, days=PRECOMPUTE_ACTIVE_DAYS):
+    with connection.cursor() as cursor:
+        cursor.execute(queries.ACTIVE_USERS, (days,))
+        return cursor.fetchall()
+
+
+# ===== REQUEST YO'LI =====
+
+_recent_activity = CacheStore('precompute_activity', max_size=50000,
+                              default_ttl=PRECOMPUTE_ACTIVITY_INTERVAL)
+_counters = {'hits': 0, 'misses': 0, 'errors': 0}
+_counters_lock = threading.Lock()
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def record_activity(connection, user_id):
+    """User'ni scheduler ro'yxatiga qo'shish (worker'dan PRECOMPUTE_ACTIVITY_INTERVAL'da bir marta)"""
+    if _recent_activity.get(user_id):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(queries.ACTIVE_USER_SEEN, (user_id,))
+    connection.commit()
+    _recent_activity.set(user_id, True)
+
+
+def load_snapshot(connection, user_id, kind):
+    """Bugungi va hozirgi ma'lumotga mos snapshot 'data'si yoki None"""
+    with connection.cursor() as cursor:
+        cursor.execute(_LOOKUP_SQL[kind.name], (user_id, kind.name, date.today()))
+        row = cursor.fetchone()
+    if not row or not row['fresh']:
+        return None
+    return json.loads(row['payload'])
+
+
+def serves_snapshot(kind_name):
+    """
+    GET endpoint: snapshot bo'lsa - undan, bo'lmasa jonli hisoblash (view)
+
+    @cached_response'dan keyin (ichida) qo'yiladi: javob keshi birinchi tekshiriladi.
+    """
+    kind = KINDS[kind_name]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            user_id = session.get('user_id')
+            if not user_id or request.args.to_dict() not in kind.accepts:
+                return view(*args, **kwargs)
+
+            data = None
+            try:
+                connection = get_db_connection()
+                try:
+                    record_activity(connection, user_id)
+                    data = load_snapshot(connection, user_id, kind)
+                finally:
+                    connection.close()
+            except Exception as e:
+                # Masalan, migrations/005 hali bajarilmagan - jonli hisoblash ishlayveradi
+                _count('errors')
+                logger.warning("Snapshot o'qishda xatolik (%s): %s", kind.name, e)
+
+            if data is None:
+                _count('misses')
+                if _scheduler is not None:
+                    _scheduler.request(user_id)
+                return view(*args, **kwargs)
+
+            _count('hits')
+            response = jsonify({'success': True, 'data': data})
+            response.headers['X-Snapshot'] = 'HIT'
+            return response
+        return wrapper
+    return decorator
+
+
+def stats():
+    with _counters_lock:
+        result = {'snapshots': dict(_counters)}
+    result['scheduler'] = _scheduler.stats() if _scheduler is not None else None
+    return result
+
+
+# ===== SCHEDULER =====
+
+class _Job:
+    __slots__ = ('user_id', 'idle_seconds', 'has_snapshot', 'due_at', 'urgent')
+
+    def __init__(self, user_id, idle_seconds, has_snapshot):
+        self.user_id = user_id
+        self.idle_seconds = idle_seconds
+        self.has_snapshot = has_snapshot
+        self.due_at = None
+        self.urgent = False
+
+    def priority(self):
+        # Kichik - birinchi: so'ralgan, hali hisoblanmagan, eng yaqinda kirgan
+        return (not self.urgent, self.has_snapshot, self.idle_seconds)
+
+
+class Scheduler:
+    """
+    Faol user'lar uchun snapshot'larni davriy yangilash
+
+    `_timers` - vaqt bo'yicha heap (due_at); vaqti kelgan job `_ready`
+    ustuvorlik heap'iga o'tadi va worker'lar shu yerdan oladi. Heap'larda
+    eskirgan yozuvlar qolishi mumkin - olinganda job.due_at bilan tekshiriladi.
+    """
+
+    def __init__(self, workers=PRECOMPUTE_WORKERS, interval=PRECOMPUTE_INTERVAL,
+                 jitter=PRECOMPUTE_JITTER, active_days=PRECOMPUTE_ACTIVE_DAYS,
+                 scan_interval=PRECOMPUTE_SCAN_INTERVAL):
+        self.workers = max(1, workers)
+        self.interval = interval
+        self.jitter = jitter
+        self.active_days = active_days
+        self.scan_interval = scan_interval
+        self._cond = threading.Condition()
+        self._jobs = {}
+        self._timers = []
+        self._ready = []
+        self._running = set()
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+        self._stepdown = threading.Event()
+        self._day = date.today()
+        self._leader = False
+        self._counts = {'runs': 0, 'computed': 0, 'fresh': 0, 'partial': 0, 'failed': 0}
+
+    # --- navbat ---
+
+    def _jittered(self, delay):
+        return max(0.0, delay * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def _schedule(self, job, delay):
+        job.due_at = time.monotonic() + delay
+        heapq.heappush(self._timers, (job.due_at, next(self._seq), job.user_id))
+        self._cond.notify()
+
+    def _promote_due(self, now):
+        while self._timers and self._timers[0][0] <= now:
+            due_at, _, user_id = heapq.heappop(self._timers)
+            job = self._jobs.get(user_id)
+            if job is None or job.due_at != due_at or user_id in self._running:
+                continue
+            heapq.heappush(self._ready, (job.priority(), next(self._seq), user_id))
+
+    def sync(self, rows):
+        """Faol user'lar ro'yxati: yangilari navbatga qo'shiladi, nofaollari chiqariladi"""
+        with self._cond:
+            seen = set()
+            for row in rows:
+                user_id = row['user_id']
+                seen.add(user_id)
+                job = self._jobs.get(user_id)
+                if job is not None:
+                    job.idle_seconds = row['idle_seconds']
+                    continue
+                job = self._jobs[user_id] = _Job(user_id, row['idle_seconds'], row['watermark_age'] is not None)
+                if job.has_snapshot:
+                    # Watermark database'da: interval tugashiga qancha qolgan bo'lsa, shuncha kutiladi
+                    delay = max(0.0, self.interval - row['watermark_age'])
+                else:
+                    delay = 0.0
+                self._schedule(job, self._jittered(delay) if delay else random.uniform(0, self.scan_interval))
+            for user_id in set(self._jobs) - seen:
+                del self._jobs[user_id]
+
+            today = date.today()
+            if today != self._day:
+                # Yangi kun: 'month', 'oxirgi 30 kun' o'zgardi - hamma snapshot eskirdi.
+                # Bir interval ichida taqsimlanadi, faol user'lar ustuvor
+                self._day = today
+                for job in self._jobs.values():
+                    self._schedule(job, random.uniform(0, self.interval * self.jitter))
+
+    def request(self, user_id):
+        """Snapshot topilmadi: user'ni navbat boshiga qo'yish (faqat leader process'da)"""
+        if not self._leader:
+            return
+        with self._cond:
+            job = self._jobs.get(user_id)
+            if job is None:
+                job = self._jobs[user_id] = _Job(user_id, 0, False)
+            elif job.urgent or user_id in self._running:
+                return
+            job.urgent = True
+            self._schedule(job, 0.0)
+
+    def _stopping(self):
+        return self._stop.is_set() or self._stepdown.is_set()
+
+    def _next_job(self):
+        with self._cond:
+            while not self._stopping():
+                now = time.monotonic()
+                self._promote_due(now)
+                while self._ready:
+                    _, _, user_id = heapq.heappop(self._ready)
+                    job = self._jobs.get(user_id)
+                    if job is not None and user_id not in self._running:
+                        self._running.add(user_id)
+                        return job
+                timeout = self._timers[0][0] - now if self._timers else self.scan_interval
+                self._cond.wait(min(max(timeout, 0.01), self.scan_interval))
+            return None
+
+    def _finish(self, job, outcome):
+        with self._cond:
+            self._running.discard(job.user_id)
+            self._counts['runs'] += 1
+            if outcome is None:
+                self._counts['failed'] += 1
+                # Xatolik: to'liq interval kutmasdan, lekin database'ni bosmasdan qayta urinish
+                delay = self._jittered(self.interval / 4)
+            else:
+                for state in outcome.values():
+                    self._counts[state] += 1
+                job.has_snapshot = job.has_snapshot or 'computed' in outcome.values()
+                delay = self._jittered(self.interval)
+            job.urgent = False
+            if job.user_id in self._jobs:
+                self._schedule(job, delay)
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            outcome = None
+            try:
+                outcome = refresh_user(job.user_id)
+            except Exception as e:
+                logger.error("Precompute xatolik: user_id=%s: %s", job.user_id, e)
+            self._finish(job, outcome)
+
+    # --- leader ---
+
+    def _acquire_leader(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, 0) as acquired", (LEADER_LOCK,))
+            return bool((cursor.fetchone() or {}).get('acquired'))
+
+    def _still_leader(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT IS_USED_LOCK(%s) = CONNECTION_ID() as mine", (LEADER_LOCK,))
+                return bool((cursor.fetchone() or {}).get('mine'))
+        except Exception as e:
+            logger.warning("Precompute lock connection xatolik: %s", e)
+            return False
+
+    def _lead(self, lock_connection):
+        """Lock olingan: worker'lar va faol user'lar skaneri (lock yo'qolguncha)"""
+        self._stepdown.clear()
+        threads = [threading.Thread(target=self._worker, name=f'precompute-{i}', daemon=True)
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            while not self._stopping():
+                if not self._still_leader(lock_connection):
+                    logger.warning("Precompute: leader lock yo'qoldi")
+                    return
+                try:
+                    connection = get_db_connection()
+                    try:
+                        rows = active_users(connection, self.active_days)
+                    finally:
+                        connection.close()
+                    self.sync(rows)
+                except Exception as e:
+                    logger.error("Precompute: faol user'larni o'qishda xatolik: %s", e)
+                self._stop.wait(self.scan_interval)
+        finally:
+            # Boshqa scheduler lock'ni olgan bo'lishi mumkin - navbat unga o'tadi
+            self._stepdown.set()
+            with self._cond:
+                self._cond.notify_all()
+            for thread in threads:
+                thread.join()
+            with self._cond:
+                self._jobs.clear()
+                self._timers.clear()
+                self._ready.clear()
+
+    def run_forever(self):
+        """Lock olinguncha kutish, keyin ishlash; lock yo'qolsa - yana kutish"""
+        while not self._stop.is_set():
+            try:
+                lock_connection = get_db_connection()
+            except Exception as e:
+                logger.warning("Precompute: database'ga ulanib bo'lmadi: %s", e)
+                self._stop.wait(self.scan_interval)
+                continue
+            try:
+                if self._acquire_leader(lock_connection):
+                    self._leader = True
+                    logger.info("Precompute scheduler ishga tushdi (pid=%s, workers=%s)", os.getpid(), self.workers)
+                    self._lead(lock_connection)
+            except Exception as e:
+                logger.exception("Precompute scheduler xatolik: %s", e)
+            finally:
+                self._leader = False
+                # Lock faqat shu connection'ga bog'liq - u yopilsa, lock ham bo'shaydi
+                lock_connection.invalidate()
+            self._stop.wait(self.scan_interval)
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'leader': self._leader,
+                'workers': self.workers,
+                'users': len(self._jobs),
+                'ready': len(self._ready),
+                'running': len(self._running),
+                **self._counts
+            }
+
+
+def run_once(workers=PRECOMPUTE_WORKERS, user_ids=None, force=False):
+    """Faol user'larni (yoki berilganlarini) bir marta, ustuvorlik tartibida hisoblash"""
+    if user_ids is None:
+        connection = get_db_connection()
+        try:
+            rows = active_users(connection)
+        finally:
+            connection.close()
+        rows.sort(key=lambda row: (row['watermark_age'] is not None, row['idle_seconds']))
+        user_ids = [row['user_id'] for row in rows]
+
+    totals = {'users': len(user_ids), 'computed': 0, 'fresh': 0, 'partial': 0, 'failed': 0}
+
+    def refresh(user_id):
+        try:
+            return refresh_user(user_id, force=force)
+        except Exception as e:
+            logger.error("Precompute xatolik: user_id=%s: %s", user_id, e)
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='precompute') as executor:
+        for user_id, outcome in zip(user_ids, executor.map(refresh, user_ids)):
+            if outcome is None:
+                totals['failed'] += 1
+                continue
+            for state in outcome.values():
+                totals[state] += 1
+            logger.info("user_id=%s: %s", user_id, outcome)
+    return totals
+
+
+_scheduler = None
+_scheduler_pid = None
+_scheduler_lock = threading.Lock()
+
+
+def start_in_process():
+    """Gunicorn worker ichida fon scheduler (PRECOMPUTE_IN_PROCESS=true); har bir process'da bir marta"""
+    global _scheduler, _scheduler_pid
+    pid = os.getpid()
+    if not PRECOMPUTE_IN_PROCESS or _scheduler_pid == pid:
+        return
+    with _scheduler_lock:
+        if _scheduler_pid == pid:
+            return
+        # fork'dan keyin parent thread'lari yo'q - har bir process o'zi ishga tushiradi
+        _scheduler = Scheduler()
+        _scheduler_pid = pid
+        threading.Thread(target=_scheduler.run_forever, name='precompute-leader', daemon=True).start()
+
+
+def main():
+    global _scheduler
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help='Scheduler (sidecar)')
+    run_parser.add_argument('--once', action='store_true', help="Faol user'larni bir marta hisoblab chiqish")
+    run_parser.add_argument('--workers', type=int, default=PRECOMPUTE_WORKERS)
+    refresh_parser = subparsers.add_parser('refresh', help="Bitta user snapshot'larini majburiy yangilash")
+    refresh_parser.add_argument('--user-id', type=int, required=True)
+    args = parser.parse_args()
+    log_setup.configure()
+
+    started = time.perf_counter()
+    if args.command == 'refresh':
+        print(refresh_user(args.user_id, force=True))
+    elif args.once:
+        totals = run_once(workers=args.workers)
+        print(f"Tayyor: {totals}, {time.perf_counter() - started:.1f}s")
+    else:
+        _scheduler = Scheduler(workers=args.workers)
+        try:
+            _scheduler.run_forever()
+        except KeyboardInterrupt:
+            _scheduler.stop()
+
+
+if __name__ == '__main__':
+    main()
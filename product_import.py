@@ -0,0 +1,265 @@
+"""
+Mahsulotlarni CSV/XLSX fayldan ommaviy import qilish
+
+Fayl qatorma-qator o'qiladi (butun fayl xotiraga yuklanmaydi), har bir qator
+tekshiriladi va `IMPORT_BATCH_SIZE` talik bo'laklar bilan
+`INSERT ... ON DUPLICATE KEY UPDATE` orqali yoziladi. (user_id, barcode) UNIQUE
+kaliti (migrations/004) bo'yicha mavjud mahsulot yangilanadi, yangisi qo'shiladi.
+Barcode'siz qatorlar har doim yangi mahsulot sifatida qo'shiladi.
+
+Har bir bo'lak alohida commit qilinadi: katta fayl uzoq lock ushlab turmaydi,
+database xatoligida oldingi bo'laklar saqlanib qoladi.
+"""
+import codecs
+import csv
+import os
+import time
+from decimal import Decimal, InvalidOperation
+
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+# Hisobotga yoziladigan qator xatolari soni (qolganlari faqat sanaladi)
+IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', '1000'))
+
+COLUMNS = ('name', 'category', 'barcode', 'price', 'quantity', 'min_quantity', 'unit', 'image_url')
+
+# Sarlavha nomlari (kichik harfda) -> ustun
+HEADER_ALIASES = {
+    'nomi': 'name',
+    'mahsulot': 'name',
+    'kategoriya': 'category',
+    'shtrix_kod': 'barcode',
+    'shtrixkod': 'barcode',
+    'narx': 'price',
+    'narxi': 'price',
+    'miqdor': 'quantity',
+    'soni': 'quantity',
+    'min_miqdor': 'min_quantity',
+    "o'lchov": 'unit',
+    'birlik': 'unit',
+    'rasm': 'image_url',
+}
+
+# Bo'sh katak uchun qiymat (create_product default'lari bilan bir xil)
+DEFAULTS = {'price': Decimal('0.00'), 'quantity': 0, 'min_quantity': 0, 'unit': 'dona'}
+
+_MAX_LENGTHS = {'name': 255, 'category': 100, 'barcode': 100, 'unit': 50, 'image_url': 500}
+# Ustun turlari chegarasi: price DECIMAL(15,2), quantity/min_quantity INT
+_MAX_VALUES = {'price': Decimal('9999999999999.99'), 'quantity': 2 ** 31 - 1, 'min_quantity': 2 ** 31 - 1}
+
+
+class ImportFormatError(ValueError):
+    """Fayl o'qib bo'lmaydigan yoki sarlavhasi noto'g'ri"""
+
+
+class ImportSchemaError(RuntimeError):
+    """Database'da upsert uchun (user_id, barcode) UNIQUE kaliti yo'q"""
+
+
+UPSERT_KEY_SQL = "SHOW INDEX FROM warehouse_products WHERE Key_name = 'uq_user_barcode'"
+_upsert_key_checked = False
+
+
+def require_upsert_key(connection):
+    """
+    UNIQUE kalitsiz ON DUPLICATE KEY UPDATE hech qachon ishlamaydi - qayta import
+    har bir mahsulotni jimgina takrorlaydi. Kalit bor bo'lsa process davomida qayta tekshirilmaydi.
+
+    Raises:
+        ImportSchemaError: migrations/004 bajarilmagan
+    """
+    global _upsert_key_checked
+    if _upsert_key_checked:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_KEY_SQL)
+        if not cursor.fetchall():
+            raise ImportSchemaError("warehouse_products.uq_user_barcode yo'q: migrations/ fayllarini bajaring")
+    _upsert_key_checked = True
+
+
+def _normalize_header(header):
+    columns = []
+    for value in header:
+        key = str(value or '').strip().lower().replace(' ', '_')
+        key = HEADER_ALIASES.get(key, key)
+        columns.append(key if key in COLUMNS else None)
+    if 'name' not in columns:
+        raise ImportFormatError("Faylda 'name' (nomi) ustuni required")
+    return columns
+
+
+def iter_csv(stream):
+    """CSV faylning qatorlari (birinchi qator - sarlavha)"""
+    # utf-8-sig: Excel'dan saqlangan CSV boshidagi BOM olib tashlanadi
+    reader = csv.reader(codecs.iterdecode(stream, 'utf-8-sig'))
+    yield from reader
+
+
+def iter_xlsx(stream):
+    """XLSX birinchi varag'ining qatorlari (read_only - qatorlar oqim bilan o'qiladi)"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("XLSX import uchun openpyxl o'rnatilmagan (pip install openpyxl)")
+
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise ImportFormatError(f"XLSX fayl invalid: {e}")
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield ['' if value is None else value for value in row]
+    finally:
+        workbook.close()
+
+
+READERS = {'csv': iter_csv, 'xlsx': iter_xlsx}
+
+
+def detect_format(filename, requested=None):
+    fmt = (requested or os.path.splitext(filename or '')[1].lstrip('.')).lower()
+    if fmt not in READERS:
+        raise ImportFormatError("Fayl formati: csv yoki xlsx")
+    return fmt
+
+
+def _text(value, column):
+    text = str(value).strip() if value is not None else ''
+    if isinstance(value, float) and value.is_integer():
+        # Excel shtrix-kodni son sifatida saqlaydi: 4780000000017.0
+        text = str(int(value))
+    if len(text) > _MAX_LENGTHS[column]:
+        raise ValueError(f"{column} {_MAX_LENGTHS[column]} belgidan uzun")
+    return text or None
+
+
+def _number(value, column, integer):
+    if value in (None, ''):
+        return None
+    try:
+        number = Decimal(str(value).strip().replace(' ', '').replace(',', '.'))
+    except InvalidOperation:
+        raise ValueError(f"{column} son emas: {value!r}")
+    # NaN/Infinity Decimal() dan o'tadi, lekin solishtirish va quantize'da xatolik beradi
+    if not number.is_finite():
+        raise ValueError(f"{column} son emas: {value!r}")
+    if number < 0:
+        raise ValueError(f"{column} manfiy bo'lishi mumkin emas")
+    if integer and number != number.to_integral_value():
+        raise ValueError(f"{column} butun son bo'lishi kerak")
+    # Yaxlitlangandan keyin tekshiriladi (9999999999999.999 -> 10000000000000.00)
+    if number > _MAX_VALUES[column] or (not integer and number.quantize(Decimal('0.01')) > _MAX_VALUES[column]):
+        raise ValueError(f"{column} juda katta (maksimal {_MAX_VALUES[column]})")
+    return int(number) if integer else number.quantize(Decimal('0.01'))
+
+
+def parse_row(values, columns):
+    """
+    Bitta qatorni tekshirish
+
+    Returns:
+        dict: faqat faylda bor ustunlar
+
+    Raises:
+        ValueError: qator noto'g'ri bo'lsa
+    """
+    product = {}
+    for column, value in zip(columns, values):
+        if column is None:
+            continue
+        if column == 'price':
+            product[column] = _number(value, column, integer=False)
+        elif column in ('quantity', 'min_quantity'):
+            product[column] = _number(value, column, integer=True)
+        else:
+            product[column] = _text(value, column)
+    if not product.get('name'):
+        raise ValueError("name required")
+    for column, default in DEFAULTS.items():
+        if column in columns and product.get(column) is None:
+            product[column] = default
+    return product
+
+
+def _upsert_sql(columns):
+    """Faqat faylda bor ustunlar yangilanadi (masalan, quantity bo'lmasa qoldiq o'zgarmaydi)"""
+    placeholders = ', '.join(['%s'] * (len(columns) + 1))
+    updates = ', '.join(f"{column} = VALUES({column})" for column in columns if column != 'barcode')
+    return (f"INSERT INTO warehouse_products (user_id, {', '.join(columns)})\n"
+            f"VALUES ({placeholders})\n"
+            f"ON DUPLICATE KEY UPDATE {updates}, updated_at = NOW()")
+
+
+def import_products(connection, user_id, rows, dry_run=False, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Qatorlar oqimini (birinchisi - sarlavha) warehouse_products'ga yozish
+
+    Returns:
+        dict: rows, imported, failed, errors (qator raqami bilan), rows_per_second
+
+    Raises:
+        ImportFormatError: fayl bo'sh yoki sarlavha noto'g'ri bo'lsa
+    """
+    started = time.perf_counter()
+    rows = iter(rows)
+    try:
+        header = next(rows)
+    except StopIteration:
+        raise ImportFormatError("Fayl bo'sh")
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFormatError(f"Faylni o'qib bo'lmadi: {e}")
+    columns = _normalize_header(header)
+    present = [column for column in COLUMNS if column in columns]
+    require_upsert_key(connection)
+    sql = _upsert_sql(present)
+
+    total = imported = failed = 0
+    errors = []
+    batch = []
+
+    def flush():
+        nonlocal imported
+        if not dry_run:
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+            connection.commit()
+        imported += len(batch)
+        batch.clear()
+
+    line_no = 1
+    try:
+        for line_no, values in enumerate(rows, start=2):
+            if not any(str(value).strip() for value in values):
+                continue
+            total += 1
+            try:
+                product = parse_row(values, columns)
+            except ValueError as e:
+                failed += 1
+                if len(errors) < IMPORT_MAX_ERRORS:
+                    errors.append({'row': line_no, 'error': str(e)})
+                continue
+            batch.append((user_id, *(product.get(column) for column in present)))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        connection.rollback()
+        raise ImportFormatError(f"{line_no}-qatordan keyin faylni o'qib bo'lmadi: {e}")
+    except Exception:
+        connection.rollback()
+        raise
+
+    elapsed = time.perf_counter() - started
+    return {
+        'dry_run': dry_run,
+        'rows': total,
+        'imported': imported,
+        'failed': failed,
+        'errors': errors,
+        'errors_truncated': failed > len(errors),
+        'columns': present,
+        'elapsed_ms': round(elapsed * 1000, 1),
+        'rows_per_second': round(total / elapsed) if elapsed > 0 else total
+    }
@@ -0,0 +1,371 @@
+"""
+Hot path SQL so'rovlari
+
+app.py endpoint'lari shu konstantalardan foydalanadi, scripts/explain_check.py esa
+`HOT_QUERIES` ro'yxatidagi har bir so'rov uchun EXPLAIN bajarib, full scan'ga
+tushib qolganlarini topadi. Yangi og'ir so'rov qo'shilsa, shu yerga ham qo'shing.
+
+Davr filtrlari yarim ochiq oraliq (periods.PeriodRange) sifatida beriladi:
+`day >= %s AND day < %s` - index'dan foydalana oladi.
+
+Ro'yxatlar uchun `*_PAGE` - pagination.KeysetQuery (birinchi sahifa + seek),
+`*_FIELDS` - `?fields=` whitelist'i (fieldsets.Fieldset).
+"""
+from fieldsets import Fieldset
+from pagination import KeysetQuery, PageRequest
+from periods import last_days, period_range, range_predicate, trailing_months
+
+# ===== PLAN =====
+
+USER_SUBSCRIPTION = """SELECT subscription_type, subscription_expires_at
+   FROM users WHERE user_id = %s"""
+
+# ===== WAREHOUSE =====
+
+PRODUCTS_LIST = "SELECT * FROM warehouse_products WHERE user_id = %s ORDER BY created_at DESC"
+
+PRODUCTS_PAGE = KeysetQuery.build(
+    "SELECT * FROM warehouse_products WHERE user_id = %s"
+)
+
+PRODUCTS_FIELDS = Fieldset('SELECT *', tuple((name, name) for name in (
+    'id', 'name', 'category', 'barcode', 'price', 'quantity', 'min_quantity', 'unit', 'image_url',
+    'created_at', 'updated_at')))
+
+# Parametrlar: user_id, product_id. Bitta mahsulotning to'liq tarixi (sahifa so'ralmasa)
+MOVEMENTS_BY_PRODUCT = """SELECT wm.*, wp.name as product_name
+   FROM warehouse_movements wm
+   JOIN warehouse_products wp ON wm.product_id = wp.id
+   WHERE wm.user_id = %s AND wm.product_id = %s
+   ORDER BY wm.created_at DESC"""
+
+MOVEMENTS_BY_PRODUCT_PAGE = KeysetQuery.build(
+    """SELECT wm.*, wp.name as product_name
+   FROM warehouse_movements wm
+   JOIN warehouse_products wp ON wm.product_id = wp.id
+   WHERE wm.user_id = %s AND wm.product_id = %s""",
+    prefix='wm.'
+)
+
+MOVEMENTS_PAGE = KeysetQuery.build(
+    """SELECT wm.*, wp.name as product_name
+   FROM warehouse_movements wm
+   JOIN warehouse_products wp ON wm.product_id = wp.id
+   WHERE wm.user_id = %s""",
+    prefix='wm.'
+)
+
+WAREHOUSE_STATS = """SELECT
+    COUNT(*) as total_products,
+    SUM(quantity * price) as total_value,
+    SUM(CASE WHEN quantity <= min_quantity THEN 1 ELSE 0 END) as low_stock_count
+   FROM warehouse_products
+   WHERE user_id = %s"""
+
+LOW_STOCK_ALERTS = """SELECT name, category, quantity, min_quantity, price
+FROM warehouse_products
+WHERE user_id = %s AND quantity <= min_quantity
+ORDER BY (quantity - min_quantity)
+LIMIT 10"""
+
+# Parametrlar: user_id, start, end
+TOP_PRODUCTS = f"""SELECT
+    wp.name,
+    wp.category,
+    SUM(wm.quantity) as total_sold,
+    SUM(wm.quantity * wm.price) as total_revenue
+FROM warehouse_movements wm
+JOIN warehouse_products wp ON wm.product_id = wp.id
+WHERE wm.user_id = %s AND wm.movement_type = 'out'
+    AND wm.reason = 'sale'
+    AND {range_predicate('wm.created_at')}
+GROUP BY wm.product_id, wp.name, wp.category
+ORDER BY total_revenue DESC
+LIMIT 10"""
+
+# ===== TRANSACTIONS =====
+
+TRANSACTIONS_PAGE = KeysetQuery.build(
+    "SELECT * FROM transactions WHERE user_id = %s"
+)
+
+# (user_id, created_at, transaction_type, amount) index'i id/type/amount ko'rinishini qoplaydi
+TRANSACTIONS_FIELDS = Fieldset('SELECT *', tuple((name, name) for name in (
+    'id', 'transaction_type', 'amount', 'currency', 'category', 'description', 'created_at')))
+
+# Quyidagilar transactions_daily rollup'ini o'qiydi. Parametrlar: user_id, start, end
+PERIOD_SUMMARY = f"""SELECT
+    SUM(CASE WHEN transaction_type = 'income' THEN amount_sum ELSE 0 END) as total_income,
+    SUM(CASE WHEN transaction_type = 'expense' THEN amount_sum ELSE 0 END) as total_expense,
+    COALESCE(SUM(tx_count), 0) as transaction_count
+   FROM transactions_daily
+   WHERE user_id = %s AND {range_predicate('day')}"""
+
+TOP_EXPENSE_CATEGORIES = f"""SELECT NULLIF(category, '') as category, SUM(amount_sum) as total
+   FROM transactions_daily
+   WHERE user_id = %s AND {range_predicate('day')} AND transaction_type = 'expense'
+   GROUP BY category
+   ORDER BY total DESC
+   LIMIT 5"""
+
+FINANCIAL_METRICS = f"""SELECT
+    SUM(CASE WHEN transaction_type = 'income' THEN amount_sum ELSE 0 END) as revenue,
+    SUM(CASE WHEN transaction_type = 'expense' THEN amount_sum ELSE 0 END) as costs,
+    SUM(CASE WHEN transaction_type = 'income' THEN amount_sum ELSE 0 END) -
+    SUM(CASE WHEN transaction_type = 'expense' THEN amount_sum ELSE 0 END) as profit,
+    COALESCE(SUM(CASE WHEN transaction_type = 'income' THEN tx_count END), 0) as sales_count,
+    SUM(CASE WHEN transaction_type = 'income' THEN amount_sum END) /
+    SUM(CASE WHEN transaction_type = 'income' THEN tx_count END) as avg_sale
+FROM transactions_daily
+WHERE user_id = %s AND {range_predicate('day')}"""
+
+DAILY_TRENDS = f"""SELECT
+    day as date,
+    SUM(CASE WHEN transaction_type = 'income' THEN amount_sum ELSE 0 END) as daily_income,
+    SUM(CASE WHEN transaction_type = 'expense' THEN amount_sum ELSE 0 END) as daily_expense
+FROM transactions_daily
+WHERE user_id = %s AND {range_predicate('day')}
+GROUP BY day
+ORDER BY date DESC
+LIMIT 30"""
+
+EXPENSE_CATEGORY_STATS = f"""SELECT
+    NULLIF(category, '') as category,
+    SUM(tx_count) as transaction_count,
+    SUM(amount_sum) as total_amount,
+    SUM(amount_sum) / SUM(tx_count) as avg_amount,
+    MIN(amount_min) as min_amount,
+    MAX(amount_max) as max_amount
+FROM transactions_daily
+WHERE user_id = %s AND {range_predicate('day')} AND transaction_type = 'expense'
+GROUP BY category
+ORDER BY total_amount DESC"""
+
+INCOME_CATEGORY_STATS = f"""SELECT
+    NULLIF(category, '') as category,
+    SUM(tx_count) as transaction_count,
+    SUM(amount_sum) as total_amount,
+    SUM(amount_sum) / SUM(tx_count) as avg_amount
+FROM transactions_daily
+WHERE user_id = %s AND {range_predicate('day')} AND transaction_type = 'income'
+GROUP BY category
+ORDER BY total_amount DESC"""
+
+# forecasting.py: kunlik qatorlar (kategoriya bo'yicha). Parametrlar: user_id, start, end
+DAILY_CATEGORY_SERIES = f"""SELECT day, transaction_type, category, amount_sum
+FROM transactions_daily
+WHERE user_id = %s AND {range_predicate('day')} AND transaction_type IN ('income', 'expense')"""
+
+# Prognoz keshi kaliti: yangi/o'chirilgan/o'zgargan tranzaksiya shu natijani o'zgartiradi
+FORECAST_FINGERPRINT = f"""SELECT
+    COUNT(*) as rollup_rows,
+    COALESCE(SUM(tx_count), 0) as tx_count,
+    COALESCE(SUM(amount_sum), 0) as amount_sum,
+    MAX(updated_at) as updated_at
+FROM transactions_daily
+WHERE user_id = %s AND {range_predicate('day')}"""
+
+# ===== EMPLOYEES / TASKS =====
+
+EMPLOYEES_LIST = "SELECT * FROM business_employees WHERE owner_id = %s ORDER BY created_at DESC"
+
+EMPLOYEES_PAGE = KeysetQuery.build(
+    "SELECT * FROM business_employees WHERE owner_id = %s"
+)
+
+EMPLOYEES_FIELDS = Fieldset('SELECT *', tuple((name, name) for name in (
+    'id', 'telegram_id', 'name', 'role', 'is_active', 'created_at', 'updated_at')))
+
+TASKS_LIST = """SELECT t.*, e.name as employee_name
+   FROM business_tasks t
+   LEFT JOIN business_employees e ON t.employee_id = e.id
+   WHERE t.owner_id = %s
+   ORDER BY t.created_at DESC"""
+
+TASKS_BY_STATUS = """SELECT t.*, e.name as employee_name
+   FROM business_tasks t
+   LEFT JOIN business_employees e ON t.employee_id = e.id
+   WHERE t.owner_id = %s AND t.status = %s
+   ORDER BY t.created_at DESC"""
+
+TASKS_PAGE = KeysetQuery.build(
+    """SELECT t.*, e.name as employee_name
+   FROM business_tasks t
+   LEFT JOIN business_employees e ON t.employee_id = e.id
+   WHERE t.owner_id = %s""",
+    prefix='t.'
+)
+
+# Parametrlar: owner_id, status
+TASKS_BY_STATUS_PAGE = KeysetQuery.build(
+    """SELECT t.*, e.name as employee_name
+   FROM business_tasks t
+   LEFT JOIN business_employees e ON t.employee_id = e.id
+   WHERE t.owner_id = %s AND t.status = %s""",
+    prefix='t.'
+)
+
+# employee_name so'ralmasa LEFT JOIN ham tushib qoladi (e.id - PK, qatorlar soni o'zgarmaydi)
+TASKS_FIELDS = Fieldset(
+    'SELECT t.*, e.name as employee_name',
+    (('id', 't.id'), ('employee_id', 't.employee_id'), ('title', 't.title'), ('description', 't.description'),
+     ('due_date', 't.due_date'), ('status', 't.status'), ('created_at', 't.created_at'),
+     ('completed_at', 't.completed_at'), ('employee_name', 'e.name')),
+    join="\n   LEFT JOIN business_employees e ON t.employee_id = e.id",
+    join_fields=('employee_name',),
+)
+
+EMPLOYEE_PERFORMANCE = """SELECT
+    e.name as employee_name,
+    COUNT(t.id) as total_tasks,
+    SUM(CASE WHEN t.status = 'completed' THEN 1 ELSE 0 END) as completed_tasks,
+    SUM(CASE WHEN t.status = 'pending' THEN 1 ELSE 0 END) as pending_tasks
+FROM business_employees e
+LEFT JOIN business_tasks t ON e.id = t.employee_id
+WHERE e.owner_id = %s AND e.is_active = TRUE
+GROUP BY e.id, e.name
+ORDER BY completed_tasks DESC
+LIMIT 10"""
+
+EMPLOYEE_COUNTS = """SELECT
+    COUNT(*) as total,
+    SUM(CASE WHEN is_active = TRUE THEN 1 ELSE 0 END) as active
+FROM business_employees WHERE owner_id = %s"""
+
+TASK_STATUS_COUNTS = """SELECT COUNT(*) as total,
+   SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
+   SUM(CASE WHEN status = 'in_progress' THEN 1 ELSE 0 END) as in_progress,
+   SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed
+   FROM business_tasks WHERE owner_id = %s"""
+
+# ===== ANALYTICS SNAPSHOTS (precompute.py) =====
+
+# Har bir scope uchun arzon "barmoq izi" (s.user_id - tashqi so'rovdagi user).
+# Ma'lumot qo'shilsa, o'chirilsa yoki o'zgarsa, satr ham o'zgaradi.
+# business_tasks'da updated_at yo'q: har bir vazifaning (id, xodim, status) juftligi
+# CRC32 yig'indisiga kiradi - boshqa xodimga o'tkazish va har qanday status o'zgarishi ko'rinadi.
+SCOPE_FINGERPRINTS = {
+    'transactions': """(SELECT CONCAT_WS(':', COUNT(*), COALESCE(SUM(tx_count), 0),
+        COALESCE(SUM(amount_sum), 0), MAX(updated_at))
+       FROM transactions_daily WHERE user_id = s.user_id)""",
+    'warehouse': """(SELECT CONCAT_WS(':', COUNT(*), COALESCE(SUM(quantity), 0), MAX(updated_at),
+        (SELECT MAX(id) FROM warehouse_movements WHERE user_id = s.user_id))
+       FROM warehouse_products WHERE user_id = s.user_id)""",
+    'employees': """(SELECT CONCAT_WS(':', COUNT(*), MAX(updated_at), SUM(is_active),
+        (SELECT CONCAT_WS(':', COUNT(*), MAX(id),
+                COALESCE(SUM(CRC32(CONCAT_WS(',', id, COALESCE(employee_id, ''), status))), 0))
+           FROM business_tasks WHERE owner_id = s.user_id))
+       FROM business_employees WHERE owner_id = s.user_id)""",
+}
+
+
+def snapshot_fingerprint(scopes):
+    """Bir nechta scope barmoq izlarini bitta SQL ifodaga birlashtirish"""
+    return "CONCAT_WS('|', " + ', '.join(SCOPE_FINGERPRINTS[scope] for scope in scopes) + ")"
+
+
+def snapshot_fingerprints_sql(kinds):
+    """
+    Scheduler uchun: bitta so'rovda har bir snapshot turi barmoq izi.
+    `kinds` - {nom: scopes}. Parametr: user_id
+    """
+    columns = ',\n    '.join(f"{snapshot_fingerprint(scopes)} as `{name}`" for name, scopes in kinds.items())
+    return f"SELECT\n    {columns}\nFROM (SELECT %s as user_id) s"
+
+
+def snapshot_lookup_sql(scopes):
+    """
+    Handler uchun: snapshot va uning hozir ham yangiligi - bitta so'rovda.
+    Parametrlar: user_id, kind, day
+    """
+    return f"""SELECT s.payload, s.computed_at, s.fingerprint = {snapshot_fingerprint(scopes)} as fresh
+FROM analytics_snapshots s
+WHERE s.user_id = %s AND s.kind = %s AND s.day = %s"""
+
+
+SNAPSHOT_WATERMARKS = """SELECT kind, day, fingerprint, checked_at
+FROM analytics_snapshots WHERE user_id = %s"""
+
+SNAPSHOT_UPSERT = """INSERT INTO analytics_snapshots
+    (user_id, kind, day, fingerprint, payload, computed_at, checked_at, compute_ms)
+VALUES (%s, %s, %s, %s, %s, NOW(3), NOW(3), %s)
+ON DUPLICATE KEY UPDATE day = VALUES(day), fingerprint = VALUES(fingerprint),
+    payload = VALUES(payload), computed_at = VALUES(computed_at),
+    checked_at = VALUES(checked_at), compute_ms = VALUES(compute_ms)"""
+
+# Barmoq izi o'zgarmagan: faqat tekshirilgan vaqt (watermark) yangilanadi
+SNAPSHOT_TOUCH = """UPDATE analytics_snapshots SET checked_at = NOW(3)
+WHERE user_id = %s AND kind = %s"""
+
+ACTIVE_USER_SEEN = """INSERT INTO analytics_active_users (user_id, last_seen_at)
+VALUES (%s, NOW()) ON DUPLICATE KEY UPDATE last_seen_at = NOW()"""
+
+# Scheduler: oxirgi N kunda Mini App'ni ochgan user'lar, necha soniya oldin kirgani va
+# eng eski watermark yoshi (NULL - hali hisoblanmagan). Parametr: N (kun)
+ACTIVE_USERS = """SELECT a.user_id,
+    TIMESTAMPDIFF(SECOND, a.last_seen_at, NOW()) as idle_seconds,
+    TIMESTAMPDIFF(SECOND, MIN(s.checked_at), NOW()) as watermark_age
+FROM analytics_active_users a
+LEFT JOIN analytics_snapshots s ON s.user_id = a.user_id
+WHERE a.last_seen_at >= NOW() - INTERVAL %s DAY
+GROUP BY a.user_id, a.last_seen_at"""
+
+
+def _month_range():
+    return period_range('month').params
+
+
+# Seek sahifasi uchun namunaviy kalit (EXPLAIN faqat plan'ni ko'radi)
+_SAMPLE_PAGE = PageRequest(50, (period_range('month').start, 2 ** 31))
+
+
+def _seek_params(keyset, *params):
+    return keyset.bind(params, _SAMPLE_PAGE)[1]
+
+
+# EXPLAIN harness uchun: (nom, sql, user_id -> params)
+HOT_QUERIES = [
+    ('user_subscription', USER_SUBSCRIPTION, lambda uid: (uid,)),
+    ('products_list', PRODUCTS_LIST, lambda uid: (uid,)),
+    ('movements_by_product', MOVEMENTS_BY_PRODUCT, lambda uid: (uid, 1)),
+    ('movements_by_product_page', MOVEMENTS_BY_PRODUCT_PAGE.first, lambda uid: (uid, 1, 101)),
+    ('movements_recent', MOVEMENTS_PAGE.first, lambda uid: (uid, 101)),
+    ('products_seek', PRODUCTS_PAGE.after, lambda uid: _seek_params(PRODUCTS_PAGE, uid)),
+    ('movements_seek', MOVEMENTS_PAGE.after, lambda uid: _seek_params(MOVEMENTS_PAGE, uid)),
+    ('movements_by_product_seek', MOVEMENTS_BY_PRODUCT_PAGE.after,
+     lambda uid: _seek_params(MOVEMENTS_BY_PRODUCT_PAGE, uid, 1)),
+    ('warehouse_stats', WAREHOUSE_STATS, lambda uid: (uid,)),
+    ('low_stock_alerts', LOW_STOCK_ALERTS, lambda uid: (uid,)),
+    ('top_products', TOP_PRODUCTS, lambda uid: (uid, *last_days(30).params)),
+    ('transactions_page', TRANSACTIONS_PAGE.first, lambda uid: (uid, 51)),
+    ('transactions_seek', TRANSACTIONS_PAGE.after, lambda uid: _seek_params(TRANSACTIONS_PAGE, uid)),
+    ('period_summary', PERIOD_SUMMARY, lambda uid: (uid, *_month_range())),
+    ('top_expense_categories', TOP_EXPENSE_CATEGORIES, lambda uid: (uid, *_month_range())),
+    ('financial_metrics', FINANCIAL_METRICS, lambda uid: (uid, *_month_range())),
+    ('daily_trends', DAILY_TRENDS, lambda uid: (uid, *last_days(30).params)),
+    ('expense_category_stats', EXPENSE_CATEGORY_STATS, lambda uid: (uid, *trailing_months(3).params)),
+    ('income_category_stats', INCOME_CATEGORY_STATS, lambda uid: (uid, *trailing_months(3).params)),
+    ('daily_category_series', DAILY_CATEGORY_SERIES, lambda uid: (uid, *last_days(365).params)),
+    ('forecast_fingerprint', FORECAST_FINGERPRINT, lambda uid: (uid, *last_days(365).params)),
+    ('employees_list', EMPLOYEES_LIST, lambda uid: (uid,)),
+    ('tasks_list', TASKS_LIST, lambda uid: (uid,)),
+    ('tasks_by_status', TASKS_BY_STATUS, lambda uid: (uid, 'pending')),
+    ('employees_seek', EMPLOYEES_PAGE.after, lambda uid: _seek_params(EMPLOYEES_PAGE, uid)),
+    ('tasks_seek', TASKS_PAGE.after, lambda uid: _seek_params(TASKS_PAGE, uid)),
+    ('tasks_by_status_seek', TASKS_BY_STATUS_PAGE.after,
+     lambda uid: _seek_params(TASKS_BY_STATUS_PAGE, uid, 'pending')),
+    # ?fields= sanoq ko'rinishlari (static/js/app.js) - index-only bo'lishi kerak (Using index)
+    ('products_ids', PRODUCTS_FIELDS.apply(PRODUCTS_LIST, ('id', 'created_at')), lambda uid: (uid,)),
+    ('transactions_type_amount_page', TRANSACTIONS_FIELDS.apply(
+        TRANSACTIONS_PAGE.first, ('id', 'transaction_type', 'amount', 'created_at')), lambda uid: (uid, 51)),
+    ('employees_ids', EMPLOYEES_FIELDS.apply(EMPLOYEES_LIST, ('id', 'created_at')), lambda uid: (uid,)),
+    ('tasks_status', TASKS_FIELDS.apply(TASKS_LIST, ('id', 'status', 'created_at')), lambda uid: (uid,)),
+    ('employee_performance', EMPLOYEE_PERFORMANCE, lambda uid: (uid,)),
+    ('employee_counts', EMPLOYEE_COUNTS, lambda uid: (uid,)),
+    ('task_status_counts', TASK_STATUS_COUNTS, lambda uid: (uid,)),
+    ('snapshot_fingerprints', snapshot_fingerprints_sql({'all': tuple(SCOPE_FINGERPRINTS)}),
+     lambda uid: (uid,)),
+    ('snapshot_lookup', snapshot_lookup_sql(tuple(SCOPE_FINGERPRINTS)),
+     lambda uid: (uid, 'dashboard', period_range('day').start)),
+    ('active_users', ACTIVE_USERS, lambda uid: (7,)),
+]
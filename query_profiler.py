@@ -0,0 +1,353 @@
+"""
+SQL profiler: fingerprint bo'yicha so'rov statistikasi, sekin so'rovlar va N+1
+
+database.py dagi cursor har bir execute() dan keyin `record()` ni chaqiradi.
+So'rov fingerprint'ga keltiriladi (literal'lar, %s, izohlar olib tashlanadi,
+IN (...) va ko'p qatorli VALUES bittaga yig'iladi) - bir xil SQL turli
+user'lar uchun bitta qatorga tushadi.
+
+Har bir fingerprint uchun: soni, xatolar, umumiy/maksimal vaqt, qaytgan
+qatorlar va log-bucket histogramma (p95 shundan; worker'lar o'rtasida aniq
+jamlanadi). PROFILER_SLOW_QUERY_MS dan sekin so'rovlar fingerprint bilan
+loglanadi - parametr qiymatlari yozilmaydi, faqat soni.
+
+N+1: bitta request ichida bir xil fingerprint PROFILER_N_PLUS_ONE marta va
+undan ko'p bajarilsa (masalan, sikl ichida har bir mahsulot uchun SELECT),
+route bilan qayd qilinadi.
+
+Ko'rish:
+    GET /internal/query-stats?sort=total&limit=30   (X-Internal-Token)
+    python query_profiler.py --sort p95 --limit 20
+"""
+import argparse
+import contextvars
+import json
+import logging
+import math
+import os
+import re
+import threading
+import urllib.request
+from collections import deque
+from datetime import datetime, timezone
+
+from flask import has_request_context, request
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'true').lower() == 'true'
+PROFILER_SLOW_QUERY_MS = float(os.getenv('PROFILER_SLOW_QUERY_MS', '500'))
+PROFILER_N_PLUS_ONE = int(os.getenv('PROFILER_N_PLUS_ONE', '10'))
+# Xotira chegarasi: shundan ortiq turli fingerprint bitta `OTHER` qatoriga yig'iladi
+PROFILER_MAX_FINGERPRINTS = int(os.getenv('PROFILER_MAX_FINGERPRINTS', '2000'))
+PROFILER_SLOW_LOG_SIZE = int(os.getenv('PROFILER_SLOW_LOG_SIZE', '50'))
+
+OTHER = '(boshqa so\'rovlar)'
+
+# Histogramma: 0.05ms dan boshlab har bucket 1.25 marta katta (p95 xatosi <= 25%)
+_BUCKET_BASE_MS = 0.05
+_BUCKET_LOG_RATIO = math.log(1.25)
+
+_COMMENTS = re.compile(r'/\*.*?\*/|--[^\n]*|#[^\n]*', re.S)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"", re.S)
+_PLACEHOLDERS = re.compile(r'%\(\w+\)s|%s')
+_NUMBERS = re.compile(r'(?<![\w.])-?(?:0x[0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)(?![\w.])')
+_IN_LISTS = re.compile(r'\bIN ?\(\?(?:, \?)*\)', re.I)
+_VALUES_ROWS = re.compile(r'\b(VALUES) ?(\([^()]*\))(?:, \([^()]*\))+', re.I)
+_SPACES = re.compile(r'\s+')
+_SEPARATORS = re.compile(r'\s*,\s*')
+
+# Shablon SQL -> fingerprint; uzun (executemany batch) so'rovlar keshlanmaydi
+_FINGERPRINT_CACHE_SIZE = 4096
+_FINGERPRINT_CACHE_MAX_SQL = 4096
+_fingerprint_cache = {}
+
+
+def fingerprint(sql):
+    """
+    >>> fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x' /* hint */")
+    'SELECT * FROM t WHERE id IN (?+) AND name = ?'
+    """
+    cached = _fingerprint_cache.get(sql)
+    if cached is not None:
+        return cached
+    normalized = _COMMENTS.sub(' ', sql)
+    normalized = _STRINGS.sub('?', normalized)
+    normalized = _PLACEHOLDERS.sub('?', normalized)
+    normalized = _NUMBERS.sub('?', normalized)
+    normalized = _SPACES.sub(' ', normalized).strip()
+    normalized = _SEPARATORS.sub(', ', normalized)
+    normalized = _IN_LISTS.sub('IN (?+)', normalized)
+    normalized = _VALUES_ROWS.sub(r'\1 \2', normalized)
+    if len(sql) <= _FINGERPRINT_CACHE_MAX_SQL:
+        if len(_fingerprint_cache) >= _FINGERPRINT_CACHE_SIZE:
+            _fingerprint_cache.clear()
+        _fingerprint_cache[sql] = normalized
+    return normalized
+
+
+def _bucket(ms):
+    if ms <= _BUCKET_BASE_MS:
+        return 0
+    return math.ceil(math.log(ms / _BUCKET_BASE_MS) / _BUCKET_LOG_RATIO)
+
+
+def _bucket_upper_ms(index):
+    return _BUCKET_BASE_MS * math.exp(index * _BUCKET_LOG_RATIO)
+
+
+class _Entry:
+    __slots__ = ('count', 'errors', 'total_ms', 'max_ms', 'rows', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = {}
+
+
+class _RequestQueries:
+    """Joriy request'dagi fingerprint'lar soni (fan-out thread'lari ham shu obyektga yozadi)"""
+    __slots__ = ('counts',)
+
+    def __init__(self):
+        self.counts = {}
+
+
+_current = contextvars.ContextVar('request_queries', default=None)
+_lock = threading.Lock()
+_entries = {}
+_slow_log = deque(maxlen=PROFILER_SLOW_LOG_SIZE)
+_n_plus_one = {}
+
+
+def reset():
+    """Statistikani tozalash (joriy process)"""
+    global _lock, _entries, _slow_log, _n_plus_one
+    _lock = threading.Lock()
+    _entries = {}
+    _slow_log = deque(maxlen=PROFILER_SLOW_LOG_SIZE)
+    _n_plus_one = {}
+
+
+# Fork'dan keyin parent statistikasi bu worker'niki emas
+reset_after_fork = reset
+
+
+def _current_route():
+    if not has_request_context():
+        return None
+    rule = request.url_rule
+    return rule.rule if rule is not None else request.path
+
+
+def record(sql, seconds, rows, params_count, failed=False):
+    """database cursor'i: har bir execute() dan keyin"""
+    key = fingerprint(sql)
+    ms = seconds * 1000
+
+    request_queries = _current.get()
+    if request_queries is not None:
+        request_queries.counts[key] = request_queries.counts.get(key, 0) + 1
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            if len(_entries) >= PROFILER_MAX_FINGERPRINTS:
+                key = OTHER
+                entry = _entries.get(key)
+            if entry is None:
+                entry = _entries[key] = _Entry()
+        entry.count += 1
+        entry.total_ms += ms
+        if ms > entry.max_ms:
+            entry.max_ms = ms
+        if failed:
+            entry.errors += 1
+        elif rows is not None:
+            entry.rows += rows
+        bucket = _bucket(ms)
+        entry.buckets[bucket] = entry.buckets.get(bucket, 0) + 1
+
+    if ms >= PROFILER_SLOW_QUERY_MS:
+        route = _current_route()
+        _slow_log.append({
+            'at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'ms': round(ms, 2),
+            'rows': rows,
+            'route': route,
+            'fingerprint': key,
+            'params': f"{params_count} ta (yashirilgan)",
+        })
+        logger.warning("Sekin so'rov: %.1f ms, %s qator, route=%s: %s", ms, rows, route, key)
+
+
+# ===== REQUEST (N+1) =====
+
+def _before_request():
+    _current.set(_RequestQueries())
+
+
+def _teardown_request(exc=None):
+    request_queries = _current.get()
+    if request_queries is None:
+        return
+    _current.set(None)
+    repeated = [(key, count) for key, count in request_queries.counts.items() if count >= PROFILER_N_PLUS_ONE]
+    if not repeated:
+        return
+    route = _current_route()
+    for key, count in repeated:
+        with _lock:
+            event = _n_plus_one.get((route, key))
+            first = event is None
+            if first:
+                event = _n_plus_one[(route, key)] = {'requests': 0, 'max_per_request': 0}
+            event['requests'] += 1
+            event['max_per_request'] = max(event['max_per_request'], count)
+        if first:
+            logger.warning("N+1 ehtimoli: %s bitta request'da %s marta: %s", route, count, key)
+
+
+def init_app(app):
+    if not PROFILER_ENABLED:
+        return
+    app.before_request(_before_request)
+    app.teardown_request(_teardown_request)
+
+
+# ===== STATISTIKA =====
+
+def snapshot():
+    """Joriy process holati (JSON)"""
+    with _lock:
+        queries = {
+            key: [entry.count, entry.errors, entry.total_ms, entry.max_ms, entry.rows,
+                  {str(index): count for index, count in entry.buckets.items()}]
+            for key, entry in _entries.items()
+        }
+        slow = list(_slow_log)
+        n_plus_one = [[route, key, event['requests'], event['max_per_request']]
+                      for (route, key), event in _n_plus_one.items()]
+    return {'queries': queries, 'slow': slow, 'n_plus_one': n_plus_one}
+
+
+metrics.register_snapshot('queries', snapshot)
+
+
+def _percentile_ms(buckets, count, p):
+    if not count:
+        return 0.0
+    threshold = count * p
+    seen = 0
+    for index in sorted(buckets):
+        seen += buckets[index]
+        if seen >= threshold:
+            return _bucket_upper_ms(index)
+    return _bucket_upper_ms(max(buckets))
+
+
+def stats(sort='total', limit=50):
+    """
+    Barcha worker'lar bo'yicha jamlangan statistika
+
+    Args:
+        sort: total | count | p95 | max | rows
+    """
+    merged = {}
+    slow = []
+    n_plus_one = {}
+    workers = metrics.worker_snapshots('queries')
+    for payload in workers:
+        for key, (count, errors, total_ms, max_ms, rows, buckets) in payload['queries'].items():
+            entry = merged.setdefault(key, [0, 0, 0.0, 0.0, 0, {}])
+            entry[0] += count
+            entry[1] += errors
+            entry[2] += total_ms
+            entry[3] = max(entry[3], max_ms)
+            entry[4] += rows
+            for index, bucket_count in buckets.items():
+                entry[5][int(index)] = entry[5].get(int(index), 0) + bucket_count
+        slow.extend(payload['slow'])
+        for route, key, requests, max_per_request in payload['n_plus_one']:
+            event = n_plus_one.setdefault((route, key), {'route': route, 'fingerprint': key,
+                                                         'requests': 0, 'max_per_request': 0})
+            event['requests'] += requests
+            event['max_per_request'] = max(event['max_per_request'], max_per_request)
+
+    total_db_ms = sum(entry[2] for entry in merged.values()) or 1.0
+    rows = []
+    for key, (count, errors, total_ms, max_ms, rows_total, buckets) in merged.items():
+        rows.append({
+            'fingerprint': key,
+            'count': count,
+            'errors': errors,
+            'total_ms': round(total_ms, 2),
+            'share': round(total_ms / total_db_ms, 4),
+            'avg_ms': round(total_ms / count, 3) if count else 0.0,
+            'p95_ms': round(_percentile_ms(buckets, count, 0.95), 3),
+            'max_ms': round(max_ms, 3),
+            'rows': rows_total,
+            'rows_avg': round(rows_total / count, 1) if count else 0.0,
+        })
+    sort_key = {'total': 'total_ms', 'count': 'count', 'p95': 'p95_ms', 'max': 'max_ms', 'rows': 'rows'}.get(sort)
+    if sort_key is None:
+        raise ValueError('sort invalid, mumkin: total, count, p95, max, rows')
+    rows.sort(key=lambda row: row[sort_key], reverse=True)
+
+    return {
+        'workers': len(workers),
+        'fingerprints': len(rows),
+        'queries': rows[:limit],
+        'slow': sorted(slow, key=lambda item: item['at'], reverse=True)[:PROFILER_SLOW_LOG_SIZE],
+        'n_plus_one': sorted(n_plus_one.values(), key=lambda event: event['requests'], reverse=True),
+    }
+
+
+# ===== CLI =====
+
+def _print_table(data):
+    print(f"{data['workers']} worker, {data['fingerprints']} fingerprint")
+    header = ('total ms', 'ulush', 'soni', "o'rt ms", 'p95 ms', 'max ms', 'qator')
+    print('{:>10} {:>6} {:>8} {:>8} {:>8} {:>8} {:>8}  so\'rov'.format(*header))
+    for row in data['queries']:
+        print(f"{row['total_ms']:>10.1f} {row['share'] * 100:>5.1f}% {row['count']:>8} {row['avg_ms']:>8.2f} "
+              f"{row['p95_ms']:>8.2f} {row['max_ms']:>8.2f} {row['rows_avg']:>8.1f}  {row['fingerprint'][:160]}")
+    if data['n_plus_one']:
+        print("\nN+1 ehtimoli:")
+        for event in data['n_plus_one']:
+            print(f"  {event['route']}: {event['requests']} request, bittasida {event['max_per_request']} martagacha: "
+                  f"{event['fingerprint'][:160]}")
+    if data['slow']:
+        print("\nSekin so'rovlar:")
+        for item in data['slow']:
+            print(f"  {item['at']} {item['ms']:>9.1f} ms {item['route']}: {item['fingerprint'][:160]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default=f"http://localhost:{os.getenv('PORT', '5000')}",
+                        help="ishlab turgan server manzili")
+    parser.add_argument('--sort', default='total', choices=('total', 'count', 'p95', 'max', 'rows'))
+    parser.add_argument('--limit', type=int, default=30)
+    parser.add_argument('--json', action='store_true', help="jadval o'rniga JSON")
+    args = parser.parse_args()
+
+    req = urllib.request.Request(
+        f"{args.url.rstrip('/')}/internal/query-stats?sort={args.sort}&limit={args.limit}",
+        headers={'X-Internal-Token': os.getenv('INTERNAL_API_TOKEN', '')},
+    )
+    with urllib.request.urlopen(req, timeout=10) as response:
+        data = json.load(response)['data']
+    if args.json:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+    else:
+        _print_table(data)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Hisobot/analitika javoblari keshi (ETag / 304 bilan)
+
+Kalit: (user_id, endpoint, query parametrlari, bugungi sana, ma'lumot versiyalari).
+Yozish endpoint'lari `@invalidates(...)` orqali versiyani oshiradi - eski
+javob o'z-o'zidan ishlatilmay qoladi, TTL kutish shart emas.
+
+ETag javob tanasining hash'i. Keshdagi yozuv If-None-Match bilan mos kelsa,
+MySQL'ga umuman murojaat qilinmasdan 304 qaytadi.
+"""
+import hashlib
+import os
+from datetime import date
+from functools import wraps
+
+from flask import make_response, request, session
+
+from cache_store import CacheStore
+from data_version import data_versions
+
+RESPONSE_CACHE_MAX_SIZE = int(os.getenv('RESPONSE_CACHE_MAX_SIZE', '5000'))
+# Bot tranzaksiyalarni to'g'ridan-to'g'ri MySQL'ga yozadi; u /internal/data-version/bump
+# chaqirmasa ham javob shu muddatdan uzoq eskirib qolmasin
+RESPONSE_CACHE_MAX_AGE = int(os.getenv('RESPONSE_CACHE_MAX_AGE', '300'))
+
+response_cache = CacheStore('responses', max_size=RESPONSE_CACHE_MAX_SIZE, default_ttl=RESPONSE_CACHE_MAX_AGE)
+
+
+def _cache_key(user_id, scopes):
+    args = tuple(sorted(request.args.items(multi=True)))
+    # 'month', 'last 30 days' kabi davrlar kun almashganda boshqa oraliqni bildiradi
+    return (user_id, request.path, args, date.today().toordinal(),
+            data_versions.get(user_id, scopes))
+
+
+def _etag_matches(etag):
+    # Weak solishtirish: siqilgan javob ETag'i W/"..." (compression.py)
+    return request.if_none_match.contains_weak(etag)
+
+
+def _not_modified(etag):
+    response = make_response('', 304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def cached_response(scopes):
+    """
+    GET endpoint javobini keshlash
+
+    Args:
+        scopes: javob bog'liq bo'lgan ma'lumotlar (data_version.SCOPES)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            user_id = session.get('user_id')
+            if not user_id:
+                return view(*args, **kwargs)
+
+            key = _cache_key(user_id, scopes)
+            cached = response_cache.get(key)
+            if cached is not None:
+                etag, body, mimetype = cached
+                if _etag_matches(etag):
+                    return _not_modified(etag)
+                response = make_response(body)
+                response.mimetype = mimetype
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'private, no-cache'
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            # Faqat to'liq, muvaffaqiyatli javoblar keshlanadi (partial emas)
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            payload = response.get_json(silent=True)
+            if not isinstance(payload, dict) or not payload.get('success') or payload.get('partial'):
+                return response
+
+            body = response.get_data()
+            etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+            response_cache.set(key, (etag, body, response.mimetype))
+            if _etag_matches(etag):
+                return _not_modified(etag)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidates(*scopes):
+    """Yozish endpoint'i: muvaffaqiyatli javobdan keyin user versiyasini oshirish"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = make_response(view(*args, **kwargs))
+            user_id = session.get('user_id')
+            if user_id and response.status_code < 400:
+                data_versions.bump(user_id, scopes)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,91 @@
+"""
+transactions_daily rollup jadvalini to'ldirish va qayta qurish
+
+Odatda rollup trigger'lar orqali yangilanadi (migrations/001_transactions_daily.sql).
+Bu buyruq trigger o'rnatilishidan oldin yoki trigger'siz yozilgan qatorlar uchun:
+
+    python rollup.py rebuild                     # barcha user'lar
+    python rollup.py rebuild --user-id 123       # bitta user
+    python rollup.py rebuild --since 2025-01-01  # shu kundan boshlab
+"""
+import argparse
+import time
+
+from data_version import data_versions
+from database import get_db_connection
+
+_DELETE_SQL = "DELETE FROM transactions_daily WHERE user_id = %s AND day >= %s"
+
+_INSERT_SQL = """INSERT INTO transactions_daily
+        (user_id, day, transaction_type, category, amount_sum, tx_count, amount_min, amount_max)
+    SELECT user_id, DATE(created_at), transaction_type, IFNULL(category, ''),
+           SUM(amount), COUNT(*), MIN(amount), MAX(amount)
+      FROM transactions
+     WHERE user_id = %s AND created_at >= %s
+     GROUP BY user_id, DATE(created_at), transaction_type, IFNULL(category, '')"""
+
+# --since berilmasa, barcha tarix
+_EPOCH = '1970-01-01'
+
+
+def rebuild_user(connection, user_id, since=None):
+    """Bitta user'ning rollup qatorlarini xom transactions'dan qayta qurish (bitta tranzaksiyada)"""
+    since = since or _EPOCH
+    with connection.cursor() as cursor:
+        cursor.execute(_DELETE_SQL, (user_id, since))
+        cursor.execute(_INSERT_SQL, (user_id, since))
+        rows = cursor.rowcount
+    connection.commit()
+    return rows
+
+
+def rebuild(user_id=None, since=None, verbose=False):
+    """
+    Rollup'ni qayta qurish. Har bir user alohida tranzaksiyada ishlanadi,
+    shuning uchun katta jadvallarda ham lock'lar qisqa bo'ladi.
+
+    Returns:
+        dict: users va rollup_rows soni
+    """
+    connection = get_db_connection()
+    try:
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT DISTINCT user_id FROM transactions")
+                user_ids = [row['user_id'] for row in cursor.fetchall()]
+
+        total_rows = 0
+        for uid in user_ids:
+            try:
+                rows = rebuild_user(connection, uid, since)
+            except Exception:
+                connection.rollback()
+                raise
+            total_rows += rows
+            # Shu serverdagi worker'larning javob keshi eskirgan rollup'ni bermasin
+            data_versions.bump(uid, ('transactions',))
+            if verbose:
+                print(f"user_id={uid}: {rows} ta rollup qatori")
+        return {'users': len(user_ids), 'rollup_rows': total_rows}
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    rebuild_parser = subparsers.add_parser('rebuild', help="Rollup'ni xom transactions'dan qayta qurish")
+    rebuild_parser.add_argument('--user-id', type=int, help='Faqat shu user')
+    rebuild_parser.add_argument('--since', help='YYYY-MM-DD - shu kundan boshlab qayta qurish')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = rebuild(user_id=args.user_id, since=args.since, verbose=True)
+    print(f"Tayyor: {result['users']} ta user, {result['rollup_rows']} ta rollup qatori, "
+          f"{time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
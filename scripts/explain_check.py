@@ -0,0 +1,101 @@
+"""
+EXPLAIN regression tekshiruvi
+
+queries.HOT_QUERIES dagi har bir so'rov uchun EXPLAIN bajaradi va biror jadval
+full scan (type=ALL) yoki to'liq index scan (type=index) bilan o'qilsa xato beradi.
+CI yoki deploy'dan oldin real hajmdagi database'ga qarshi ishga tushiring:
+
+    python scripts/explain_check.py --user-id 123456789
+    python scripts/explain_check.py --min-rows 0      # kichik jadvallarni ham tekshirish
+
+Exit code: 0 - hammasi index ishlatadi, 1 - regressiya topildi.
+
+Kichik jadvallarda (optimizer uchun full scan arzonroq) `--min-rows` dan kam
+qatorli jadvallardagi full scan e'tiborga olinmaydi.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_db_connection  # noqa: E402
+from queries import HOT_QUERIES  # noqa: E402
+
+FULL_SCAN_TYPES = ('ALL', 'index')
+
+
+def table_sizes(cursor):
+    """information_schema bo'yicha taxminiy qatorlar soni"""
+    cursor.execute(
+        """SELECT TABLE_NAME as name, TABLE_ROWS as table_rows
+           FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()"""
+    )
+    return {row['name']: row['table_rows'] or 0 for row in cursor.fetchall()}
+
+
+def pick_user_id(cursor):
+    """Eng ko'p tranzaksiyasi bor user (eng og'ir holat)"""
+    cursor.execute(
+        """SELECT user_id FROM transactions
+           GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1"""
+    )
+    row = cursor.fetchone()
+    return row['user_id'] if row else 0
+
+
+def check_query(cursor, name, sql, params, sizes, aliases, min_rows):
+    """Bitta so'rovning EXPLAIN natijasidagi muammolar ro'yxati"""
+    cursor.execute('EXPLAIN ' + sql, params)
+    problems = []
+    for row in cursor.fetchall():
+        table = row.get('table') or ''
+        real_table = aliases.get(table, table)
+        if row.get('type') in FULL_SCAN_TYPES and sizes.get(real_table, 0) >= min_rows:
+            problems.append(
+                f"{name}: {table} type={row.get('type')} key={row.get('key')} "
+                f"rows={row.get('rows')} extra={row.get('Extra')}"
+            )
+    return problems
+
+
+# EXPLAIN'dagi alias -> haqiqiy jadval nomi
+ALIASES = {
+    'wm': 'warehouse_movements',
+    'wp': 'warehouse_products',
+    't': 'business_tasks',
+    'e': 'business_employees',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--user-id', type=int, help="Tekshiriladigan user (default: eng ko'p tranzaksiyali)")
+    parser.add_argument('--min-rows', type=int, default=1000,
+                        help="Shundan kichik jadvallardagi full scan e'tiborga olinmaydi")
+    args = parser.parse_args()
+
+    connection = get_db_connection()
+    try:
+        with connection.cursor() as cursor:
+            sizes = table_sizes(cursor)
+            user_id = args.user_id if args.user_id is not None else pick_user_id(cursor)
+
+            problems = []
+            for name, sql, params_for in HOT_QUERIES:
+                query_problems = check_query(cursor, name, sql, params_for(user_id), sizes, ALIASES, args.min_rows)
+                print(f"{'FAIL' if query_problems else 'ok  '} {name}")
+                problems.extend(query_problems)
+    finally:
+        connection.close()
+
+    if problems:
+        print(f"\n{len(problems)} ta full scan topildi:")
+        for problem in problems:
+            print('  ' + problem)
+        sys.exit(1)
+    print(f"\n{len(HOT_QUERIES)} ta so'rov index ishlatadi")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Qisqa muddatli sessiya tokeni
+initData bir marta tekshirilgandan keyin API so'rovlari shu token bilan keladi:
+token'ni tekshirish bitta HMAC va database'siz amalga oshadi
+"""
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+
+class SessionTokenSigner:
+    """
+    Token formati: base64url(payload_json).base64url(hmac_sha256)
+
+    Payload: {"u": user_id, "n": username, "p": has_business_plan (0/1), "e": exp (unix),
+              "x": obuna tugash vaqti (unix, muddatsiz obunada yo'q)}
+    """
+
+    def __init__(self, secret_key: str, ttl: int = 900):
+        self.ttl = ttl
+        key = hashlib.sha256(b'balansai-session-token:' + secret_key.encode()).digest()
+        # Kalit bir marta tayyorlanadi, har bir imzoda faqat copy() qilinadi
+        self._mac = hmac.new(key, digestmod=hashlib.sha256)
+
+    def _sign(self, payload: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(payload)
+        return mac.digest()
+
+    def issue(self, user_id, username=None, has_business_plan=True, plan_expires_at=None) -> dict:
+        """
+        Yangi token yaratadi
+
+        Args:
+            plan_expires_at: obuna tugash vaqti (unix timestamp); token undan uzoq yashamaydi
+
+        Returns:
+            dict: token va expires_at / expires_in
+        """
+        now = int(time.time())
+        expires_at = now + self.ttl
+        if plan_expires_at is not None:
+            expires_at = min(expires_at, int(plan_expires_at))
+
+        claims = {'u': user_id, 'n': username, 'p': 1 if has_business_plan else 0, 'e': expires_at}
+        if plan_expires_at is not None:
+            claims['x'] = int(plan_expires_at)
+        payload = json.dumps(claims, separators=(',', ':')).encode()
+        encoded = base64.urlsafe_b64encode(payload).rstrip(b'=')
+        signature = base64.urlsafe_b64encode(self._sign(encoded)).rstrip(b'=')
+        return {
+            'token': (encoded + b'.' + signature).decode(),
+            'expires_at': expires_at,
+            'expires_in': max(0, expires_at - now)
+        }
+
+    def verify(self, token: str) -> dict:
+        """
+        Token'ni tekshiradi
+
+        Returns:
+            dict: user_id, username, has_business_plan, expires_at, plan_expires_at
+
+        Raises:
+            ValueError: imzo noto'g'ri yoki muddati o'tgan bo'lsa
+        """
+        try:
+            encoded, signature = token.encode().split(b'.', 1)
+            expected = base64.urlsafe_b64encode(self._sign(encoded)).rstrip(b'=')
+        except Exception:
+            raise ValueError("Token formati noto'g'ri")
+
+        if not hmac.compare_digest(expected, signature):
+            raise ValueError("Token imzosi noto'g'ri")
+
+        try:
+            claims = json.loads(base64.urlsafe_b64decode(encoded + b'=' * (-len(encoded) % 4)))
+        except Exception:
+            raise ValueError("Token formati noto'g'ri")
+
+        if claims.get('e', 0) <= time.time():
+            raise ValueError("Token muddati o'tgan")
+
+        return {
+            'user_id': claims.get('u'),
+            'username': claims.get('n'),
+            'has_business_plan': bool(claims.get('p')),
+            'expires_at': claims.get('e'),
+            'plan_expires_at': claims.get('x')
+        }
@@ -37,10 +37,12 @@ function getAuthHeaders() {
         }
     }
     
-    return {
+    const headers = {
         'Content-Type': 'application/json',
         'X-Telegram-Init-Data': initData
     };
+
+    return window.sessionAuth ? window.sessionAuth.authorize(headers) : headers;
 }
 
 // Global qilish (index.html'da ishlatish uchun)
@@ -230,10 +232,11 @@ function updateDashboardDisplay(summaryRes, transactionsRes) {
 // Load quick stats
 async function loadQuickStats(useCache = true) {
     try {
+        // Faqat sanash uchun - to'liq qatorlar emas, id (va status) ustunlari
         const [productsRes, employeesRes, tasksRes] = await Promise.all([
-            apiRequest('/api/warehouse/products', {}, useCache),
-            apiRequest('/api/employees', {}, useCache),
-            apiRequest('/api/tasks', {}, useCache)
+            apiRequest('/api/warehouse/products?fields=id', {}, useCache),
+            apiRequest('/api/employees?fields=id', {}, useCache),
+            apiRequest('/api/tasks?fields=id,status', {}, useCache)
         ]);
 
         if (productsRes.success) {
@@ -45,3 +45,53 @@ class DataCache {
 // Global cache instance
 window.dataCache = new DataCache();
 
+
+// Sessiya tokeni - initData bir marta /api/auth/session orqali tokenga almashtiriladi,
+// keyingi so'rovlar Authorization: Bearer bilan yuboriladi (server initData'ni qayta tekshirmaydi)
+class SessionAuth {
+    constructor() {
+        this.token = null;
+        this.expiresAt = 0;
+        this.pending = null;
+        this.refreshMargin = 60000; // muddat tugashidan 60 soniya oldin yangilash
+    }
+
+    isValid() {
+        return this.token && Date.now() < this.expiresAt - this.refreshMargin;
+    }
+
+    // initData header'lariga token qo'shadi; token yo'q bo'lsa fonda olib keladi.
+    // initData ham qoldiriladi - token yaroqsiz bo'lsa server unga qaytadi.
+    authorize(headers) {
+        if (this.isValid()) {
+            return { ...headers, 'Authorization': `Bearer ${this.token}` };
+        }
+        this.exchange(headers);
+        return headers;
+    }
+
+    exchange(headers) {
+        if (this.pending || !headers['X-Telegram-Init-Data']) return this.pending;
+
+        this.pending = fetch('/api/auth/session', { method: 'POST', headers: headers })
+            .then(response => response.ok ? response.json() : null)
+            .then(result => {
+                if (result && result.success && result.data) {
+                    this.token = result.data.token;
+                    this.expiresAt = Date.now() + result.data.expires_in * 1000;
+                }
+            })
+            .catch(error => console.error('Sessiya tokeni xatosi:', error))
+            .finally(() => {
+                this.pending = null;
+            });
+        return this.pending;
+    }
+
+    clear() {
+        this.token = null;
+        this.expiresAt = 0;
+    }
+}
+
+window.sessionAuth = new SessionAuth();
@@ -33,10 +33,12 @@ function getAuthHeaders() {
         }
     }
     
-    return {
+    const headers = {
         'Content-Type': 'application/json',
         'X-Telegram-Init-Data': initData
     };
+
+    return window.sessionAuth ? window.sessionAuth.authorize(headers) : headers;
 }
 
 async function apiRequest(endpoint, options = {}, useCache = true) {
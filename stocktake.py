@@ -0,0 +1,193 @@
+"""
+Inventarizatsiya (stocktake) - sanalgan qoldiqlarni ombor bilan solishtirish
+
+Butun ro'yxat bitta tranzaksiyada ishlanadi:
+1. sanoq vaqtinchalik jadvalga executemany bilan yoziladi
+2. barcode'lar product_id'ga, farqlar esa JOIN orqali set-based hisoblanadi
+3. farq bor mahsulotlar uchun 'in'/'out' harakatlari executemany bilan yoziladi
+4. warehouse_products.quantity bitta UPDATE ... JOIN bilan sanoqqa tenglashtiriladi
+"""
+import os
+
+STOCKTAKE_MAX_LINES = int(os.getenv('STOCKTAKE_MAX_LINES', '50000'))
+STOCKTAKE_REASON = 'stocktake'
+
+_CREATE_COUNTS = """CREATE TEMPORARY TABLE stocktake_counts (
+    line_no INT NOT NULL,
+    product_id INT NULL,
+    barcode VARCHAR(100) NULL,
+    counted INT NOT NULL,
+    INDEX idx_product_id (product_id),
+    INDEX idx_barcode (barcode)
+) ENGINE=MEMORY"""
+
+_DROP_COUNTS = "DROP TEMPORARY TABLE IF EXISTS stocktake_counts"
+
+_INSERT_COUNTS = """INSERT INTO stocktake_counts (line_no, product_id, barcode, counted)
+VALUES (%s, %s, %s, %s)"""
+
+# warehouse_products (user_id, barcode) index'i bilan (migrations/003, 004 da UNIQUE)
+_RESOLVE_BARCODES = """UPDATE stocktake_counts c
+JOIN warehouse_products p ON p.user_id = %s AND p.barcode = c.barcode
+SET c.product_id = p.id
+WHERE c.product_id IS NULL AND c.barcode IS NOT NULL"""
+
+# Sanalgan mahsulot qatorlari tranzaksiya oxirigacha qulflanadi
+_LOCK_PRODUCTS = """SELECT p.id
+FROM warehouse_products p
+JOIN stocktake_counts c ON c.product_id = p.id
+WHERE p.user_id = %s
+FOR UPDATE"""
+
+# Bir mahsulot bir necha qatorda sanalgan bo'lsa (turli javonlar) - yig'indisi olinadi.
+# Topilmagan qatorlar (product_id NULL) alohida qoladi
+_DIFF = """SELECT
+    c.product_id,
+    MIN(c.line_no) as line_no,
+    MIN(c.barcode) as barcode,
+    SUM(c.counted) as counted,
+    p.id as matched_id,
+    p.name,
+    p.quantity as previous,
+    p.price
+FROM stocktake_counts c
+LEFT JOIN warehouse_products p ON p.id = c.product_id AND p.user_id = %s
+GROUP BY c.product_id, CASE WHEN c.product_id IS NULL THEN c.line_no END,
+    p.id, p.name, p.quantity, p.price
+ORDER BY line_no"""
+
+_INSERT_MOVEMENT = """INSERT INTO warehouse_movements
+(user_id, product_id, movement_type, quantity, price, reason)
+VALUES (%s, %s, %s, %s, %s, %s)"""
+
+_APPLY_COUNTS = """UPDATE warehouse_products p
+JOIN (
+    SELECT product_id, SUM(counted) as counted
+    FROM stocktake_counts
+    WHERE product_id IS NOT NULL
+    GROUP BY product_id
+) c ON c.product_id = p.id
+SET p.quantity = c.counted, p.updated_at = NOW()
+WHERE p.user_id = %s AND p.quantity <> c.counted"""
+
+
+def parse_items(items):
+    """
+    So'rovdagi ro'yxatni (line_no, product_id, barcode, counted) qatorlariga aylantirish
+
+    Har bir element: {"product_id": 1, "quantity": 5} yoki {"barcode": "...", "quantity": 5}
+
+    Raises:
+        ValueError: ro'yxat bo'sh, juda katta yoki element noto'g'ri bo'lsa
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError("items ro'yxati talab qilinadi (required)")
+    if len(items) > STOCKTAKE_MAX_LINES:
+        raise ValueError(f"items juda ko'p: maksimal {STOCKTAKE_MAX_LINES} ta qator")
+
+    rows = []
+    for line_no, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            raise ValueError(f"{line_no}-qator invalid")
+        product_id = item.get('product_id')
+        barcode = item.get('barcode')
+        quantity = item.get('quantity', item.get('counted'))
+        try:
+            product_id = int(product_id) if product_id not in (None, '') else None
+            counted = int(quantity)
+        except (TypeError, ValueError):
+            raise ValueError(f"{line_no}-qator invalid: product_id va quantity butun son bo'lishi kerak")
+        barcode = str(barcode).strip() if barcode not in (None, '') else None
+        if product_id is None and barcode is None:
+            raise ValueError(f"{line_no}-qator: product_id yoki barcode required")
+        if counted < 0:
+            raise ValueError(f"{line_no}-qator invalid: quantity manfiy bo'lishi mumkin emas")
+        rows.append((line_no, product_id, barcode, counted))
+    return rows
+
+
+def reconcile(connection, user_id, rows, dry_run=False):
+    """
+    Sanoqni ombor bilan solishtirish va (dry_run bo'lmasa) qoldiqlarni tuzatish
+
+    Returns:
+        dict: diff hisobot - adjustments, not_found va umumiy sonlar
+    """
+    adjustments = []
+    not_found = []
+    movements = []
+    unchanged = 0
+    value_difference = 0
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(_DROP_COUNTS)
+            cursor.execute(_CREATE_COUNTS)
+            cursor.executemany(_INSERT_COUNTS, rows)
+            cursor.execute(_RESOLVE_BARCODES, (user_id,))
+            cursor.execute(_LOCK_PRODUCTS, (user_id,))
+            cursor.execute(_DIFF, (user_id,))
+
+            for row in cursor.fetchall():
+                if row['matched_id'] is None:
+                    not_found.append({
+                        'line': row['line_no'],
+                        'product_id': row['product_id'],
+                        'barcode': row['barcode']
+                    })
+                    continue
+
+                counted = int(row['counted'])
+                previous = row['previous'] or 0
+                difference = counted - previous
+                if difference == 0:
+                    unchanged += 1
+                    continue
+
+                price = row['price'] or 0
+                value_difference += difference * price
+                adjustments.append({
+                    'product_id': row['matched_id'],
+                    'name': row['name'],
+                    'previous': previous,
+                    'counted': counted,
+                    'difference': difference
+                })
+                movements.append((
+                    user_id, row['matched_id'], 'in' if difference > 0 else 'out',
+                    abs(difference), price, STOCKTAKE_REASON
+                ))
+
+            if not dry_run:
+                if movements:
+                    cursor.executemany(_INSERT_MOVEMENT, movements)
+                cursor.execute(_APPLY_COUNTS, (user_id,))
+
+            cursor.execute(_DROP_COUNTS)
+
+        if dry_run:
+            connection.rollback()
+        else:
+            connection.commit()
+    except Exception:
+        connection.rollback()
+        # Pool'dagi connection'da vaqtinchalik jadval qolib ketmasin
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(_DROP_COUNTS)
+        except Exception:
+            connection.invalidate()
+        raise
+
+    return {
+        'dry_run': dry_run,
+        'lines': len(rows),
+        'matched': len(adjustments) + unchanged,
+        'changed': len(adjustments),
+        'unchanged': unchanged,
+        'movements_in': sum(1 for m in movements if m[2] == 'in'),
+        'movements_out': sum(1 for m in movements if m[2] == 'out'),
+        'value_difference': value_difference,
+        'adjustments': adjustments,
+        'not_found': not_found
+    }
@@ -6,6 +6,16 @@ import hashlib
 import json
 import urllib.parse
 from datetime import datetime, timedelta
+from functools import lru_cache
+
+@lru_cache(maxsize=4)
+def _secret_key(bot_token: str) -> bytes:
+    """Bot token'dan WebAppData secret key (har so'rovda qayta hisoblanmaydi)"""
+    return hmac.new(
+        "WebAppData".encode(),
+        bot_token.encode(),
+        hashlib.sha256
+    ).digest()
 
 def validate_telegram_init_data(init_data: str, bot_token: str) -> dict:
     """
@@ -39,12 +49,8 @@ def validate_telegram_init_data(init_data: str, bot_token: str) -> dict:
         
         data_check_string = '\n'.join(data_check_string)
         
-        # Secret key yaratish
-        secret_key = hmac.new(
-            "WebAppData".encode(),
-            bot_token.encode(),
-            hashlib.sha256
-        ).digest()
+        # Secret key
+        secret_key = _secret_key(bot_token)
         
         # Hash'ni tekshirish
         calculated_hash = hmac.new(
@@ -53,7 +59,7 @@ def validate_telegram_init_data(init_data: str, bot_token: str) -> dict:
             hashlib.sha256
         ).hexdigest()
         
-        if calculated_hash != received_hash:
+        if not hmac.compare_digest(calculated_hash, received_hash):
             raise ValueError("Hash validatsiya muvaffaqiyatsiz")
         
         # Auth date'ni tekshirish (24 soatdan eski bo'lmasligi kerak)